@@ -0,0 +1,178 @@
+import pygame
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+# Asset paths
+ASSET_DIR = os.path.join(os.path.dirname(__file__), "..", "assets")
+IMG_DIR = os.path.join(ASSET_DIR, "images")
+SOUND_DIR = os.path.join(ASSET_DIR, "sounds")
+
+# Sound effects loaded for every level; music is streamed by pygame.mixer.music
+SOUND_FILES = {
+    'eat': 'eat.wav',
+    'hurt': 'hurt.wav',
+    'level_up': 'level_up.wav',
+}
+MUSIC_FILE = 'background.wav'
+
+class AssetManager:
+    """Decodes images and sounds on a background thread.
+
+    prefetch() queues files for a daemon thread that decodes them without
+    touching the display. Pixel-format conversion has to happen on the main
+    thread, so pump() finalizes decoded images there within a per-frame time
+    budget. image() and sound() never wait for the thread: anything not
+    finalized yet is finalized or loaded synchronously on the spot.
+
+    A file the thread fails to decode is recorded in failures and treated
+    as missing; the thread carries on with the rest of the queue.
+    """
+    def __init__(self, image_dir=IMG_DIR, sound_dir=SOUND_DIR, budget_ms=2.0):
+        self.image_dir = image_dir
+        self.sound_dir = sound_dir
+        self.budget_ms = budget_ms
+        self.images = {}
+        self.sounds = {}
+        self.requests = queue.Queue()
+        self.decoded = deque()
+        self.requested = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.failures = []
+
+        self.prefetched = 0
+        self.sync_loads = 0
+        self.finalized = 0
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="asset-prefetch", daemon=True)
+            self.thread.start()
+
+    def prefetch(self, images=(), sounds=()):
+        """Queue image and sound files for background decoding"""
+        self.start()
+        with self.lock:
+            for name in images:
+                if name and ('image', name) not in self.requested:
+                    self.requested.add(('image', name))
+                    self.requests.put(('image', name))
+            for name in sounds:
+                if ('sound', name) not in self.requested:
+                    self.requested.add(('sound', name))
+                    self.requests.put(('sound', name))
+
+    def run(self):
+        while True:
+            kind, name = self.requests.get()
+            try:
+                if kind == 'image':
+                    asset = self.decode_image(name)
+                else:
+                    asset = self.decode_sound(name)
+            except Exception as e:
+                # A corrupt or unreadable file must not stop the prefetch thread
+                asset = None
+                with self.lock:
+                    self.failures.append((kind, name, f"{type(e).__name__}: {e}"))
+            with self.lock:
+                self.decoded.append((kind, name, asset))
+
+    def decode_image(self, name):
+        path = os.path.join(self.image_dir, name)
+        if not os.path.exists(path):
+            return None
+        return pygame.image.load(path)
+
+    def decode_sound(self, name):
+        path = os.path.join(self.sound_dir, SOUND_FILES[name])
+        if not os.path.exists(path) or not pygame.mixer.get_init():
+            return None
+        return pygame.mixer.Sound(path)
+
+    def finalize(self, kind, name, asset):
+        if kind == 'image':
+            if name not in self.images:
+                self.images[name] = asset.convert_alpha() if asset is not None else None
+                self.finalized += 1
+        elif name not in self.sounds:
+            self.sounds[name] = asset
+        self.prefetched += 1
+
+    def take(self, kind, name):
+        """Remove and return the thread's decoded entry for an asset, if it is waiting"""
+        with self.lock:
+            for entry in self.decoded:
+                if entry[0] == kind and entry[1] == name:
+                    self.decoded.remove(entry)
+                    return entry
+        return None
+
+    def pump(self, budget_ms=None):
+        """Finalize decoded assets on the main thread until the budget is spent"""
+        budget = (self.budget_ms if budget_ms is None else budget_ms) / 1000
+        start = time.perf_counter()
+        while True:
+            with self.lock:
+                if not self.decoded:
+                    break
+                entry = self.decoded.popleft()
+            self.finalize(*entry)
+            if time.perf_counter() - start > budget:
+                break
+
+    def image(self, name):
+        """Converted image for name, or None if the file is missing or unreadable"""
+        if name in self.images:
+            return self.images[name]
+        # Finalize the prefetched copy if the thread already decoded it
+        entry = self.take('image', name)
+        if entry is not None:
+            self.finalize(*entry)
+            return self.images[name]
+        # Prefetch has not got there yet: load synchronously
+        self.sync_loads += 1
+        try:
+            image = self.decode_image(name)
+        except pygame.error:
+            image = None
+        self.images[name] = image.convert_alpha() if image is not None else None
+        return self.images[name]
+
+    def sound(self, name):
+        """Sound for a SOUND_FILES key, or None if it is missing or there is no mixer"""
+        if name in self.sounds:
+            return self.sounds[name]
+        entry = self.take('sound', name)
+        if entry is not None:
+            self.finalize(*entry)
+            return self.sounds[name]
+        self.sync_loads += 1
+        try:
+            sound = self.decode_sound(name)
+        except pygame.error:
+            sound = None
+        self.sounds[name] = sound
+        return sound
+
+    def idle(self):
+        """True when every prefetch request has been finalized"""
+        with self.lock:
+            waiting = bool(self.decoded)
+        return self.requests.empty() and not waiting and self.prefetched >= len(self.requested)
+
+    def stats(self):
+        return {
+            'requested': len(self.requested),
+            'prefetched': self.prefetched,
+            'finalized': self.finalized,
+            'sync_loads': self.sync_loads,
+            'pending': len(self.requested) - self.prefetched,
+            'failed': len(self.failures),
+        }
+
+# Shared by the sprite cache and every Game in the process
+asset_manager = AssetManager()
@@ -0,0 +1,89 @@
+import pygame
+import os
+import numpy as np
+
+# How far each background layer scrolls per pixel the view moves; layers
+# with factor 0 are static and pre-composited into one surface
+PARALLAX_FACTORS = (0.0, 0.25, 0.5)
+
+# Color under the layers when background images are present
+BASE_COLOR = (0, 105, 148)
+
+def gradient_surface(size):
+    """Vertical ocean gradient built with one surfarray operation"""
+    width, height = size
+    y = np.arange(height) // 4
+    column = np.zeros((height, 3), dtype=np.uint8)
+    column[:, 1] = np.clip(105 + y, 0, 255)
+    column[:, 2] = np.clip(148 + y, 0, 255)
+    surface = pygame.Surface(size).convert()
+    pygame.surfarray.blit_array(surface, np.broadcast_to(column, (width, height, 3)))
+    return surface
+
+def is_opaque(surface):
+    if not surface.get_flags() & pygame.SRCALPHA:
+        return True
+    return int(pygame.surfarray.pixels_alpha(surface).min()) == 255
+
+class Background:
+    """Layered background with pre-composited static layers and parallax strips.
+
+    Static layers (factor 0) are flattened once into an opaque, convert()ed
+    surface. Each moving layer is pre-rendered as a strip two screens wide,
+    so drawing it at any scroll offset is a single blit of a screen-sized
+    window, opaque when the layer has no transparency. A layer's offset is
+    the horizontal view position times its parallax factor, so nearer
+    layers slide further as the view moves. When no layer images exist the
+    static surface is a generated gradient.
+    """
+    def __init__(self, size, image_dir, layer_count=3, factors=PARALLAX_FACTORS):
+        self.size = size
+        self.static = None
+        self.strips = []  # (strip, factor)
+        self.load(image_dir, layer_count, factors)
+
+    @property
+    def is_static(self):
+        return not self.strips
+
+    def load_layer(self, path):
+        try:
+            if os.path.exists(path):
+                img = pygame.image.load(path).convert_alpha()
+                img = pygame.transform.scale(img, self.size)
+                return img if not is_opaque(img) else img.convert()
+        except pygame.error:
+            print(f"Couldn't load background layer: {path}")
+        return None
+
+    def load(self, image_dir, layer_count, factors):
+        width, height = self.size
+        layers = []
+        for i in range(layer_count):
+            layer = self.load_layer(os.path.join(image_dir, f'background_layer_{i}.png'))
+            if layer is not None:
+                layers.append((layer, factors[i] if i < len(factors) else 0.0))
+
+        if not layers:
+            # No layer images: fall back to the generated gradient
+            self.static = gradient_surface(self.size)
+            return
+
+        self.static = pygame.Surface(self.size).convert()
+        self.static.fill(BASE_COLOR)
+        # Layers below the first moving one never change, so flatten them
+        while layers and layers[0][1] == 0:
+            self.static.blit(layers.pop(0)[0], (0, 0))
+        for layer, factor in layers:
+            strip = pygame.Surface((width * 2, height), layer.get_flags() & pygame.SRCALPHA, layer)
+            strip.blit(layer, (0, 0))
+            strip.blit(layer, (width, 0))
+            self.strips.append((strip, factor))
+
+    def draw(self, surface, view_x=0):
+        """Draw the layers for a view scrolled view_x pixels to the right"""
+        surface.blit(self.static, (0, 0))
+        width, height = self.size
+        for strip, factor in self.strips:
+            offset = int(view_x * factor) % width
+            surface.blit(strip, (0, 0), (offset, 0, width, height))
@@ -0,0 +1,243 @@
+import numpy as np
+
+from simulation import TURN_CHANCE, CHASE_RADIUS
+
+# Neighbor radii; the grid cell is as large as the widest so a 3x3 block of
+# cells around a creature covers every neighbor it can react to
+SCHOOL_RADIUS = 64
+SEPARATION_RADIUS = 20
+FLEE_RADIUS = 128
+HUNT_RADIUS = 128
+NEIGHBOR_CELL = 128
+
+# Steering weights
+COHESION = 0.4
+ALIGNMENT = 0.6
+SEPARATION = 1.5
+FLEE = 3.0
+
+# Size ratio at which one fish can eat another (matches Player.can_eat)
+EAT_FACTOR = 1.2
+
+# Per-tick cost bounds: creatures re-steered per tick and neighbors each considers
+THINK_BUDGET = 512
+MAX_NEIGHBORS = 24
+
+# The 3x3 block of cell offsets around a cell
+CELL_DX = np.array([-1, -1, -1, 0, 0, 0, 1, 1, 1])
+CELL_DY = np.array([-1, 0, 1, -1, 0, 1, -1, 0, 1])
+
+def cell_keys(cx, cy):
+    return cx * (1 << 32) + cy
+
+class NeighborGrid:
+    """Uniform grid over a NumPy position array, rebuilt every tick.
+
+    build() sorts creature indices by cell so each cell is one contiguous
+    run of order; candidates() gathers the runs of the 3x3 cells around a
+    set of creatures into flat (a, b) index arrays without a Python loop
+    over creatures. Crowded creatures keep only their nearest candidates.
+    """
+    def __init__(self, cell_size=NEIGHBOR_CELL):
+        self.cell_size = cell_size
+        self.build(np.zeros((0, 2)))
+
+    def build(self, positions):
+        self.positions = positions
+        self.cells = np.floor(positions / self.cell_size).astype(np.int64)
+        keys = cell_keys(self.cells[:, 0], self.cells[:, 1])
+        self.order = np.argsort(keys, kind='stable')
+        self.sorted_positions = positions[self.order]
+        self.keys, self.starts, self.counts = np.unique(keys[self.order], return_index=True,
+                                                        return_counts=True)
+
+    def candidates(self, indices, max_neighbors=None):
+        """(a, b) pairs where b is closer than cell_size to a, a itself included.
+
+        The 3x3 cells around a cover exactly that radius in every direction.
+        Each a keeps at most its max_neighbors nearest candidates, which keeps
+        crowded cells from blowing up the pair count handed to steering.
+        """
+        if not len(indices) or not len(self.keys):
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        keys = cell_keys(self.cells[indices, 0][:, None] + CELL_DX,
+                         self.cells[indices, 1][:, None] + CELL_DY)
+        slot = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[slot] == keys
+        starts = np.where(found, self.starts[slot], 0).ravel()
+        counts = np.where(found, self.counts[slot], 0)
+        totals = counts.sum(axis=1)
+        counts = counts.ravel()
+
+        # Slots into the cell-sorted order; each a's candidates are one contiguous run
+        total = int(totals.sum())
+        run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        slots = np.repeat(starts, counts) + run_offsets
+        rows = np.repeat(np.arange(len(indices)), totals)
+
+        dx = self.sorted_positions[slots, 0] - np.repeat(self.positions[indices, 0], totals)
+        dy = self.sorted_positions[slots, 1] - np.repeat(self.positions[indices, 1], totals)
+        d2 = dx * dx + dy * dy
+        near = d2 < self.cell_size ** 2
+        slots, rows, d2 = slots[near], rows[near], d2[near]
+        totals = np.bincount(rows, minlength=len(indices))
+
+        if max_neighbors and totals.max() > max_neighbors:
+            # Lay the runs out as one inf-padded row per a; partitioning a row
+            # finds its nearest candidates
+            row_starts = np.cumsum(totals) - totals
+            table = np.full((len(indices), int(totals.max())), np.inf)
+            table[rows, np.arange(len(rows)) - row_starts[rows]] = d2
+            nearest = np.argpartition(table, max_neighbors - 1, axis=1)[:, :max_neighbors]
+            pick = (row_starts[:, None] + nearest)[nearest < totals[:, None]]
+            slots, rows = slots[pick], rows[pick]
+        return indices[rows], self.order[slots]
+
+def per_creature(index, values, count):
+    """Sum the rows of values into count slots by creature index"""
+    if values.ndim == 1:
+        return np.bincount(index, values, minlength=count)
+    return np.stack([np.bincount(index, values[:, k], minlength=count) for k in range(values.shape[1])],
+                    axis=1)
+
+class BehaviorEngine:
+    """Schooling, fleeing and hunting steering for a whole population.
+
+    Prey school with nearby prey (cohesion, alignment, separation) and flee
+    larger predators and a player big enough to eat them. Predators chase the
+    player within CHASE_RADIUS and otherwise hunt the nearest smaller prey.
+    Creatures with nothing to react to wander with random turns.
+
+    Each tick only up to budget creatures are re-steered, picked round-robin,
+    and each considers only its max_neighbors nearest neighbors from the
+    grid; the others keep swimming in their current direction. Neighbors are
+    not looked up across the wrapping world edges.
+    """
+    def __init__(self, seed=None, budget=THINK_BUDGET, max_neighbors=MAX_NEIGHBORS, cell_size=NEIGHBOR_CELL):
+        self.rng = np.random.default_rng(seed)
+        self.grid = NeighborGrid(cell_size)
+        self.budget = budget
+        self.max_neighbors = max_neighbors
+        self.cursor = 0
+
+        # Work done by the last steer() call
+        self.thinkers = 0
+        self.pairs = 0
+
+    def select(self, count):
+        """Indices of the creatures re-steered this tick"""
+        if not self.budget or count <= self.budget:
+            return np.arange(count)
+        indices = (self.cursor + np.arange(self.budget)) % count
+        self.cursor = (self.cursor + self.budget) % count
+        return indices
+
+    def steer(self, position, direction, size, is_predator, player_pos=None, player_size=None):
+        """Update direction in place for this tick's share of the population.
+
+        position holds top-left corners and size widths, like player_pos and
+        player_size; every distance is measured between centers. player_pos
+        and player_size may also be arrays of several players.
+        """
+        count = len(position)
+        self.thinkers = self.pairs = 0
+        if count == 0:
+            return
+        thinkers = self.select(count)
+        centers = position + size[:, None] / 2
+        self.grid.build(centers)
+        a, b = self.grid.candidates(thinkers, self.max_neighbors)
+        offset = centers[b] - centers[a]
+        distance = np.hypot(offset[:, 0], offset[:, 1])
+        keep = distance > 0
+        a, b, offset, distance = a[keep], b[keep], offset[keep], distance[keep]
+        self.thinkers = len(thinkers)
+        self.pairs = len(a)
+
+        steering = np.zeros((count, 2))
+        prey_a = ~is_predator[a]
+        prey_b = ~is_predator[b]
+
+        # Schooling: steer toward the local center and heading, away from crowding
+        school = prey_a & prey_b & (distance < SCHOOL_RADIUS)
+        sa = a[school]
+        mates = np.bincount(sa, minlength=count)
+        schooling = mates > 0
+        if schooling.any():
+            center = per_creature(sa, offset[school], count)
+            heading = per_creature(sa, direction[b[school]], count)
+            steering[schooling] += (COHESION * center[schooling] / (mates[schooling, None] * SCHOOL_RADIUS)
+                                    + ALIGNMENT * heading[schooling] / mates[schooling, None])
+            close = school & (distance < SEPARATION_RADIUS)
+            push = -offset[close] / distance[close, None] * (1 - distance[close, None] / SEPARATION_RADIUS)
+            steering += SEPARATION * per_creature(a[close], push, count)
+
+        # Prey flee predators that are large enough to eat them
+        threat = prey_a & ~prey_b & (distance < FLEE_RADIUS) & (size[b] > size[a] * EAT_FACTOR)
+        away = -offset[threat] / distance[threat, None] * (1 - distance[threat, None] / FLEE_RADIUS)
+        steering += FLEE * per_creature(a[threat], away, count)
+
+        chasing = np.zeros(count, dtype=bool)
+        if player_pos is not None:
+            # With several players (one row each) everyone reacts to the nearest
+            players = np.asarray(player_pos, dtype=np.float64).reshape(-1, 2)
+            if player_size is not None:
+                player_sizes = np.broadcast_to(np.asarray(player_size), (len(players),))
+                players = players + player_sizes[:, None] / 2
+            offsets = players[None, :, :] - centers[thinkers][:, None, :]
+            distances = np.hypot(offsets[:, :, 0], offsets[:, :, 1])
+            nearest = np.argmin(distances, axis=1)
+            rows = np.arange(len(thinkers))
+            to_player = offsets[rows, nearest]
+            distance_to_player = distances[rows, nearest]
+            near = distance_to_player > 0
+
+            # ...and a player big enough to eat them
+            if player_size is not None:
+                target_size = player_sizes[nearest]
+                fleeing = (near & ~is_predator[thinkers] & (distance_to_player < FLEE_RADIUS)
+                           & (target_size > size[thinkers] * EAT_FACTOR))
+                f = thinkers[fleeing]
+                d = distance_to_player[fleeing, None]
+                steering[f] -= FLEE * to_player[fleeing] / d * (1 - d / FLEE_RADIUS)
+
+            # Predators chase the player within range
+            chase = near & is_predator[thinkers] & (distance_to_player < CHASE_RADIUS)
+            c = thinkers[chase]
+            direction[c] = to_player[chase] / distance_to_player[chase, None]
+            chasing[c] = True
+
+        # Predators not chasing the player hunt the nearest smaller prey
+        hunt = ~prey_a & prey_b & (distance < HUNT_RADIUS) & (size[b] * EAT_FACTOR < size[a])
+        hunt &= ~chasing[a]
+        if hunt.any():
+            ha, hoffset, hdistance = a[hunt], offset[hunt], distance[hunt]
+            nearest = np.lexsort((hdistance, ha))
+            hunters, first = np.unique(ha[nearest], return_index=True)
+            pick = nearest[first]
+            direction[hunters] = hoffset[pick] / hdistance[pick, None]
+            chasing[hunters] = True
+
+        # Blend prey steering into their current heading
+        idle = thinkers[~chasing[thinkers]]
+        steered = idle[np.any(steering[idle] != 0, axis=1)]
+        if len(steered):
+            blended = direction[steered] + steering[steered]
+            length = np.hypot(blended[:, 0], blended[:, 1])
+            valid = length > 0
+            direction[steered[valid]] = blended[valid] / length[valid, None]
+
+        # Everyone else wanders; the turn chance is scaled so that creatures
+        # re-steered less often still turn about as often as every tick
+        wandering = idle[np.all(steering[idle] == 0, axis=1)]
+        chance = min(1.0, TURN_CHANCE * count / len(thinkers))
+        turning = wandering[self.rng.random(len(wandering)) < chance]
+        if len(turning):
+            turns = self.rng.uniform(-1, 1, size=(len(turning), 2))
+            length = np.hypot(turns[:, 0], turns[:, 1])
+            valid = length > 0
+            direction[turning[valid]] = turns[valid] / length[valid, None]
+
+    def stats(self):
+        return {'thinkers': self.thinkers, 'pairs': self.pairs, 'budget': self.budget}
@@ -0,0 +1,198 @@
+"""Benchmarks for the update, collision, snapshot and render paths.
+
+Runs under SDL's dummy video driver and writes results to JSON so runs can
+be compared between commits:
+
+    python benchmark.py --output bench.json
+    python benchmark.py --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from main import Game, GameState, WINDOW_WIDTH, WINDOW_HEIGHT, BUBBLE_COLOR, init_pygame
+from player import Player
+
+POPULATIONS = [30, 100, 1000, 10000]
+BACKENDS = ['object', 'numpy']
+
+def measure(func, rounds, warmup=3, setup=None):
+    """Time func over rounds calls; setup runs untimed before each call"""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+    samples = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        'rounds': rounds,
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'median_ms': statistics.median(samples) * 1000,
+        'min_ms': samples[0] * 1000,
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+    }
+
+def make_game(population, backend, seed=0):
+    """A playing Game on level 1 scaled to roughly population creatures"""
+    game = Game(backend, seed=seed)
+    game.state = GameState.PLAYING
+    game.creature_manager.spawn_creatures(1, density=population / 30)
+    game.creature_manager.update(game.player.position, game.player.size)
+    return game
+
+def rounds_for(population, base):
+    # Keep the big populations from dominating the run time
+    return max(5, base * 30 // max(30, population))
+
+def bench_population(population, backend, base_rounds):
+    game = make_game(population, backend)
+    manager = game.creature_manager
+    rounds = rounds_for(population, base_rounds)
+    results = {}
+
+    results['spawn_creatures'] = measure(
+        lambda: manager.spawn_creatures(1, density=population / 30), max(3, rounds // 10), warmup=1)
+    results['creature_manager.update'] = measure(
+        lambda: manager.update(game.player.position, game.player.size), rounds)
+
+    def reset_player():
+        # Keep the player alive, stock-sized and the population stable between rounds
+        game.state = GameState.PLAYING
+        game.player = Player(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, 1)
+        if len(manager.prey_group) < population // 2:
+            manager.spawn_creatures(1, density=population / 30)
+            manager.update(game.player.position, game.player.size)
+    results['check_collisions'] = measure(game.check_collisions, rounds, setup=reset_player)
+    game.precise_collisions = True
+    results['check_collisions.precise'] = measure(game.check_collisions, rounds, setup=reset_player)
+    game.precise_collisions = False
+
+    # Snapshot cost and size for the whole session at this population
+    data = game.snapshot()
+    results['snapshot.save'] = {**measure(game.snapshot, rounds), 'bytes': len(data)}
+    results['snapshot.restore'] = {**measure(lambda: game.restore(data), rounds), 'bytes': len(data)}
+
+    results['draw_game'] = measure(game.draw_game, rounds)
+    return results
+
+def bench_collision_tests(count, base_rounds):
+    """Per-pair cost of the rect test alone and with the mask refinement.
+
+    Every creature is moved onto the player so each test is a rect hit and
+    the precise path always reaches the mask overlap.
+    """
+    game = make_game(count, 'object')
+    creatures = game.creature_manager.creatures()[:count]
+    rng = random.Random(0)
+    for creature in creatures:
+        creature.rect.center = (game.player.rect.centerx + rng.randint(-20, 20),
+                                game.player.rect.centery + rng.randint(-20, 20))
+        creature.set_facing(rng.random() < 0.5)
+
+    def test_all():
+        collides = game.collides
+        for creature in creatures:
+            collides(creature)
+    results = {'collide.rect': measure(test_all, base_rounds)}
+    game.precise_collisions = True
+    results['collide.mask'] = measure(test_all, base_rounds)
+    return results
+
+def bench_particles(count, base_rounds):
+    game = make_game(30, 'object')
+    rng = random.Random(0)
+
+    def refill():
+        while len(game.particles) < count:
+            game.add_particles(rng.randint(0, 1024), rng.randint(0, 768), BUBBLE_COLOR, count=5)
+    return {
+        'update_particles': measure(game.update_particles, base_rounds, setup=refill),
+        'draw_particles': measure(game.draw_particles, base_rounds, setup=refill),
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return None
+
+def run_benchmarks(populations=POPULATIONS, backends=BACKENDS, rounds=200, particle_counts=(100, 1000),
+                   collision_counts=(100, 1000)):
+    results = []
+    for backend in backends:
+        for population in populations:
+            for name, stats in bench_population(population, backend, rounds).items():
+                results.append({'name': name, 'backend': backend, 'population': population, **stats})
+                print(f"{name:<26} {backend:<7} {population:>6}  {stats['median_ms']:9.3f} ms")
+    for count in collision_counts:
+        for name, stats in bench_collision_tests(count, rounds).items():
+            results.append({'name': name, 'backend': None, 'population': count, **stats})
+            print(f"{name:<26} {'-':<7} {count:>6}  {stats['median_ms']:9.3f} ms")
+    for count in particle_counts:
+        for name, stats in bench_particles(count, rounds).items():
+            results.append({'name': name, 'backend': None, 'population': count, **stats})
+            print(f"{name:<26} {'-':<7} {count:>6}  {stats['median_ms']:9.3f} ms")
+    return {
+        'revision': git_revision(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+def result_key(result):
+    return (result['name'], result['backend'], result['population'])
+
+def compare(report, baseline_path, threshold=0.10):
+    """Print median changes against a previous report; returns the number of regressions"""
+    with open(baseline_path) as f:
+        baseline = {result_key(r): r for r in json.load(f)['results']}
+    regressions = 0
+    for result in report['results']:
+        old = baseline.get(result_key(result))
+        if not old or old['median_ms'] <= 0:
+            continue
+        change = result['median_ms'] / old['median_ms'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        name, backend, population = result_key(result)
+        print(f"{name:<26} {backend or '-':<7} {population:>6}  "
+              f"{old['median_ms']:9.3f} -> {result['median_ms']:9.3f} ms ({change:+.1%}){flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ocean Hunter benchmarks")
+    parser.add_argument('--output', default='bench.json', help="where to write the JSON report")
+    parser.add_argument('--compare', help="previous JSON report to compare against")
+    parser.add_argument('--populations', type=int, nargs='+', default=POPULATIONS)
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS)
+    parser.add_argument('--rounds', type=int, default=200, help="timed rounds at the stock population")
+    args = parser.parse_args(argv)
+
+    init_pygame(headless=True)
+    report = run_benchmarks(args.populations, args.backends, args.rounds)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.compare:
+        return 1 if compare(report, args.compare) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""Multiplayer client: renders a GameServer's ocean and sends this player's input.
+
+    python client.py --host 127.0.0.1 --port 7777
+
+Snapshots arrive SNAPSHOT_INTERVAL ticks apart. The client draws the
+world INTERPOLATION_DELAY ticks in the past, between the two snapshots
+around that time, so movement stays smooth between them and across late
+packets.
+"""
+import argparse
+import asyncio
+import time
+from collections import deque
+import numpy as np
+import pygame
+
+from main import FPS, BLUE, WHITE, init_pygame
+from player import PLAYER_SPRITES
+from sprite_cache import sprite_cache
+from hud import text_cache
+from replay import keys_to_mask
+from simulation import SNAP_DISTANCE
+from protocol import (PROTOCOL_VERSION, MSG_HELLO, MSG_INPUT, MSG_WELCOME, MSG_SNAPSHOT, HELLO, INPUT, WELCOME,
+                      FACING_RIGHT, ALIVE, QUANTUM, FRAME, ProtocolError, DeltaDecoder, frame, read_message,
+                      decode_snapshot)
+from server import DEFAULT_PORT
+
+# How far behind the newest snapshot the client draws, in ticks (two snapshots at 30 per second)
+INTERPOLATION_DELAY = 4
+
+# Snapshots kept for interpolation
+HISTORY = 16
+
+class Frame:
+    """Creature and player state of one snapshot, in pixels"""
+    __slots__ = ('tick', 'ids', 'positions', 'flags', 'specs', 'players')
+
+    def __init__(self, tick, ids, positions, flags, specs, players):
+        self.tick = tick
+        self.ids = ids
+        self.positions = positions
+        self.flags = flags
+        self.specs = specs
+        self.players = players
+
+def lerp(a, b, a_ids, b_ids, alpha):
+    """Positions of b's ids, moved back toward a for ids in both that didn't jump"""
+    positions = b.copy()
+    _, ia, ib = np.intersect1d(a_ids, b_ids, assume_unique=True, return_indices=True)
+    delta = positions[ib] - a[ia]
+    smooth = np.all(np.abs(delta) <= SNAP_DISTANCE, axis=1)
+    positions[ib[smooth]] = a[ia[smooth]] + delta[smooth] * alpha
+    return positions
+
+class NetworkClient:
+    """Connection to a GameServer, the state it describes and its recent history"""
+    def __init__(self, interpolation_delay=INTERPOLATION_DELAY):
+        self.decoder = DeltaDecoder()
+        self.history = deque(maxlen=HISTORY)
+        self.interpolation_delay = interpolation_delay
+        self.reader = None
+        self.writer = None
+        self.receiver = None
+        self.player_id = None
+        self.tick_rate = FPS
+        self.snapshot_interval = 1
+        self.world_size = None
+        self.input_mask = None
+        self.clock = None
+
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.snapshots = 0
+        self.keyframes = 0
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.send(MSG_HELLO, HELLO.pack(PROTOCOL_VERSION))
+        msg_type, payload = await read_message(self.reader)
+        if msg_type != MSG_WELCOME:
+            raise ProtocolError("Expected a WELCOME")
+        self.bytes_received += FRAME.size + len(payload)
+        self.player_id, self.tick_rate, self.snapshot_interval, width, height = WELCOME.unpack(payload)
+        self.world_size = (width, height)
+
+    def start(self):
+        """Receive snapshots in a background task"""
+        self.receiver = asyncio.create_task(self.receive())
+
+    def send(self, msg_type, payload):
+        data = frame(msg_type, payload)
+        self.writer.write(data)
+        self.bytes_sent += len(data)
+
+    def send_input(self, mask):
+        """Send the input mask if it changed since the last one"""
+        if mask != self.input_mask:
+            self.input_mask = mask
+            self.send(MSG_INPUT, INPUT.pack(mask))
+
+    async def receive(self):
+        """Apply snapshots until the server closes the connection"""
+        try:
+            while True:
+                msg_type, payload = await read_message(self.reader)
+                self.bytes_received += FRAME.size + len(payload)
+                if msg_type == MSG_SNAPSHOT:
+                    self.apply(decode_snapshot(payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def apply(self, snapshot):
+        self.decoder.apply(snapshot)
+        self.snapshots += 1
+        self.keyframes += snapshot.keyframe
+        decoder = self.decoder
+        ids, positions, flags = decoder.creatures()
+        players = decoder.players
+        player_positions = np.stack([players['x'], players['y']], axis=1).astype(np.float64) / QUANTUM
+        self.history.append(Frame(snapshot.tick, ids, positions, flags, decoder.spec[ids],
+                                  (players, player_positions)))
+
+    def advance(self, seconds):
+        """Move the render clock, easing it toward interpolation_delay ticks behind the newest snapshot"""
+        if not self.history:
+            return
+        target = self.history[-1].tick - self.interpolation_delay
+        if self.clock is None or abs(target - self.clock) > 4 * self.interpolation_delay:
+            self.clock = float(target)
+        else:
+            self.clock += seconds * self.tick_rate
+            self.clock += (target - self.clock) * 0.1
+
+    def interpolated(self):
+        """(creatures, players) at the render clock.
+
+        creatures is (ids, positions, flags, specs) and players is (records,
+        positions), both in pixels.
+        """
+        history = self.history
+        if not history:
+            return None
+        b = history[-1]
+        a = None
+        for older, newer in zip(list(history)[:-1], list(history)[1:]):
+            if older.tick <= self.clock < newer.tick:
+                a, b = older, newer
+                break
+        if a is None:
+            return (b.ids, b.positions, b.flags, b.specs), b.players
+        alpha = (self.clock - a.tick) / (b.tick - a.tick)
+        positions = lerp(a.positions, b.positions, a.ids, b.ids, alpha)
+        records, player_positions = b.players
+        player_positions = lerp(a.players[1], player_positions, a.players[0]['id'], records['id'], alpha)
+        return (b.ids, positions, b.flags, b.specs), (records, player_positions)
+
+    def close(self):
+        if self.receiver:
+            self.receiver.cancel()
+        if self.writer:
+            self.writer.close()
+
+def draw(screen, client):
+    screen.fill(BLUE)
+    state = client.interpolated()
+    if state is None:
+        return
+    (ids, positions, flags, specs), (records, player_positions) = state
+    decoder_specs = client.decoder.specs
+    screen.blits([(sprite_cache.get(decoder_specs[spec][4], decoder_specs[spec][1], bool(flag & FACING_RIGHT),
+                                    decoder_specs[spec][3]), position)
+                  for position, flag, spec in zip(positions.tolist(), flags.tolist(), specs.tolist())],
+                 doreturn=False)
+
+    sprite_name = PLAYER_SPRITES.get(client.decoder.level, "small_fish.png")
+    for record, position in zip(records.tolist(), player_positions.tolist()):
+        player_id, player_flags, size, _, _, score = record
+        if not player_flags & ALIVE:
+            continue
+        image = sprite_cache.get(sprite_name, size, bool(player_flags & FACING_RIGHT), (255, 165, 0))
+        rect = screen.blit(image, position)
+        if player_id == client.player_id:
+            pygame.draw.rect(screen, WHITE, rect, 1)
+
+    y = 10
+    for player_id, player_flags, _, _, _, score in sorted(records.tolist(), key=lambda r: -r[5]):
+        you = ' (you)' if player_id == client.player_id else ''
+        screen.blit(text_cache.render(f"Player {player_id + 1}{you}: {score}", 28, WHITE), (10, y))
+        y += 24
+    screen.blit(text_cache.render(f"Level {client.decoder.level}", 28, WHITE), (screen.get_width() - 100, 10))
+
+async def play(host, port):
+    client = NetworkClient()
+    await client.connect(host, port)
+    screen = pygame.display.set_mode(client.world_size)
+    pygame.display.set_caption(f"Ocean Hunter - player {client.player_id + 1}")
+    client.start()
+    last = time.perf_counter()
+    try:
+        while not client.receiver.done():
+            events = pygame.event.get()
+            if any(e.type == pygame.QUIT or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE)
+                   for e in events):
+                break
+            client.send_input(keys_to_mask(pygame.key.get_pressed()))
+            now = time.perf_counter()
+            client.advance(now - last)
+            last = now
+            draw(screen, client)
+            pygame.display.flip()
+            # Yield to the network task for the rest of the frame
+            await asyncio.sleep(max(0, 1 / FPS - (time.perf_counter() - now)))
+    finally:
+        client.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ocean Hunter multiplayer client")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    init_pygame()
+    asyncio.run(play(args.host, args.port))
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
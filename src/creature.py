@@ -1,11 +1,24 @@
 import pygame
 import random
 import math
-import os
+import numpy as np
+from collections import deque
+from sprite_cache import sprite_cache
+from simulation import CreatureSimulation, TURN_CHANCE, CHASE_RADIUS
+from spatial import SpatialHash, rect_array, overlaps
+from behavior import BehaviorEngine
 
 class Creature(pygame.sprite.Sprite):
-    def __init__(self, x, y, size, speed, color, is_predator=False, sprite_name=None):
+    # Size of the world the creature wraps around in (set by its manager)
+    world_size = (1024, 768)
+    
+    def __init__(self, x, y, size, speed, color, is_predator=False, sprite_name=None, rng=random):
         super().__init__()
+        self.reset(x, y, size, speed, color, is_predator, sprite_name, rng)
+        
+    def reset(self, x, y, size, speed, color, is_predator=False, sprite_name=None, rng=random):
+        """(Re)initialize the creature so pooled instances can be reused"""
+        self.rng = rng
         self.size = size
         self.speed = speed
         self.is_predator = is_predator
@@ -19,137 +32,408 @@ class Creature(pygame.sprite.Sprite):
         
         # Movement attributes
         self.position = pygame.math.Vector2(x, y)
-        self.direction = pygame.math.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
+        self.direction = pygame.math.Vector2(rng.uniform(-1, 1), rng.uniform(-1, 1))
+        if self.direction.length_squared() > 0:
+            self.direction.normalize_ip()
+        else:
+            self.direction.x = 1
         self.target = None
+        self.sim_index = None
         
     def load_sprite(self, sprite_name, fallback_color):
-        # Default colored rectangle as fallback
-        self.image = pygame.Surface([self.size, self.size])
-        self.image.fill(fallback_color)
-        
-        # Try to load sprite if provided
-        if sprite_name:
-            try:
-                img_path = os.path.join(os.path.dirname(__file__), "..", "assets", "images", sprite_name)
-                if os.path.exists(img_path):
-                    self.image = pygame.image.load(img_path).convert_alpha()
-                    self.image = pygame.transform.scale(self.image, (self.size, self.size))
-            except pygame.error:
-                pass  # Keep default rectangle if sprite loading fails
-        
-    def update(self, player_pos=None):
-        old_x = self.position.x
+        # Shared, pre-scaled surfaces (colored rectangle if the sprite is missing)
+        self.sprite_name = sprite_name
+        self.fallback_color = fallback_color
+        self.image_right, self.image_left = sprite_cache.get_pair(sprite_name, self.size, fallback_color)
+        self.image = self.image_right if self.facing_right else self.image_left
+    
+    @property
+    def spec(self):
+        """(is_predator, size, speed, color, sprite_name), as level_specs() lists them"""
+        return (self.is_predator, self.size, self.speed, self.fallback_color, self.sprite_name)
+    
+    @property
+    def mask(self):
+        """Cached collision mask of the current image (used by collide_mask)"""
+        return sprite_cache.get_mask(self.sprite_name, self.size, self.facing_right, self.fallback_color)
+    
+    def set_facing(self, facing_right):
+        """Swap to the pre-built surface for a new facing direction"""
+        if facing_right != self.facing_right:
+            self.facing_right = facing_right
+            self.image = self.image_right if facing_right else self.image_left
         
+    def update(self, player_pos=None, ticks=1):
         if self.is_predator and player_pos:
             # Predators chase the player
             to_player = pygame.math.Vector2(player_pos) - self.position
-            if to_player.length() < 300:  # Only chase within range
+            if 0 < to_player.length() < CHASE_RADIUS:  # Only chase within range
                 self.direction = to_player.normalize()
         else:
             # Random movement with occasional direction changes
-            if random.random() < 0.02:  # 2% chance to change direction each frame
-                self.direction = pygame.math.Vector2(
-                    random.uniform(-1, 1),
-                    random.uniform(-1, 1)
-                ).normalize()
+            if self.rng.random() < TURN_CHANCE:  # 2% chance to change direction each frame
+                direction = pygame.math.Vector2(
+                    self.rng.uniform(-1, 1),
+                    self.rng.uniform(-1, 1)
+                )
+                # A zero-length roll keeps the previous direction
+                if direction.length_squared() > 0:
+                    self.direction = direction.normalize()
+        
+        self.move(ticks)
+    
+    def move(self, ticks=1):
+        """Swim ticks frames' worth along the current direction"""
+        old_x = self.position.x
         
         # Update position
-        self.position += self.direction * self.speed
+        self.position += self.direction * (self.speed * ticks)
         
         # Update facing direction
         if self.position.x > old_x:
-            self.facing_right = True
+            self.set_facing(True)
         elif self.position.x < old_x:
-            self.facing_right = False
+            self.set_facing(False)
         
-        # Wrap around screen edges
+        # Wrap around world edges
+        width, height = self.world_size
         if self.position.x < 0:
-            self.position.x = 1024
-        elif self.position.x > 1024:
+            self.position.x = width
+        elif self.position.x > width:
             self.position.x = 0
         if self.position.y < 0:
-            self.position.y = 768
-        elif self.position.y > 768:
+            self.position.y = height
+        elif self.position.y > height:
             self.position.y = 0
             
         # Update rectangle position
         self.rect.x = self.position.x
         self.rect.y = self.position.y
         
-        # Flip sprite based on direction
-        if not self.facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
-        
+# Creatures spawned on each level: (count, size, speed, color, sprite_name)
+LEVEL_SPAWNS = {
+    1: {  # Small Fish World
+        'prey': [
+            (15, 10, 2, (0, 255, 0), "plankton.png"),      # Plankton (tiny prey)
+            (10, 15, 3, (0, 255, 255), "tiny_fish.png"),   # Small fish
+        ],
+        'predators': [
+            (5, 40, 4, (255, 0, 0), "medium_fish.png"),    # Medium fish
+        ],
+    },
+    2: {  # Crab's Domain
+        'prey': [
+            (12, 20, 3, (255, 192, 203), "shrimp.png"),    # Small fish and shrimp
+        ],
+        'predators': [
+            (6, 45, 3.5, (128, 0, 128), "octopus.png"),    # Octopus and large crabs
+        ],
+    },
+    3: {  # Sea Snake Adventure
+        'prey': [
+            (8, 25, 4, (255, 215, 0), "medium_fish.png"),  # Medium fish
+        ],
+        'predators': [
+            (4, 50, 4.5, (139, 69, 19), "moray_eel.png"),  # Sharks and moray eels
+        ],
+    },
+    4: {  # Shark Territory
+        'prey': [
+            (6, 30, 4.5, (70, 130, 180), "sea_snake.png"), # Large fish and sea snakes
+        ],
+        'predators': [
+            (3, 60, 5, (0, 0, 0), "killer_whale.png"),     # Killer whales
+        ],
+    },
+}
+
+def level_specs(level, density=1):
+    """(is_predator, size, speed, color, sprite_name) of every creature a level spawns, prey first"""
+    spawns = LEVEL_SPAWNS.get(level)
+    specs = []
+    if spawns:
+        for is_predator, group in ((False, spawns['prey']), (True, spawns['predators'])):
+            for count, size, speed, color, sprite_name in group:
+                specs.extend([(is_predator, size, speed, color, sprite_name)] * max(1, round(count * density)))
+    return specs
+
+def level_sprites(level):
+    """Sprite files used by a level's creatures, for prefetching"""
+    spawns = LEVEL_SPAWNS.get(level, {})
+    return {spec[4] for group in spawns.values() for spec in group}
+
+# Creatures spawned per tick while trickle-spawning a level
+TRICKLE_PER_TICK = 4
+
 class CreatureManager:
-    def __init__(self):
+    """Owns the prey and predator sprite groups.
+
+    backend selects how creatures are moved: "object" calls Creature.update
+    on every sprite, "numpy" advances the whole population in one batched
+    CreatureSimulation step. ai selects how they steer: "classic" uses the
+    original wander-and-chase rules, "schooling" the neighbor-aware
+    BehaviorEngine. All randomness comes from rng (or a random.Random(seed)
+    when no rng is given) so runs are reproducible. With the numpy backend
+    sprite positions and rects are only brought up to date by creatures(),
+    or for the creatures returned by nearby(); draw() blits from the arrays.
+
+    Creatures are pooled: release() returns an eaten creature to a free list
+    and spawning reuses free creatures before constructing new ones. A level
+    can also be trickle-spawned, a few creatures per tick, instead of in one
+    burst. Managers can share one pool by passing the same pool list.
+    
+    Creatures spawn in and wrap around a world of world_size.
+    spatial_index is rebuilt from the creatures' rects after every update,
+    and before a query when creatures were spawned or dropped since.
+    """
+    def __init__(self, backend="object", seed=None, trickle_per_tick=TRICKLE_PER_TICK, rng=None,
+                 ai="classic", world_size=(1024, 768), pool=None):
         self.prey_group = pygame.sprite.Group()
         self.predator_group = pygame.sprite.Group()
+        self.backend = backend
+        self.rng = rng or random.Random(seed)
+        self.simulation = None
+        self.world_size = world_size
+        if backend == "numpy":
+            self.simulation = CreatureSimulation(self.rng.getrandbits(64), *world_size)
+        self.ai = ai
+        self.behavior = None
+        if ai == "schooling":
+            self.behavior = BehaviorEngine(self.rng.getrandbits(64))
+        self.spatial_index = SpatialHash()
+        self.index_stale = False
         
-    def spawn_creatures(self, level):
-        # Clear existing creatures
-        self.prey_group.empty()
-        self.predator_group.empty()
-        
-        if level == 1:  # Small Fish World
-            # Spawn plankton (tiny prey)
-            for _ in range(15):
-                self._spawn_prey(size=10, speed=2, color=(0, 255, 0),
-                               sprite_name="plankton.png")
-            # Spawn small fish (prey)
-            for _ in range(10):
-                self._spawn_prey(size=15, speed=3, color=(0, 255, 255),
-                               sprite_name="tiny_fish.png")
-            # Spawn medium fish (predators)
-            for _ in range(5):
-                self._spawn_predator(size=40, speed=4, color=(255, 0, 0),
-                                   sprite_name="medium_fish.png")
-                
-        elif level == 2:  # Crab's Domain
-            # Spawn small fish and shrimp
-            for _ in range(12):
-                self._spawn_prey(size=20, speed=3, color=(255, 192, 203),
-                               sprite_name="shrimp.png")
-            # Spawn octopus and large crabs
-            for _ in range(6):
-                self._spawn_predator(size=45, speed=3.5, color=(128, 0, 128),
-                                   sprite_name="octopus.png")
-                
-        elif level == 3:  # Sea Snake Adventure
-            # Spawn medium fish
-            for _ in range(8):
-                self._spawn_prey(size=25, speed=4, color=(255, 215, 0),
-                               sprite_name="medium_fish.png")
-            # Spawn sharks and moray eels
-            for _ in range(4):
-                self._spawn_predator(size=50, speed=4.5, color=(139, 69, 19),
-                                   sprite_name="moray_eel.png")
-                
-        elif level == 4:  # Shark Territory
-            # Spawn large fish and sea snakes
-            for _ in range(6):
-                self._spawn_prey(size=30, speed=4.5, color=(70, 130, 180),
-                               sprite_name="sea_snake.png")
-            # Spawn killer whales
-            for _ in range(3):
-                self._spawn_predator(size=60, speed=5, color=(0, 0, 0),
-                                   sprite_name="killer_whale.png")
+        # Creature pool
+        self.free = pool if pool is not None else []
+        self.pending = deque()
+        self.trickle_per_tick = trickle_per_tick
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        
+    def spawn_creatures(self, level, density=1, trickle=False):
+        """Spawn a level's population; density scales every count (stress levels).
+        
+        With trickle the creatures are queued and spawned trickle_per_tick at
+        a time by update().
+        """
+        # Return existing creatures to the pool
+        self.release_all()
+        self.pending.clear()
+        self.pending.extend(level_specs(level, density))
+        
+        if self.simulation is not None:
+            self.simulation.load([])
+        if not trickle:
+            self.spawn_pending(len(self.pending))
+    
+    @property
+    def spawning(self):
+        """True while a trickle spawn still has creatures queued"""
+        return bool(self.pending)
+    
+    def level_complete(self):
+        """Every prey of the level has been spawned and eaten"""
+        return len(self.prey_group) == 0 and not self.spawning
+    
+    def spawn(self, specs, area, rng):
+        """Spawn creatures from level_specs() entries at random points of area"""
+        spawned = []
+        for is_predator, size, speed, color, sprite_name in specs:
+            x = rng.randint(area.left, area.right)
+            y = rng.randint(area.top, area.bottom)
+            spawned.append(self._spawn(is_predator, size, speed, color, sprite_name, x, y))
+        if self.simulation is not None:
+            self.simulation.append(spawned)
+        return spawned
+    
+    def restore(self, entries):
+        """Respawn saved (spec, x, y, dx, dy) entries with their position and heading"""
+        restored = []
+        for spec, x, y, dx, dy in entries:
+            creature = self._spawn(*spec, x=x, y=y)
+            creature.direction.update(dx, dy)
+            restored.append(creature)
+        if self.simulation is not None:
+            self.simulation.append(restored)
+        return restored
+    
+    def detach(self, creature):
+        """Take a creature out of this manager without returning it to the pool"""
+        if self.simulation is not None:
+            # The arrays hold the current position and heading; copy them back first
+            index = creature.sim_index
+            self.simulation.sync_sprites([index])
+            creature.direction.update(self.simulation.direction[index].tolist())
+            self.simulation.remove(creature)
+        creature.kill()
+    
+    def adopt(self, creatures):
+        """Take over creatures detached from another manager"""
+        for creature in creatures:
+            (self.predator_group if creature.is_predator else self.prey_group).add(creature)
+        if self.simulation is not None:
+            self.simulation.append(creatures)
+    
+    def spawn_pending(self, count):
+        spawned = []
+        while self.pending and len(spawned) < count:
+            is_predator, size, speed, color, sprite_name = self.pending.popleft()
+            spawned.append(self._spawn(is_predator, size, speed, color, sprite_name))
+        if self.simulation is not None:
+            self.simulation.append(spawned)
+        self.index_stale = True
+    
+    def _spawn(self, is_predator, size, speed, color, sprite_name=None, x=None, y=None):
+        if x is None:
+            x = self.rng.randint(0, self.world_size[0])
+            y = self.rng.randint(0, self.world_size[1])
+        if self.free:
+            creature = self.free.pop()
+            creature.reset(x, y, size, speed, color, is_predator=is_predator,
+                           sprite_name=sprite_name, rng=self.rng)
+            self.reused += 1
+        else:
+            creature = Creature(x, y, size, speed, color, is_predator=is_predator,
+                              sprite_name=sprite_name, rng=self.rng)
+            self.created += 1
+        creature.world_size = self.world_size
+        (self.predator_group if is_predator else self.prey_group).add(creature)
+        return creature
     
     def _spawn_prey(self, size, speed, color, sprite_name=None):
-        x = random.randint(0, 1024)
-        y = random.randint(0, 768)
-        creature = Creature(x, y, size, speed, color, is_predator=False,
-                          sprite_name=sprite_name)
-        self.prey_group.add(creature)
+        return self._spawn(False, size, speed, color, sprite_name)
         
     def _spawn_predator(self, size, speed, color, sprite_name=None):
-        x = random.randint(0, 1024)
-        y = random.randint(0, 768)
-        creature = Creature(x, y, size, speed, color, is_predator=True,
-                          sprite_name=sprite_name)
-        self.predator_group.add(creature)
-        
-    def update(self, player_pos):
-        for creature in self.prey_group:
-            creature.update()
-        for creature in self.predator_group:
-            creature.update(player_pos) 
\ No newline at end of file
+        return self._spawn(True, size, speed, color, sprite_name)
+    
+    def release(self, creature):
+        """Remove a creature from play and return it to the pool"""
+        if self.simulation is not None:
+            self.simulation.remove(creature)
+        creature.kill()
+        self.free.append(creature)
+        self.released += 1
+    
+    def release_all(self):
+        for creature in self.creatures():
+            self.release(creature)
+    
+    def pool_stats(self):
+        return {
+            'active': len(self.prey_group) + len(self.predator_group),
+            'free': len(self.free),
+            'pending': len(self.pending),
+            'created': self.created,
+            'reused': self.reused,
+            'released': self.released,
+        }
+    
+    def creatures(self):
+        """All live creatures, prey first"""
+        if self.simulation is not None:
+            self.simulation.sync_sprites()
+        return self.prey_group.sprites() + self.predator_group.sprites()
+    
+    def nearby(self, rect):
+        """Live creatures whose rects overlap rect, split into (prey, predators)"""
+        if self.index_stale:
+            self.rebuild_index()
+        hits = self.spatial_index.query(rect)
+        if self.simulation is not None:
+            self.simulation.sync_sprites(hits)
+        prey, predators = [], []
+        for i in hits.tolist():
+            creature = self.spatial_index.items[i]
+            if creature.alive():
+                (predators if creature.is_predator else prey).append(creature)
+        return prey, predators
+    
+    def rebuild_index(self):
+        if self.simulation is not None:
+            # Index positions refer to the arrays, so drop removed slots first
+            self.drop_killed()
+            self.spatial_index.rebuild(self.simulation.creatures, self.simulation.rects())
+        else:
+            creatures = self.creatures()
+            self.spatial_index.rebuild(creatures, rect_array(creatures))
+        self.index_stale = False
+    
+    def draw(self, surface, collect_rects=False, view=None, alpha=1.0):
+        """Draw prey, then predators; returns the rects drawn when collect_rects is set.
+        
+        With a view rect only creatures overlapping it are drawn, shifted so
+        the view's top-left corner lands on the surface's origin. alpha < 1
+        draws the numpy backend's creatures that far from where they were
+        before the last step; sprite rects are interpolated by Game.draw.
+        """
+        if self.simulation is None:
+            if view is None:
+                self.prey_group.draw(surface)
+                self.predator_group.draw(surface)
+                if collect_rects:
+                    return list(self.prey_group.spritedict.values()) + list(self.predator_group.spritedict.values())
+                return []
+            x, y = view.topleft
+            drawn = surface.blits([(creature.image, creature.rect.move(-x, -y))
+                                   for group in (self.prey_group, self.predator_group) for creature in group
+                                   if view.colliderect(creature.rect)], doreturn=collect_rects)
+            return drawn if collect_rects else []
+        # Blit straight from the arrays instead of syncing every rect
+        self.drop_killed()
+        simulation = self.simulation
+        rects = simulation.rects() if alpha >= 1 else simulation.interpolated_rects(alpha)
+        order = np.argsort(simulation.is_predator, kind='stable')
+        if view is not None:
+            order = order[overlaps(rects[order], tuple(view))]
+            rects[:, :2] -= view.topleft
+        x, y = rects[order, :2].T.tolist()
+        creatures = simulation.creatures
+        images = [creatures[i].image for i in order.tolist()]
+        # A generator of short-lived tuples keeps the cyclic GC from running
+        drawn = surface.blits(zip(images, zip(x, y)), doreturn=collect_rects)
+        return drawn if collect_rects else []
+    
+    def drop_killed(self):
+        """Drop creatures removed since the last step from the arrays"""
+        simulation = self.simulation
+        if simulation.live_count != len(self.prey_group) + len(self.predator_group):
+            # Killed without release()
+            simulation.remove_dead()
+        if simulation.removed:
+            simulation.compact()
+            self.index_stale = True
+        
+    def update(self, player_pos, player_size=None, ticks=1):
+        """Advance every creature; ticks > 1 moves them that many frames' worth in one step"""
+        if self.pending:
+            self.spawn_pending(self.trickle_per_tick)
+        
+        if self.simulation is not None:
+            self.drop_killed()
+            self.simulation.step(player_pos, self.behavior, player_size, ticks)
+        elif self.behavior is not None:
+            self.steer_objects(player_pos, player_size, ticks)
+        else:
+            for creature in self.prey_group:
+                creature.update(None, ticks)
+            for creature in self.predator_group:
+                creature.update(player_pos, ticks)
+        
+        # Re-bucket everyone at their new positions for this tick's queries
+        self.rebuild_index()
+    
+    def steer_objects(self, player_pos, player_size, ticks=1):
+        """Run the behavior engine over arrays gathered from the sprites"""
+        creatures = self.creatures()
+        if not creatures:
+            return
+        position = np.array([tuple(c.position) for c in creatures], dtype=np.float64)
+        direction = np.array([tuple(c.direction) for c in creatures], dtype=np.float64)
+        size = np.array([c.size for c in creatures], dtype=np.int32)
+        is_predator = np.array([c.is_predator for c in creatures], dtype=bool)
+        self.behavior.steer(position, direction, size, is_predator,
+                            None if player_pos is None else tuple(player_pos), player_size)
+        for creature, heading in zip(creatures, direction.tolist()):
+            creature.direction.update(heading)
+            creature.move(ticks)
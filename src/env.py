@@ -0,0 +1,278 @@
+"""Gym-style environment and process-pool runner for automated players.
+
+    python env.py --envs 8 --processes 4 --steps 2000
+
+measures environment steps per second per core.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+import pygame
+
+from main import Game, GameState, WINDOW_WIDTH, WINDOW_HEIGHT, init_pygame
+from replay import MASK_KEYS, INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_DOWN
+
+# Discrete actions as input bitmasks: idle, 4 directions, 4 diagonals
+ACTIONS = (
+    0,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_UP, INPUT_DOWN,
+    INPUT_LEFT | INPUT_UP, INPUT_RIGHT | INPUT_UP,
+    INPUT_LEFT | INPUT_DOWN, INPUT_RIGHT | INPUT_DOWN,
+)
+
+# Features per row of an entity observation
+ENTITY_FEATURES = 4
+
+def observation_spec(observation='entities', max_creatures=32, frame_size=(64, 48), **_):
+    """(shape, dtype) of one observation for the given OceanHunterEnv arguments"""
+    if observation == 'pixels':
+        return (frame_size[1], frame_size[0], 3), np.uint8
+    if observation == 'entities':
+        return (max_creatures + 1, ENTITY_FEATURES), np.float32
+    raise ValueError(f"Unknown observation type: {observation}")
+
+class OceanHunterEnv:
+    """reset()/step(action) wrapper around one headless Game.
+
+    Observations are NumPy arrays. "entities" gives a (max_creatures + 1, 4)
+    float32 array: the player's normalized position and size, then the
+    nearest creatures as (dx, dy, size relative to the player, is_predator),
+    zero-padded. "pixels" gives a (height, width, 3) uint8 downscaled frame.
+    The reward is the score gained during the step; an episode terminates
+    when the player is eaten and is truncated after max_steps.
+    """
+    def __init__(self, observation='entities', max_creatures=32, frame_size=(64, 48),
+                 max_steps=3600, backend='object', seed=None):
+        self.observation_shape, self.observation_dtype = observation_spec(
+            observation, max_creatures, frame_size)
+        if not pygame.display.get_init():
+            init_pygame(headless=True)
+        self.observation = observation
+        self.max_creatures = max_creatures
+        self.frame_size = frame_size
+        self.max_steps = max_steps
+        self.backend = backend
+        self.seed_rng = np.random.default_rng(seed)
+        self.game = None
+        self.steps = 0
+        self.frame = None
+
+    @property
+    def action_count(self):
+        return len(ACTIONS)
+
+    def reset(self, seed=None, out=None):
+        """Start a new episode; returns (observation, info)"""
+        if seed is None:
+            seed = int(self.seed_rng.integers(2**32))
+        # Later episodes reuse the window, assets and creature pool
+        if self.game is None:
+            self.game = Game(self.backend, seed=seed)
+        else:
+            self.game.new_session(seed)
+        self.game.start()
+        self.steps = 0
+        return self.observe(out), {'seed': seed}
+
+    def step(self, action, out=None):
+        """Advance one tick; returns (observation, reward, terminated, truncated, info)"""
+        game = self.game
+        score = game.score
+        game.update(MASK_KEYS[ACTIONS[action]])
+        self.steps += 1
+        terminated = game.state == GameState.GAME_OVER
+        truncated = not terminated and self.steps >= self.max_steps
+        info = {'score': game.score, 'level': game.current_level}
+        return self.observe(out), float(game.score - score), terminated, truncated, info
+
+    def observe(self, out=None):
+        if out is None:
+            out = np.empty(self.observation_shape, dtype=self.observation_dtype)
+        if self.observation == 'pixels':
+            self.observe_pixels(out)
+        else:
+            self.observe_entities(out)
+        return out
+
+    def observe_entities(self, out):
+        player = self.game.player
+        px, py = player.rect.center
+        out.fill(0)
+        out[0] = (px / WINDOW_WIDTH, py / WINDOW_HEIGHT, player.size / 100, 1)
+
+        creatures = self.game.creature_manager.creatures()
+        if not creatures:
+            return
+        data = np.array([(c.rect.centerx, c.rect.centery, c.size, c.is_predator) for c in creatures],
+                        dtype=np.float32)
+        offsets = data[:, :2] - (px, py)
+        nearest = np.argsort(np.einsum('ij,ij->i', offsets, offsets))[:self.max_creatures]
+        rows = out[1:1 + len(nearest)]
+        rows[:, 0] = offsets[nearest, 0] / WINDOW_WIDTH
+        rows[:, 1] = offsets[nearest, 1] / WINDOW_HEIGHT
+        rows[:, 2] = data[nearest, 2] / player.size
+        rows[:, 3] = data[nearest, 3]
+
+    def observe_pixels(self, out):
+        game = self.game
+        game.draw_background()
+        game.draw_scene()
+        game.draw_particles()
+        if self.frame is None:
+            self.frame = pygame.Surface(self.frame_size)
+        pygame.transform.smoothscale(game.screen, self.frame_size, self.frame)
+        # surfarray is (width, height, 3); observations are (height, width, 3)
+        out[:] = pygame.surfarray.pixels3d(self.frame).transpose(1, 0, 2)
+
+def worker(pipe, indices, shm_name, shape, dtype, env_kwargs, seed):
+    """Process-pool worker stepping a slice of the environments"""
+    init_pygame(headless=True)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    observations = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    envs = [OceanHunterEnv(seed=seed + i, **env_kwargs) for i in indices]
+    try:
+        while True:
+            command, data = pipe.recv()
+            if command == 'reset':
+                for env, i in zip(envs, indices):
+                    env.reset(out=observations[i])
+                pipe.send(None)
+            elif command == 'step':
+                results = []
+                for env, i in zip(envs, indices):
+                    _, reward, terminated, truncated, info = env.step(data[i], out=observations[i])
+                    if terminated or truncated:
+                        # Auto-reset; the reported observation is the new episode's first
+                        info['final_score'] = info['score']
+                        env.reset(out=observations[i])
+                    results.append((reward, terminated, truncated, info))
+                pipe.send(results)
+            elif command == 'close':
+                break
+    finally:
+        del observations
+        shm.close()
+        pipe.close()
+
+class VectorEnv:
+    """Steps num_envs environments across a multiprocessing pool.
+
+    Observations of every environment live in one shared-memory array
+    (num_envs, *observation_shape), written in place by the workers, so only
+    actions, rewards and flags cross the pipes. Finished episodes reset
+    automatically.
+    """
+    def __init__(self, num_envs, processes=None, seed=0, **env_kwargs):
+        self.num_envs = num_envs
+        self.processes = max(1, min(processes or os.cpu_count() or 1, num_envs))
+        shape, self.dtype = observation_spec(**env_kwargs)
+        self.shape = (num_envs,) + shape
+        self.action_count = len(ACTIONS)
+
+        nbytes = int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+        self.observations = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+        context = multiprocessing.get_context('spawn')
+        self.pipes = []
+        self.workers = []
+        for p in range(self.processes):
+            indices = list(range(p, num_envs, self.processes))
+            parent, child = context.Pipe()
+            proc = context.Process(target=worker, daemon=True,
+                                   args=(child, indices, self.shm.name, self.shape, self.dtype,
+                                         env_kwargs, seed))
+            proc.start()
+            child.close()
+            self.pipes.append((parent, indices))
+            self.workers.append(proc)
+        self.closed = False
+
+    def reset(self):
+        for pipe, _ in self.pipes:
+            pipe.send(('reset', None))
+        for pipe, _ in self.pipes:
+            pipe.recv()
+        return self.observations
+
+    def step(self, actions):
+        """Step every environment; returns (observations, rewards, terminated, truncated, infos)"""
+        actions = list(actions)
+        for pipe, _ in self.pipes:
+            pipe.send(('step', actions))
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        infos = [None] * self.num_envs
+        for pipe, indices in self.pipes:
+            for i, (reward, term, trunc, info) in zip(indices, pipe.recv()):
+                rewards[i] = reward
+                terminated[i] = term
+                truncated[i] = trunc
+                infos[i] = info
+        return self.observations, rewards, terminated, truncated, infos
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for pipe, _ in self.pipes:
+            try:
+                pipe.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self.workers:
+            proc.join(timeout=5)
+        del self.observations
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def measure_throughput(num_envs=8, processes=None, steps=1000, seed=0, **env_kwargs):
+    """Random-action rollout; returns steps per second overall and per core"""
+    rng = np.random.default_rng(seed)
+    with VectorEnv(num_envs, processes, seed=seed, **env_kwargs) as envs:
+        envs.reset()
+        start = time.perf_counter()
+        episodes = 0
+        for _ in range(steps):
+            _, _, terminated, truncated, _ = envs.step(rng.integers(envs.action_count, size=num_envs))
+            episodes += int(np.count_nonzero(terminated | truncated))
+        elapsed = time.perf_counter() - start
+        total = steps * num_envs
+        return {
+            'envs': num_envs,
+            'processes': envs.processes,
+            'steps': total,
+            'episodes': episodes,
+            'steps_per_second': total / elapsed,
+            'steps_per_second_per_core': total / elapsed / envs.processes,
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ocean Hunter environment throughput")
+    parser.add_argument('--envs', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--observation', choices=['entities', 'pixels'], default='entities')
+    parser.add_argument('--backend', choices=['object', 'numpy'], default='object')
+    args = parser.parse_args(argv)
+    result = measure_throughput(args.envs, args.processes, args.steps,
+                                observation=args.observation, backend=args.backend)
+    print(f"{result['steps']} steps over {result['envs']} envs / {result['processes']} processes: "
+          f"{result['steps_per_second']:.0f} steps/s, "
+          f"{result['steps_per_second_per_core']:.0f} steps/s per core, "
+          f"{result['episodes']} episodes finished")
+
+if __name__ == "__main__":
+    main()
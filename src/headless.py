@@ -0,0 +1,157 @@
+import pygame
+import random
+import time
+from main import Game, GameState, FPS
+from replay import Recording, replay
+
+MOVE_KEYS = {
+    'left': pygame.K_LEFT,
+    'right': pygame.K_RIGHT,
+    'up': pygame.K_UP,
+    'down': pygame.K_DOWN,
+}
+
+class KeyState:
+    """Stand-in for pygame.key.get_pressed() holding a set of pressed keys"""
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+NO_KEYS = KeyState()
+
+class IdlePolicy:
+    """Never presses anything"""
+    def __call__(self, game):
+        return NO_KEYS
+
+class RandomPolicy:
+    """Holds a random combination of arrow keys for a random number of ticks"""
+    def __init__(self, rng, min_hold=10, max_hold=60):
+        self.rng = rng
+        self.min_hold = min_hold
+        self.max_hold = max_hold
+        self.keys = NO_KEYS
+        self.hold = 0
+
+    def __call__(self, game):
+        if self.hold <= 0:
+            horizontal = self.rng.choice([None, 'left', 'right'])
+            vertical = self.rng.choice([None, 'up', 'down'])
+            self.keys = KeyState(MOVE_KEYS[k] for k in (horizontal, vertical) if k)
+            self.hold = self.rng.randint(self.min_hold, self.max_hold)
+        self.hold -= 1
+        return self.keys
+
+class SeekPolicy:
+    """Scripted player: swims away from nearby predators, otherwise towards the nearest edible creature"""
+    def __init__(self, danger_radius=150):
+        self.danger_radius = danger_radius
+
+    def __call__(self, game):
+        player = game.player
+        center = pygame.math.Vector2(player.rect.center)
+        steer = pygame.math.Vector2(0, 0)
+        creatures = game.creature_manager.creatures()
+
+        for predator in creatures:
+            if not predator.is_predator:
+                continue
+            offset = center - pygame.math.Vector2(predator.rect.center)
+            if player.can_be_eaten(predator.size) and 0 < offset.length() < self.danger_radius:
+                steer += offset.normalize()
+
+        if steer.length() == 0:
+            target = None
+            best = None
+            for creature in creatures:
+                if player.can_eat(creature.size):
+                    distance = center.distance_squared_to(creature.rect.center)
+                    if best is None or distance < best:
+                        best = distance
+                        target = creature
+            if target:
+                steer = pygame.math.Vector2(target.rect.center) - center
+
+        pressed = []
+        if steer.x < -1:
+            pressed.append(MOVE_KEYS['left'])
+        elif steer.x > 1:
+            pressed.append(MOVE_KEYS['right'])
+        if steer.y < -1:
+            pressed.append(MOVE_KEYS['up'])
+        elif steer.y > 1:
+            pressed.append(MOVE_KEYS['down'])
+        return KeyState(pressed)
+
+def make_policy(name, rng):
+    if name == 'idle':
+        return IdlePolicy()
+    if name == 'random':
+        return RandomPolicy(rng)
+    if name == 'seek':
+        return SeekPolicy()
+    raise ValueError(f"Unknown input policy: {name}")
+
+def run_session(game, policy, max_ticks):
+    """Step one game at a fixed 1/FPS tick until game over or max_ticks; skips draw()"""
+    game.start()
+    ticks = 0
+    start = time.perf_counter()
+    while ticks < max_ticks and game.state == GameState.PLAYING:
+        game.update(policy(game))
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    game.save_recording()
+    return {
+        'ticks': ticks,
+        'simulated_seconds': ticks / FPS,
+        'wall_seconds': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+        'score': game.score,
+        'level': game.current_level,
+        'game_over': game.state == GameState.GAME_OVER,
+    }
+
+def run_headless(sessions=1, max_ticks=36000, policy='random', seed=None, backend='object',
+                 record_path=None, ai='classic', precise_collisions=False, world_size=None):
+    """Play sessions back to back without rendering; returns per-session results"""
+    rng = random.Random(seed)
+    results = []
+    for session in range(sessions):
+        # Each session gets its own derived seed so runs are reproducible
+        session_seed = rng.randrange(2**32)
+        game = Game(backend, seed=session_seed, record_path=record_path, ai=ai,
+                    precise_collisions=precise_collisions, world_size=world_size)
+        result = run_session(game, make_policy(policy, random.Random(session_seed)), max_ticks)
+        result['seed'] = session_seed
+        results.append(result)
+    return results
+
+def print_report(results):
+    for i, result in enumerate(results):
+        print(f"session {i}: seed={result['seed']} ticks={result['ticks']} "
+              f"score={result['score']} level={result['level']} "
+              f"ticks/s={result['ticks_per_second']:.0f}")
+    total_ticks = sum(r['ticks'] for r in results)
+    total_time = sum(r['wall_seconds'] for r in results)
+    if results:
+        print(f"{len(results)} sessions, {total_ticks} ticks in {total_time:.2f}s "
+              f"({total_ticks / total_time if total_time > 0 else 0:.0f} ticks/s), "
+              f"mean score {sum(r['score'] for r in results) / len(results):.1f}, "
+              f"max level {max(r['level'] for r in results)}")
+
+def run_replay(path, render_frames=(), frames_dir='.'):
+    """Replay a recording at maximum speed and print how it went"""
+    recording = Recording.load(path)
+    result = replay(recording, lambda recording: Game(recording.backend, seed=recording.seed, ai=recording.ai,
+                                                      precise_collisions=recording.precise_collisions,
+                                                      world_size=recording.world_size),
+                    render_frames=render_frames, frames_dir=frames_dir)
+    print(f"replayed {result['ticks']} ticks (seed={recording.seed}, backend={recording.backend}, "
+          f"ai={recording.ai}) "
+          f"in {result['wall_seconds']:.2f}s ({result['ticks_per_second']:.0f} ticks/s), "
+          f"{result['checksums_verified']} checksums verified, "
+          f"score={result['score']} level={result['level']}")
+    return result
@@ -0,0 +1,147 @@
+import pygame
+import time
+from collections import OrderedDict
+
+class TextCache:
+    """Loads each font size once and memoizes rendered text surfaces.
+
+    Surfaces are keyed by (text, size, color) and evicted least-recently-used
+    once more than max_entries are held.
+    """
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def render(self, text, size, color):
+        key = (text, size, tuple(color))
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.font(size).render(text, True, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'fonts': len(self.fonts),
+        }
+
+# Shared by every HUD in the process
+text_cache = TextCache()
+
+class Label:
+    """A line of text that is only re-rendered when its value changes"""
+    def __init__(self, template, pos, size, color):
+        self.template = template
+        self.pos = pos
+        self.size = size
+        self.color = color
+        self.value = None
+        self.surface = None
+
+    def set(self, value, cache):
+        """Update the value; returns True if the label had to be re-rendered"""
+        if self.surface is not None and value == self.value:
+            return False
+        self.value = value
+        self.surface = cache.render(self.template.format(value), self.size, self.color)
+        return True
+
+    @property
+    def rect(self):
+        return self.surface.get_rect(topleft=self.pos)
+
+class HUD:
+    """Heads-up display composed into its own cached overlay surface.
+
+    Labels are rendered through the shared TextCache and the overlay is only
+    rebuilt when one of them changes, so a steady frame costs one blit.
+    last_draw_ms and the counters in stats() report what the HUD cost.
+    """
+    def __init__(self, cache=text_cache):
+        self.cache = cache
+        self.labels = OrderedDict()
+        self.overlay = None
+        self.overlay_rect = pygame.Rect(0, 0, 0, 0)
+        self.dirty = True
+        self.renders = 0
+        self.rebuilds = 0
+        self.frames = 0
+        self.pending_ms = 0.0
+        self.last_draw_ms = 0.0
+        self.total_draw_ms = 0.0
+
+    def add_label(self, name, template, pos, size=36, color=(255, 255, 255)):
+        self.labels[name] = Label(template, pos, size, color)
+        self.dirty = True
+
+    def set(self, name, value):
+        start = time.perf_counter()
+        if self.labels[name].set(value, self.cache):
+            self.renders += 1
+            self.dirty = True
+        self.pending_ms += (time.perf_counter() - start) * 1000
+
+    def rebuild_overlay(self):
+        """Compose every label into one transparent surface covering their bounds"""
+        rects = [label.rect for label in self.labels.values() if label.surface is not None]
+        self.dirty = False
+        if not rects:
+            self.overlay = None
+            return
+        bounds = rects[0].unionall(rects[1:])
+        if self.overlay is None or self.overlay.get_size() != bounds.size:
+            self.overlay = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        else:
+            self.overlay.fill((0, 0, 0, 0))
+        for label in self.labels.values():
+            if label.surface is not None:
+                self.overlay.blit(label.surface, (label.pos[0] - bounds.x, label.pos[1] - bounds.y))
+        self.overlay_rect = bounds
+        self.rebuilds += 1
+
+    def draw(self, surface):
+        """Blit the overlay; returns the rect it covers"""
+        start = time.perf_counter()
+        if self.dirty:
+            self.rebuild_overlay()
+        if self.overlay is not None:
+            surface.blit(self.overlay, self.overlay_rect)
+        # Include the time spent updating labels since the last draw
+        self.last_draw_ms = (time.perf_counter() - start) * 1000 + self.pending_ms
+        self.pending_ms = 0.0
+        self.total_draw_ms += self.last_draw_ms
+        self.frames += 1
+        return self.overlay_rect
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'renders': self.renders,
+            'rebuilds': self.rebuilds,
+            'last_draw_ms': self.last_draw_ms,
+            'mean_draw_ms': self.total_draw_ms / self.frames if self.frames else 0.0,
+            'text_cache': self.cache.stats(),
+        }
@@ -0,0 +1,133 @@
+"""Load test for the multiplayer server over loopback.
+
+    python loadtest.py --clients 16 --seconds 10 --density 10
+
+Starts a GameServer in its own process and connects headless bot clients
+that hold random inputs. Reports the server's tick time and the bytes each
+client receives per second, and checks every client's decoded state
+against the server's.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import statistics
+import time
+
+from main import init_pygame
+from client import NetworkClient
+from env import ACTIONS
+from protocol import DeltaDecoder, decode_snapshot
+from server import GameServer, ServerGame, MAX_PLAYERS
+
+def server_process(pipe, game_options):
+    """Run a GameServer until the pipe says stop; sends back its port, then its stats and state"""
+    init_pygame(headless=True)
+
+    async def run():
+        server = GameServer(ServerGame(**game_options), port=0)
+        await server.start()
+        pipe.send(server.port)
+        await asyncio.get_running_loop().run_in_executor(None, pipe.recv)
+        # Pause the simulation so clients can catch up to its final snapshot
+        server.running = False
+        await server.task
+        encoder = server.game.encoder
+        pipe.send((server.stats(), encoder.tick, encoder.keyframe()))
+        await asyncio.get_running_loop().run_in_executor(None, pipe.recv)
+        await server.stop()
+    asyncio.run(run())
+
+async def bot(port, seconds, rng, min_hold=0.2, max_hold=1.0):
+    """A client holding random inputs for random stretches; returns it once done"""
+    client = NetworkClient()
+    await client.connect('127.0.0.1', port)
+    client.start()
+    loop = asyncio.get_running_loop()
+    end = loop.time() + seconds
+    while loop.time() < end and not client.receiver.done():
+        client.send_input(rng.choice(ACTIONS))
+        await asyncio.sleep(rng.uniform(min_hold, max_hold))
+    return client
+
+async def run_clients(port, clients, seconds, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    bots = await asyncio.gather(*[bot(port, seconds, random.Random(rng.random())) for _ in range(clients)])
+    return bots, time.perf_counter() - start
+
+def run_load_test(clients=8, seconds=10, seed=0, **game_options):
+    """Returns the server stats plus per-client traffic and state checks"""
+    game_options.setdefault('max_players', max(clients, MAX_PLAYERS))
+    game_options.setdefault('seed', seed)
+    context = multiprocessing.get_context('spawn')
+    parent, child = context.Pipe()
+    process = context.Process(target=server_process, args=(child, game_options), daemon=True)
+    process.start()
+    try:
+        port = parent.recv()
+
+        async def session():
+            bots, elapsed = await run_clients(port, clients, seconds, seed)
+            parent.send('stop')
+            stats, final_tick, keyframe = await asyncio.get_running_loop().run_in_executor(None, parent.recv)
+            # Let the last snapshots arrive, then compare every client with the server's final keyframe
+            for _ in range(100):
+                if all(b.decoder.tick == final_tick for b in bots):
+                    break
+                await asyncio.sleep(0.02)
+            expected = DeltaDecoder()
+            expected.apply(decode_snapshot(keyframe))
+            matches = sum(consistent(b.decoder, expected) for b in bots)
+            for b in bots:
+                b.close()
+            parent.send('exit')
+            return bots, elapsed, stats, matches
+        bots, elapsed, stats, matches = asyncio.run(session())
+    finally:
+        process.join(timeout=5)
+
+    received = [b.bytes_received / elapsed for b in bots]
+    return {
+        'clients': clients,
+        'seconds': elapsed,
+        'server': stats,
+        'bytes_per_client_per_second': statistics.fmean(received),
+        'max_bytes_per_client_per_second': max(received),
+        'snapshots_per_client_per_second': statistics.fmean(b.snapshots for b in bots) / elapsed,
+        'keyframes': sum(b.keyframes for b in bots),
+        'consistent_clients': matches,
+    }
+
+def consistent(decoder, expected):
+    """True when a client's decoded creatures and players equal the server's"""
+    ids, positions, flags = decoder.creatures()
+    expected_ids, expected_positions, expected_flags = expected.creatures()
+    return (decoder.tick == expected.tick and ids.tolist() == expected_ids.tolist()
+            and (positions == expected_positions).all() and (flags == expected_flags).all()
+            and (decoder.spec[ids] == expected.spec[expected_ids]).all()
+            and decoder.players.tobytes() == expected.players.tobytes())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ocean Hunter multiplayer load test")
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--backend', choices=['object', 'numpy'], default='numpy')
+    parser.add_argument('--density', type=float, default=1,
+                        help="scale every level's creature counts")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    result = run_load_test(args.clients, args.seconds, args.seed, backend=args.backend, density=args.density)
+    server = result['server']
+    print(f"{result['clients']} clients for {result['seconds']:.1f}s, {server['creatures']:.0f} creatures "
+          f"on average, {server['ticks']} ticks, reached level {server['level']}")
+    print(f"server tick: {server['tick_mean_ms']:.2f} ms mean, {server['tick_p95_ms']:.2f} ms p95, "
+          f"{server['tick_max_ms']:.2f} ms max (budget {server['tick_budget_ms']:.2f} ms), "
+          f"{server['dropped_ticks']} dropped")
+    print(f"per client: {result['bytes_per_client_per_second'] / 1024:.2f} KiB/s mean, "
+          f"{result['max_bytes_per_client_per_second'] / 1024:.2f} KiB/s max, "
+          f"{result['snapshots_per_client_per_second']:.1f} snapshots/s, {result['keyframes']} keyframes")
+    print(f"{result['consistent_clients']}/{result['clients']} clients match the server's final state")
+
+if __name__ == "__main__":
+    main()
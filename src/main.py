@@ -1,44 +1,63 @@
 import pygame
 import sys
 import random
+import argparse
+import time
+import zlib
+from array import array
 from enum import Enum
 from player import Player
-from creature import CreatureManager
+from creature import CreatureManager, LEVEL_SPAWNS, level_sprites
+from simulation import SNAP_DISTANCE
+from world import ChunkedWorld, Camera
+from player import PLAYER_SPRITES
+from particles import ParticlePool
+from hud import HUD, text_cache
+from render import DirtyRectRenderer
+from background import Background
+from profiler import FrameProfiler
+from replay import Recording
+from snapshot import save_snapshot, restore_snapshot, write_snapshot, read_snapshot, read_header, SnapshotError
+from assets import asset_manager, IMG_DIR, SOUND_DIR, SOUND_FILES, MUSIC_FILE
 import os
 
-# Initialize Pygame and its mixer
-pygame.init()
-pygame.mixer.init()
-
 # Constants
 WINDOW_WIDTH = 1024
 WINDOW_HEIGHT = 768
 FPS = 60
 
+# The simulation advances in fixed ticks of 1/FPS seconds whatever the render
+# rate, so speeds are pixels per tick (FPS times that per second)
+TICK_SECONDS = 1 / FPS
+
+# Ticks run per rendered frame before a backlog is dropped rather than chased
+MAX_CATCH_UP = 5
+
+# Particle pool limits
+PARTICLE_CAPACITY = 2048
+PARTICLE_OVERFLOW = 'drop_oldest'  # or 'drop_new'
+
+# Ticks between autosaved snapshots while playing
+AUTOSAVE_INTERVAL = FPS
+
+# Fraction of the screen above which dirty-rect frames fall back to a full flip
+DIRTY_AREA_THRESHOLD = 0.5
+
 # Colors
 BLUE = (0, 105, 148)
 WHITE = (255, 255, 255)
 BUBBLE_COLOR = (255, 255, 255, 128)
 
-# Asset paths
-ASSET_DIR = os.path.join(os.path.dirname(__file__), "..", "assets")
-IMG_DIR = os.path.join(ASSET_DIR, "images")
-SOUND_DIR = os.path.join(ASSET_DIR, "sounds")
-
-class Particle:
-    def __init__(self, x, y, color, size, speed):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = size
-        self.speed = speed
-        self.alpha = 255
-        self.fade_speed = random.randint(5, 10)
-    
-    def update(self):
-        self.y -= self.speed
-        self.alpha = max(0, self.alpha - self.fade_speed)
-        return self.alpha > 0
+def init_pygame(headless=False):
+    """Initialize Pygame and its mixer; headless uses SDL's dummy drivers"""
+    if headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.init()
+    try:
+        pygame.mixer.init()
+    except pygame.error:
+        print("Couldn't initialize the mixer, sound is disabled")
 
 class GameState(Enum):
     MENU = 1
@@ -46,88 +65,147 @@ class GameState(Enum):
     GAME_OVER = 3
 
 class Game:
-    def __init__(self):
+    def __init__(self, backend="object", seed=None, render_mode="full", record_path=None, ai="classic",
+                 precise_collisions=False, world_size=None, autosave_path=None):
+        # Startup is timed from construction to the first presented frame
+        self.startup_start = time.perf_counter()
+        self.startup_ms = None
+        
+        # Kept so a restart starts a new session with the same settings
+        self.options = {'backend': backend, 'seed': seed, 'render_mode': render_mode,
+                        'record_path': record_path, 'ai': ai, 'precise_collisions': precise_collisions,
+                        'world_size': world_size}
+        self.backend = backend
+        self.ai = ai
+        
+        # Worlds larger than the screen scroll with a camera and are split into chunks
+        self.world_size = tuple(world_size or (WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.spawn_point = (self.world_size[0]//2, self.world_size[1]//2)
+        self.camera = Camera((WINDOW_WIDTH, WINDOW_HEIGHT), self.world_size)
+        
+        # Optional input recording, saved when each session ends
+        self.record_path = record_path
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Ocean Hunter")
         self.clock = pygame.time.Clock()
-        self.state = GameState.MENU
-        self.current_level = 1
-        self.score = 0
+        
+        # Test sprite masks after the rect check so transparent corners don't touch
+        self.precise_collisions = precise_collisions
+        
+        # Snapshot written every second while playing (F5 saves, F8 restores it)
+        self.autosave_path = autosave_path
+        
+        # Frame profiler
+        self.profiler = FrameProfiler(budget_ms=1000 / FPS)
+        
+        # Fixed-timestep state: time not yet simulated, ticks dropped to keep
+        # up, and how far the frame being drawn is from the last tick to the
+        # next (see advance())
+        self.lag = 0.0
+        self.dropped_ticks = 0
+        self.alpha = 1.0
         
         # Initialize background
-        self.bg_layers = []
-        self.load_background()
+        self.background = Background((WINDOW_WIDTH, WINDOW_HEIGHT), IMG_DIR)
+        
+        # Opt-in renderer that only updates the regions that changed
+        self.render_mode = render_mode
+        self.renderer = None
+        if render_mode == "dirty":
+            self.renderer = DirtyRectRenderer(self.screen, DIRTY_AREA_THRESHOLD)
+            self.renderer.set_background(self.background.static)
         
-        # Initialize sounds
-        self.sounds = {}
+        # Queue the sound effects for decoding and start the music
         self.load_sounds()
         
+        # Initialize the in-game HUD
+        self.hud = HUD()
+        self.hud.add_label('score', 'Score: {}', (10, 10))
+        self.hud.add_label('level', 'Level: {}', (10, 50))
+        self.hud.add_label('size', 'Size: {}', (10, 90))
+        
+        self.particles = None
+        self.creature_manager = None
+        self.new_session(seed)
+    
+    def new_session(self, seed=None):
+        """Start over on level 1, reusing the window, assets and creature pool.
+        
+        Everything a session simulates is rebuilt here; __init__ only sets up
+        what survives between sessions.
+        """
+        # Every random roll in the simulation comes from this seeded RNG
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.recording = (Recording(self.seed, self.backend, ai=self.ai,
+                                    precise_collisions=self.precise_collisions, world_size=self.world_size)
+                          if self.record_path else None)
+        self.state = GameState.MENU
+        self.current_level = 1
+        self.score = 0
+        self.ticks = 0
+        
+        # Decode this level's and the next level's assets in the background
+        self.prefetch_level(self.current_level)
+        self.prefetch_level(self.current_level + 1)
+        
         # Initialize particles
-        self.particles = []
+        if self.particles is None:
+            self.particles = ParticlePool(PARTICLE_CAPACITY, PARTICLE_OVERFLOW, rng=self.rng)
+        else:
+            self.particles.clear()
+            self.particles.rng = self.rng
         
-        # Initialize player and creatures
-        self.player = Player(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, self.current_level)
-        self.creature_manager = CreatureManager()
+        # Initialize player and creatures; the previous session's creatures are pooled
+        pool = None
+        if self.creature_manager is not None:
+            self.creature_manager.release_all()
+            pool = self.creature_manager.free
+        self.player = Player(*self.spawn_point, self.current_level, world_size=self.world_size)
+        self.world = None
+        if self.world_size != (WINDOW_WIDTH, WINDOW_HEIGHT):
+            self.world = ChunkedWorld(self.world_size, (WINDOW_WIDTH, WINDOW_HEIGHT), self.seed,
+                                      self.backend, self.ai, rng=self.rng, pool=pool)
+        self.creature_manager = self.world or CreatureManager(self.backend, rng=self.rng, ai=self.ai,
+                                                              world_size=self.world_size, pool=pool)
         self.creature_manager.spawn_creatures(self.current_level)
-        
-        # Start background music
-        if 'background_music' in self.sounds:
-            self.sounds['background_music'].play(-1)  # Loop indefinitely
-    
-    def load_background(self):
-        try:
-            # Load background layers (if they exist)
-            for i in range(3):  # We'll use 3 layers for parallax effect
-                bg_path = os.path.join(IMG_DIR, f'background_layer_{i}.png')
-                if os.path.exists(bg_path):
-                    img = pygame.image.load(bg_path).convert_alpha()
-                    img = pygame.transform.scale(img, (WINDOW_WIDTH, WINDOW_HEIGHT))
-                    self.bg_layers.append(img)
-        except pygame.error:
-            # If images don't exist, create gradient background
-            self.bg_layers = [self.create_gradient_background()]
-    
-    def create_gradient_background(self):
-        surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        for y in range(WINDOW_HEIGHT):
-            color = (0, max(0, min(255, 105 + y//4)), max(0, min(255, 148 + y//4)))
-            pygame.draw.line(surface, color, (0, y), (WINDOW_WIDTH, y))
-        return surface
+        self.camera.follow(self.player.rect)
+        self.previous = []
+        if self.renderer:
+            self.renderer.invalidate()
     
     def load_sounds(self):
-        sound_files = {
-            'eat': 'eat.wav',
-            'hurt': 'hurt.wav',
-            'level_up': 'level_up.wav',
-            'background_music': 'background.wav'
-        }
+        asset_manager.prefetch(sounds=SOUND_FILES)
         
-        for sound_name, filename in sound_files.items():
+        # Background music is streamed by the mixer rather than decoded up front
+        path = os.path.join(SOUND_DIR, MUSIC_FILE)
+        if pygame.mixer.get_init() and os.path.exists(path):
             try:
-                path = os.path.join(SOUND_DIR, filename)
-                if os.path.exists(path):
-                    if sound_name == 'background_music':
-                        self.sounds[sound_name] = pygame.mixer.music.load(path)
-                    else:
-                        self.sounds[sound_name] = pygame.mixer.Sound(path)
+                pygame.mixer.music.load(path)
+                pygame.mixer.music.play(-1)  # Loop indefinitely
             except pygame.error:
-                print(f"Couldn't load sound: {filename}")
+                print(f"Couldn't load sound: {MUSIC_FILE}")
+    
+    def play_sound(self, name):
+        # Loaded on the spot if the prefetch hasn't decoded it yet
+        sound = asset_manager.sound(name)
+        if sound is not None:
+            sound.play()
+    
+    def prefetch_level(self, level):
+        """Queue a level's creature and player sprites for background decoding"""
+        if level in LEVEL_SPAWNS:
+            asset_manager.prefetch(images=sorted(level_sprites(level)) + [PLAYER_SPRITES[level]])
     
     def add_particles(self, x, y, color, count=5):
-        for _ in range(count):
-            size = random.randint(2, 6)
-            speed = random.uniform(1, 3)
-            self.particles.append(Particle(x, y, color, size, speed))
+        self.particles.emit(x, y, color, count)
     
     def update_particles(self):
-        self.particles = [p for p in self.particles if p.update()]
+        self.particles.update()
     
     def draw_particles(self):
-        for particle in self.particles:
-            surf = pygame.Surface((particle.size, particle.size), pygame.SRCALPHA)
-            pygame.draw.circle(surf, (*particle.color, particle.alpha), 
-                             (particle.size//2, particle.size//2), particle.size//2)
-            self.screen.blit(surf, (particle.x, particle.y))
+        return self.particles.draw(self.screen, collect_rects=self.renderer is not None,
+                                   offset=self.camera.offset)
 
     def handle_events(self):
         for event in pygame.event.get():
@@ -136,136 +214,428 @@ class Game:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     return False
+                if event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+                elif event.key == pygame.K_F9:
+                    self.profiler.capture()
+                elif event.key == pygame.K_F10:
+                    self.profiler.export(time.strftime('frame_profile_%Y%m%d_%H%M%S.json'))
                 if self.state == GameState.MENU and event.key == pygame.K_SPACE:
-                    self.state = GameState.PLAYING
+                    self.start()
                 elif self.state == GameState.GAME_OVER and event.key == pygame.K_SPACE:
-                    self.__init__()
+                    self.save_recording()
+                    self.new_session(self.options['seed'])
+                elif event.key == pygame.K_F5 and self.autosave_path:
+                    self.autosave()
+                elif event.key == pygame.K_F8 and self.autosave_path and os.path.exists(self.autosave_path):
+                    try:
+                        self.restore(read_snapshot(self.autosave_path))
+                    except SnapshotError as e:
+                        print(f"Could not restore {self.autosave_path}: {e}")
         return True
 
+    def collides(self, creature):
+        """Rect test, refined by the cached sprite masks in precise mode"""
+        if not self.player.rect.colliderect(creature.rect):
+            return False
+        return not self.precise_collisions or pygame.sprite.collide_mask(self.player, creature) is not None
+    
     def check_collisions(self):
+        # Only creatures found by the broadphase can touch the player
+        prey_hits, predator_hits = self.creature_manager.nearby(self.player.rect)
+        if self.precise_collisions:
+            # Rect hits only count where the sprite masks overlap too
+            prey_hits = [prey for prey in prey_hits if self.collides(prey)]
+            predator_hits = [predator for predator in predator_hits if self.collides(predator)]
+        
         # Check collisions with prey
-        for prey in self.creature_manager.prey_group:
-            if pygame.sprite.collide_rect(self.player, prey):
-                if self.player.can_eat(prey.size):
-                    self.score += 10
-                    self.player.grow()
-                    # Add eating particles
-                    self.add_particles(prey.rect.centerx, prey.rect.centery, (255, 255, 0))
-                    if 'eat' in self.sounds:
-                        self.sounds['eat'].play()
-                    prey.kill()
+        for prey in prey_hits:
+            if self.player.can_eat(prey.size):
+                self.score += 10
+                self.player.grow()
+                # Add eating particles
+                self.add_particles(prey.rect.centerx, prey.rect.centery, (255, 255, 0))
+                self.play_sound('eat')
+                self.creature_manager.release(prey)
                     
         # Check collisions with predators
-        for predator in self.creature_manager.predator_group:
-            if pygame.sprite.collide_rect(self.player, predator):
-                if self.player.can_be_eaten(predator.size):
-                    if 'hurt' in self.sounds:
-                        self.sounds['hurt'].play()
-                    self.state = GameState.GAME_OVER
-                elif self.player.can_eat(predator.size):
-                    self.score += 50
-                    self.player.grow()
-                    self.add_particles(predator.rect.centerx, predator.rect.centery, (255, 0, 0))
-                    if 'eat' in self.sounds:
-                        self.sounds['eat'].play()
-                    predator.kill()
+        for predator in predator_hits:
+            if self.player.can_be_eaten(predator.size):
+                self.play_sound('hurt')
+                self.state = GameState.GAME_OVER
+            elif self.player.can_eat(predator.size):
+                self.score += 50
+                self.player.grow()
+                self.add_particles(predator.rect.centerx, predator.rect.centery, (255, 0, 0))
+                self.play_sound('eat')
+                self.creature_manager.release(predator)
         
         # Check for level completion
-        if len(self.creature_manager.prey_group) == 0:
+        if self.creature_manager.level_complete():
             self.current_level = min(self.current_level + 1, 4)
-            if 'level_up' in self.sounds:
-                self.sounds['level_up'].play()
-            self.player = Player(WINDOW_WIDTH//2, WINDOW_HEIGHT//2, self.current_level)
-            self.creature_manager.spawn_creatures(self.current_level)
+            self.play_sound('level_up')
+            self.player.reset(*self.spawn_point, self.current_level)
+            self.prefetch_level(self.current_level + 1)
+            # Spread the new level's spawns over the next few ticks
+            self.creature_manager.spawn_creatures(self.current_level, trickle=True)
 
-    def update(self):
+    def update(self, keys=None):
+        # Convert prefetched assets within a small per-frame budget
+        with self.profiler.scope('asset_pump'):
+            asset_manager.pump()
+        
         if self.state == GameState.PLAYING:
-            # Update player
-            keys = pygame.key.get_pressed()
-            self.player.update(keys)
+            # Update player (keys can be injected by headless input policies)
+            if keys is None:
+                keys = pygame.key.get_pressed()
+            profiler = self.profiler
+            with profiler.scope('player.update'):
+                self.player.update(keys)
+            self.camera.follow(self.player.rect)
             
             # Update creatures
-            self.creature_manager.update(self.player.position)
+            with profiler.scope('creature_manager.update'):
+                self.creature_manager.update(self.player.position, self.player.size)
             
             # Update particles
-            self.update_particles()
+            with profiler.scope('update_particles'):
+                self.update_particles()
             
             # Check collisions
-            self.check_collisions()
+            with profiler.scope('check_collisions'):
+                self.check_collisions()
             
             # Add ambient bubbles
-            if random.random() < 0.1:  # 10% chance each frame
-                x = random.randint(0, WINDOW_WIDTH)
-                self.add_particles(x, WINDOW_HEIGHT, BUBBLE_COLOR, count=1)
+            if self.rng.random() < 0.1:  # 10% chance each frame
+                x = self.camera.rect.x + self.rng.randint(0, WINDOW_WIDTH)
+                self.add_particles(x, self.camera.rect.bottom, BUBBLE_COLOR, count=1)
+            
+            if self.recording is not None:
+                self.recording.record(keys, self)
+            
+            self.ticks += 1
+            if self.autosave_path and self.ticks % AUTOSAVE_INTERVAL == 0:
+                with profiler.scope('autosave'):
+                    self.autosave()
+    
+    def start(self):
+        """Leave the menu and start playing"""
+        self.state = GameState.PLAYING
+    
+    def state_checksum(self):
+        """CRC32 of the simulation state, used to detect replay divergence"""
+        values = array('d', (self.score, self.current_level, self.player.size,
+                             self.player.position.x, self.player.position.y))
+        for creature in self.creature_manager.creatures():
+            values.extend((creature.size, creature.position.x, creature.position.y))
+        return zlib.crc32(values.tobytes())
+    
+    def snapshot(self):
+        """The full simulation state as compact binary (see snapshot.py)"""
+        return save_snapshot(self)
+    
+    def restore(self, data):
+        """Return to a snapshot taken by a Game with the same settings"""
+        # Inputs recorded so far no longer lead to the restored state
+        self.save_recording()
+        restore_snapshot(self, data)
+        self.previous = []
+    
+    def autosave(self):
+        return write_snapshot(self, self.autosave_path)
+    
+    def save_recording(self):
+        if self.recording is not None and len(self.recording):
+            path = self.record_path.format(seed=self.seed)
+            self.recording.finish(self)
+            self.recording.save(path)
+            print(f"Saved {len(self.recording)} ticks of input to {path}")
+            self.recording = None
     
     def draw_background(self):
-        if self.bg_layers:
-            for layer in self.bg_layers:
-                self.screen.blit(layer, (0, 0))
-        else:
-            self.screen.fill(BLUE)
+        # The layers scroll with the camera at their parallax factors
+        self.background.draw(self.screen, -self.camera.offset.x)
+    
+    def interpolated_rects(self):
+        """Rects drawn in play that move between ticks"""
+        rects = [self.camera.rect, self.player.rect]
+        manager = self.world.active if self.world is not None else self.creature_manager
+        if manager.simulation is None:
+            # The numpy backend interpolates its arrays instead (CreatureManager.draw)
+            rects.extend(creature.rect for group in (manager.prey_group, manager.predator_group)
+                         for creature in group)
+        return rects
     
-    def draw(self):
+    def capture_previous(self):
+        """Remember where everything is before the last tick preceding a frame"""
+        self.previous = [(rect, rect.topleft) for rect in self.interpolated_rects()]
+    
+    def interpolate(self, alpha):
+        """Move rects alpha of the way from their previous positions; returns the ones moved"""
+        moved = []
+        if alpha >= 1 or self.state != GameState.PLAYING:
+            return moved
+        self.alpha = alpha
+        for rect, (px, py) in self.previous:
+            x, y = rect.topleft
+            dx, dy = x - px, y - py
+            if (dx or dy) and abs(dx) <= SNAP_DISTANCE and abs(dy) <= SNAP_DISTANCE:
+                moved.append((rect, (x, y)))
+                rect.topleft = (round(px + dx * alpha), round(py + dy * alpha))
+        return moved
+    
+    def draw(self, alpha=1.0):
+        """Draw the frame alpha of the way from the previous tick to the current one"""
+        # Rects are only borrowed for drawing; the simulation never sees them moved
+        moved = self.interpolate(alpha)
+        try:
+            self.draw_frame()
+        finally:
+            self.alpha = 1.0
+            for rect, position in moved:
+                rect.topleft = position
+    
+    def draw_frame(self):
+        if self.renderer:
+            self.draw_dirty()
+            return
+        
+        profiler = self.profiler
         # Draw background
-        self.draw_background()
+        with profiler.scope('draw_background'):
+            self.draw_background()
         
+        with profiler.scope('draw_scene'):
+            self.draw_scene()
+        
+        # Draw particles and the profiler overlay on top
+        with profiler.scope('draw_particles'):
+            self.draw_particles()
+        profiler.draw(self.screen)
+        
+        with profiler.scope('present'):
+            pygame.display.flip()
+    
+    def draw_dirty(self):
+        profiler = self.profiler
+        if not self.background.is_static:
+            # Scrolling layers repaint every pixel, so present full frames
+            self.renderer.invalidate()
+            with profiler.scope('draw_background'):
+                self.draw_background()
+            full = True
+        else:
+            # Restore last frame's regions, then present only what changed
+            with profiler.scope('draw_background'):
+                full = self.renderer.begin(self.state)
+        with profiler.scope('draw_scene'):
+            drawn = self.draw_scene()
+        with profiler.scope('draw_particles'):
+            drawn += self.draw_particles()
+        overlay = profiler.draw(self.screen)
+        if overlay:
+            drawn.append(overlay)
+        with profiler.scope('present'):
+            self.renderer.present(drawn, full)
+    
+    def draw_scene(self):
+        """Draw the current state's screen; returns the rects drawn"""
         if self.state == GameState.MENU:
-            self.draw_menu()
+            return self.draw_menu()
         elif self.state == GameState.PLAYING:
-            self.draw_game()
+            return self.draw_game()
         elif self.state == GameState.GAME_OVER:
-            self.draw_game_over()
-        
-        # Draw particles on top
-        self.draw_particles()
-            
-        pygame.display.flip()
+            return self.draw_game_over()
+        return []
     
     def draw_menu(self):
-        font = pygame.font.Font(None, 74)
-        title = font.render('Ocean Hunter', True, WHITE)
-        start = font.render('Press SPACE to Start', True, WHITE)
+        title = text_cache.render('Ocean Hunter', 74, WHITE)
+        start = text_cache.render('Press SPACE to Start', 74, WHITE)
         
-        self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, WINDOW_HEIGHT//3))
-        self.screen.blit(start, (WINDOW_WIDTH//2 - start.get_width()//2, WINDOW_HEIGHT//2))
+        return [
+            self.screen.blit(title, (WINDOW_WIDTH//2 - title.get_width()//2, WINDOW_HEIGHT//3)),
+            self.screen.blit(start, (WINDOW_WIDTH//2 - start.get_width()//2, WINDOW_HEIGHT//2)),
+        ]
     
     def draw_game(self):
         # Draw all sprites
-        self.creature_manager.prey_group.draw(self.screen)
-        self.creature_manager.predator_group.draw(self.screen)
-        self.screen.blit(self.player.image, self.player.rect)
+        # Only a world scrolls, so only a world needs culling to the camera
+        view = self.camera.rect if self.world is not None else None
+        drawn = self.creature_manager.draw(self.screen, collect_rects=self.renderer is not None, view=view,
+                                           alpha=self.alpha)
+        drawn.append(self.screen.blit(self.player.image, self.camera.apply(self.player.rect)))
         
-        # Draw UI
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f'Score: {self.score}', True, WHITE)
-        level_text = font.render(f'Level: {self.current_level}', True, WHITE)
-        size_text = font.render(f'Size: {self.player.size}', True, WHITE)
-        
-        self.screen.blit(score_text, (10, 10))
-        self.screen.blit(level_text, (10, 50))
-        self.screen.blit(size_text, (10, 90))
+        # Draw UI (labels only re-render when their value changes)
+        self.hud.set('score', self.score)
+        self.hud.set('level', self.current_level)
+        self.hud.set('size', self.player.size)
+        drawn.append(self.hud.draw(self.screen))
+        self.profiler.record('hud', self.hud.last_draw_ms)
+        return drawn
     
     def draw_game_over(self):
-        font = pygame.font.Font(None, 74)
-        game_over = font.render('Game Over', True, WHITE)
-        restart = font.render('Press SPACE to Restart', True, WHITE)
-        final_score = font.render(f'Final Score: {self.score}', True, WHITE)
+        game_over = text_cache.render('Game Over', 74, WHITE)
+        restart = text_cache.render('Press SPACE to Restart', 74, WHITE)
+        final_score = text_cache.render(f'Final Score: {self.score}', 74, WHITE)
+        
+        return [
+            self.screen.blit(game_over, (WINDOW_WIDTH//2 - game_over.get_width()//2, WINDOW_HEIGHT//3)),
+            self.screen.blit(final_score, (WINDOW_WIDTH//2 - final_score.get_width()//2, WINDOW_HEIGHT//2)),
+            self.screen.blit(restart, (WINDOW_WIDTH//2 - restart.get_width()//2, WINDOW_HEIGHT*2//3)),
+        ]
+    
+    def entity_counts(self):
+        counts = {
+            'prey': len(self.creature_manager.prey_group),
+            'predators': len(self.creature_manager.predator_group),
+            'particles': len(self.particles),
+            'pooled': len(self.creature_manager.free),
+            # Broadphase candidates looked at by this tick's collision queries
+            'candidates': self.creature_manager.spatial_index.candidate_count,
+        }
+        if self.world is not None:
+            counts['far'] = self.world.stats()['far_creatures']
+            counts['chunks'] = len(self.world.detail)
+        return counts
+    
+    def report_startup(self):
+        self.startup_ms = (time.perf_counter() - self.startup_start) * 1000
+        stats = asset_manager.stats()
+        print(f"Startup to first frame: {self.startup_ms:.1f} ms "
+              f"({stats['sync_loads']} synchronous image loads, {stats['pending']} assets still prefetching)")
+    
+    def advance(self, elapsed, max_catch_up=MAX_CATCH_UP):
+        """Run the fixed ticks due after elapsed more seconds; returns (ticks run, alpha).
         
-        self.screen.blit(game_over, (WINDOW_WIDTH//2 - game_over.get_width()//2, WINDOW_HEIGHT//3))
-        self.screen.blit(final_score, (WINDOW_WIDTH//2 - final_score.get_width()//2, WINDOW_HEIGHT//2))
-        self.screen.blit(restart, (WINDOW_WIDTH//2 - restart.get_width()//2, WINDOW_HEIGHT*2//3))
+        When more than max_catch_up ticks are due the rest is dropped, so the
+        game slows down instead of stalling on ever longer catch-ups. alpha
+        is how far the time left over is into the next tick.
+        """
+        self.lag += elapsed
+        ticks = 0
+        while self.lag >= TICK_SECONDS and ticks < max_catch_up:
+            self.lag -= TICK_SECONDS
+            ticks += 1
+            if self.lag < TICK_SECONDS or ticks == max_catch_up:
+                self.capture_previous()
+            self.update()
+        if self.lag >= TICK_SECONDS:
+            self.dropped_ticks += int(self.lag / TICK_SECONDS)
+            self.lag %= TICK_SECONDS
+        return ticks, self.lag / TICK_SECONDS
     
-    def run(self):
+    def run(self, profile_output=None, render_fps=FPS, max_catch_up=MAX_CATCH_UP):
+        """Main loop: fixed-rate ticks for the time that passed, then one interpolated frame.
+        
+        render_fps caps the frame rate (0 for uncapped); see advance() for
+        max_catch_up.
+        """
         running = True
+        profiler = self.profiler
+        last = time.perf_counter()
         while running:
-            running = self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            profiler.begin_frame()
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            with profiler.scope('handle_events'):
+                running = self.handle_events()
+            
+            ticks, alpha = self.advance(elapsed, max_catch_up)
+            self.draw(alpha)
+            if self.startup_ms is None:
+                self.report_startup()
+            counts = self.entity_counts()
+            counts['ticks'] = ticks
+            counts['dropped_ticks'] = self.dropped_ticks
+            profiler.end_frame(counts)
+            self.clock.tick(render_fps)
         
+        if profile_output:
+            self.profiler.export(profile_output)
+        self.save_recording()
         pygame.quit()
         sys.exit()
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ocean Hunter")
+    parser.add_argument('--backend', choices=['object', 'numpy'], default='object',
+                        help="creature simulation backend")
+    parser.add_argument('--ai', choices=['classic', 'schooling'], default='classic',
+                        help="creature steering: the classic wander and chase, or neighbor-aware schooling")
+    parser.add_argument('--precise-collisions', action='store_true',
+                        help="test sprite masks on rect hits so transparent corners don't collide")
+    parser.add_argument('--world-screens', type=int, default=1, metavar='N',
+                        help="play in a scrolling world N by N screens large")
+    parser.add_argument('--render', choices=['full', 'dirty'], default='full',
+                        help="full flips every frame, dirty only updates changed regions")
+    parser.add_argument('--render-fps', type=int, default=FPS, metavar='N',
+                        help=f"cap drawing at N frames per second, 0 for uncapped "
+                             f"(the simulation always runs at {FPS} ticks per second)")
+    parser.add_argument('--max-catch-up', type=int, default=MAX_CATCH_UP, metavar='N',
+                        help="ticks run per frame before a backlog is dropped")
+    parser.add_argument('--profile', action='store_true',
+                        help="show the frame profiler overlay (toggle with F3, F9 captures cProfile)")
+    parser.add_argument('--profile-output', default=None,
+                        help="write frame timings to this .json or .csv file on exit")
+    parser.add_argument('--record', default=None, metavar='PATH',
+                        help="record each session's inputs to PATH ({seed} is replaced by the session seed)")
+    parser.add_argument('--replay', default=None, metavar='PATH',
+                        help="re-simulate a recorded session headlessly and verify its checksums")
+    parser.add_argument('--render-frames', type=int, nargs='*', default=[],
+                        help="replay: ticks to render and save as PNGs")
+    parser.add_argument('--frames-dir', default='.',
+                        help="replay: directory for rendered frames")
+    parser.add_argument('--autosave', default=None, metavar='PATH',
+                        help="snapshot the game to PATH every second while playing (F5 saves, F8 restores)")
+    parser.add_argument('--load', default=None, metavar='PATH',
+                        help="resume from a snapshot; its settings override --backend, --ai and the world")
+    parser.add_argument('--headless', action='store_true',
+                        help="run the simulation without a window as fast as possible")
+    parser.add_argument('--sessions', type=int, default=1,
+                        help="headless: number of sessions to play")
+    parser.add_argument('--ticks', type=int, default=36000,
+                        help="headless: maximum ticks per session")
+    parser.add_argument('--policy', choices=['idle', 'random', 'seek'], default='random',
+                        help="headless: input policy driving the player")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="random seed for reproducible runs")
+    return parser.parse_args(argv)
+
+def world_size(screens):
+    """World size for a world screens by screens large (None for the single screen)"""
+    return (WINDOW_WIDTH * screens, WINDOW_HEIGHT * screens) if screens > 1 else None
+
+def main(argv=None):
+    args = parse_args(argv)
+    init_pygame(headless=args.headless or args.replay is not None)
+    if args.replay:
+        from headless import run_replay
+        run_replay(args.replay, render_frames=args.render_frames, frames_dir=args.frames_dir)
+        pygame.quit()
+        return
+    if args.headless:
+        from headless import run_headless, print_report
+        print_report(run_headless(sessions=args.sessions, max_ticks=args.ticks,
+                                  policy=args.policy, seed=args.seed,
+                                  backend=args.backend, record_path=args.record, ai=args.ai,
+                                  precise_collisions=args.precise_collisions,
+                                  world_size=world_size(args.world_screens)))
+        pygame.quit()
+        return
+    snapshot = None
+    options = {'backend': args.backend, 'seed': args.seed, 'ai': args.ai,
+               'precise_collisions': args.precise_collisions, 'world_size': world_size(args.world_screens)}
+    if args.load:
+        snapshot = read_snapshot(args.load)
+        seed, backend, ai, precise_collisions, size = read_header(snapshot)
+        options = {'backend': backend, 'seed': seed, 'ai': ai, 'precise_collisions': precise_collisions,
+                   'world_size': size}
+    game = Game(render_mode=args.render, record_path=args.record, autosave_path=args.autosave, **options)
+    if snapshot is not None:
+        game.restore(snapshot)
+    if args.profile:
+        game.profiler.show_overlay = True
+    game.run(args.profile_output, render_fps=args.render_fps, max_catch_up=args.max_catch_up)
+
 if __name__ == "__main__":
-    game = Game()
-    game.run() 
\ No newline at end of file
+    main() 
\ No newline at end of file
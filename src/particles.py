@@ -0,0 +1,140 @@
+import pygame
+import random
+import numpy as np
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_new')
+
+class ParticlePool:
+    """Fixed-capacity particle system backed by parallel NumPy arrays.
+
+    Live particles are packed at the front of the arrays in spawn order, so
+    the oldest particle is always at index 0. When the pool is full,
+    overflow decides whether new particles replace the oldest ones
+    ("drop_oldest") or are discarded ("drop_new"). Particles are drawn from
+    a cache of pre-rendered circles keyed by (size, color, quantized alpha)
+    with a single Surface.blits call.
+    """
+    def __init__(self, capacity=2048, overflow='drop_oldest', alpha_levels=16, max_sprites=1024, rng=random):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.capacity = capacity
+        self.rng = rng
+        self.overflow = overflow
+        self.alpha_step = 256 // alpha_levels
+        self.max_sprites = max_sprites
+        self.count = 0
+        self.dropped = 0
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.int16)
+        self.speed = np.zeros(capacity, dtype=np.float32)
+        self.alpha = np.zeros(capacity, dtype=np.float32)
+        self.fade = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.int16)
+
+        # Palette of RGB colors referenced by self.color
+        self.colors = []
+        self.color_index = {}
+        self.sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def palette_index(self, color):
+        rgb = tuple(color[:3])
+        index = self.color_index.get(rgb)
+        if index is None:
+            index = len(self.colors)
+            self.colors.append(rgb)
+            self.color_index[rgb] = index
+        return index
+
+    def make_room(self, needed):
+        """Free slots for needed new particles; returns how many fit"""
+        free = self.capacity - self.count
+        if needed <= free:
+            return needed
+        if self.overflow == 'drop_new':
+            self.dropped += needed - free
+            return free
+        # Shift out the oldest particles
+        if needed > self.capacity:
+            self.dropped += needed - self.capacity
+            needed = self.capacity
+        drop = needed - free
+        live = slice(drop, self.count)
+        kept = self.count - drop
+        for array in (self.x, self.y, self.size, self.speed, self.alpha, self.fade, self.color):
+            array[:kept] = array[live]
+        self.count = kept
+        self.dropped += drop
+        return needed
+
+    def emit(self, x, y, color, count=5):
+        """Spawn count particles at (x, y); a 4-component color sets the starting alpha"""
+        count = self.make_room(count)
+        if count <= 0:
+            return
+        start, end = self.count, self.count + count
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.color[start:end] = self.palette_index(color)
+        self.alpha[start:end] = color[3] if len(color) > 3 else 255
+        rng = self.rng
+        for i in range(start, end):
+            self.size[i] = rng.randint(2, 6)
+            self.speed[i] = rng.uniform(1, 3)
+            self.fade[i] = rng.randint(5, 10)
+        self.count = end
+
+    def update(self):
+        """Rise and fade every particle, then pack the survivors"""
+        n = self.count
+        if n == 0:
+            return
+        self.y[:n] -= self.speed[:n]
+        self.alpha[:n] -= self.fade[:n]
+        alive = self.alpha[:n] > 0
+        kept = int(np.count_nonzero(alive))
+        if kept < n:
+            for array in (self.x, self.y, self.size, self.speed, self.alpha, self.fade, self.color):
+                array[:kept] = array[:n][alive]
+            self.count = kept
+
+    def sprite(self, size, color, alpha):
+        key = (size, color, alpha)
+        surf = self.sprites.get(key)
+        if surf is None:
+            if len(self.sprites) >= self.max_sprites:
+                self.sprites.clear()
+            surf = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(surf, (*self.colors[color], alpha), (size//2, size//2), size//2)
+            self.sprites[key] = surf
+        return surf
+
+    def draw(self, surface, collect_rects=False, offset=(0, 0)):
+        """Blit every particle; returns the rects drawn when collect_rects is set.
+
+        offset is added to every particle position (the camera's screen offset).
+        """
+        n = self.count
+        if n == 0:
+            return []
+        ox, oy = offset
+        # Quantize alpha so the circle cache stays small
+        step = self.alpha_step
+        alphas = (np.minimum(self.alpha[:n], 255).astype(np.int16) // step * step).tolist()
+        sprites = self.sprites
+        blits = []
+        for x, y, size, color, alpha in zip(self.x[:n].tolist(), self.y[:n].tolist(),
+                                            self.size[:n].tolist(), self.color[:n].tolist(), alphas):
+            surf = sprites.get((size, color, alpha)) or self.sprite(size, color, alpha)
+            blits.append((surf, (x + ox, y + oy)))
+        if collect_rects:
+            return surface.blits(blits)
+        surface.blits(blits, doreturn=False)
+        return []
@@ -1,12 +1,25 @@
 import pygame
 import math
-import os
+from sprite_cache import sprite_cache
+
+PLAYER_SPRITES = {
+    1: "small_fish.png",
+    2: "crab.png",
+    3: "sea_snake.png",
+    4: "shark.png"
+}
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y, level):
+    def __init__(self, x, y, level, world_size=(1024, 768)):
         super().__init__()
+        self.world_size = world_size
+        self.reset(x, y, level)
+        
+    def reset(self, x, y, level):
+        """Start over at a level without constructing a new Player"""
         self.level = level
         self.size = 30  # Initial size
+        self.facing_right = True
         
         # Load appropriate sprite based on level
         self.load_sprite()
@@ -19,29 +32,24 @@ class Player(pygame.sprite.Sprite):
         self.speed = 5
         self.direction = pygame.math.Vector2(0, 0)
         self.position = pygame.math.Vector2(x, y)
-        self.facing_right = True
         
     def load_sprite(self):
-        # Default orange rectangle as fallback
-        self.image = pygame.Surface([self.size, self.size])
-        self.image.fill((255, 165, 0))
-        
-        # Try to load the appropriate sprite based on level
-        try:
-            sprite_name = {
-                1: "small_fish.png",
-                2: "crab.png",
-                3: "sea_snake.png",
-                4: "shark.png"
-            }.get(self.level, "small_fish.png")
-            
-            img_path = os.path.join(os.path.dirname(__file__), "..", "assets", "images", sprite_name)
-            if os.path.exists(img_path):
-                self.image = pygame.image.load(img_path).convert_alpha()
-                # Scale image to match current size
-                self.image = pygame.transform.scale(self.image, (self.size, self.size))
-        except pygame.error:
-            pass  # Keep default rectangle if sprite loading fails
+        # Load the appropriate sprite based on level, orange rectangle as fallback
+        sprite_name = PLAYER_SPRITES.get(self.level, "small_fish.png")
+        self.image_right, self.image_left = sprite_cache.get_pair(sprite_name, self.size, (255, 165, 0))
+        self.image = self.image_right if self.facing_right else self.image_left
+    
+    @property
+    def mask(self):
+        """Cached collision mask of the current image (used by collide_mask)"""
+        sprite_name = PLAYER_SPRITES.get(self.level, "small_fish.png")
+        return sprite_cache.get_mask(sprite_name, self.size, self.facing_right, (255, 165, 0))
+    
+    def set_facing(self, facing_right):
+        """Swap to the pre-built surface for a new facing direction"""
+        if facing_right != self.facing_right:
+            self.facing_right = facing_right
+            self.image = self.image_right if facing_right else self.image_left
         
     def move(self, keys):
         # Reset direction
@@ -50,10 +58,10 @@ class Player(pygame.sprite.Sprite):
         # Update direction based on key presses
         if keys[pygame.K_LEFT] or keys[pygame.K_a]:
             self.direction.x = -1
-            self.facing_right = False
+            self.set_facing(False)
         if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
             self.direction.x = 1
-            self.facing_right = True
+            self.set_facing(True)
         if keys[pygame.K_UP] or keys[pygame.K_w]:
             self.direction.y = -1
         if keys[pygame.K_DOWN] or keys[pygame.K_s]:
@@ -66,33 +74,23 @@ class Player(pygame.sprite.Sprite):
         # Update position
         self.position += self.direction * self.speed
         
-        # Keep player on screen
-        self.position.x = max(0, min(self.position.x, 1024 - self.size))
-        self.position.y = max(0, min(self.position.y, 768 - self.size))
+        # Keep player inside the world
+        width, height = self.world_size
+        self.position.x = max(0, min(self.position.x, width - self.size))
+        self.position.y = max(0, min(self.position.y, height - self.size))
         
         # Update rectangle position
         self.rect.x = self.position.x
         self.rect.y = self.position.y
-        
-        # Flip sprite based on direction
-        if not self.facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
     
-    def grow(self):
-        """Increase the size of the player when eating prey"""
+    def grow(self, meals=1):
+        """Increase the size of the player when eating prey (meals at once load one sprite)"""
         old_size = self.size
-        self.size += 2
+        self.size += 2 * meals
         
-        # Store the current facing direction
-        was_facing_right = self.facing_right
-        
-        # Reload and resize sprite
+        # Fetch the resized sprite for the current facing direction
         self.load_sprite()
         
-        # Restore facing direction
-        if not was_facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
-        
         # Maintain center position when growing
         old_center = self.rect.center
         self.rect = self.image.get_rect()
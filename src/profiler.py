@@ -0,0 +1,189 @@
+import cProfile
+import csv
+import io
+import json
+import pstats
+import time
+from collections import deque
+
+from hud import HUD, TextCache
+
+class Scope:
+    """Reusable timing context manager for one named phase"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class FrameProfiler:
+    """Per-phase frame timings with rolling percentiles and an on-screen overlay.
+
+    Phases are timed with scope(name) (or record() for times measured
+    elsewhere) and the last window samples of each are kept for p50/p95/p99.
+    Frames longer than budget_ms count as overruns. A cProfile capture of the
+    next few frames can be started with capture() and is written to disk when
+    it finishes.
+    """
+    def __init__(self, budget_ms, window=300, overlay_refresh=30):
+        self.budget_ms = budget_ms
+        self.window = window
+        self.samples = {}
+        self.scopes = {}
+        self.frame_start = None
+        self.frames = 0
+        self.overruns = 0
+        self.counts = {}
+
+        # cProfile capture window
+        self.capture_profile = None
+        self.capture_frames = 0
+        self.capture_path = None
+        self.last_capture = None
+
+        # Overlay, refreshed every overlay_refresh frames to keep text renders rare
+        self.show_overlay = False
+        self.overlay_refresh = overlay_refresh
+        self.overlay = HUD(TextCache(max_entries=64))
+
+    def scope(self, name):
+        scope = self.scopes.get(name)
+        if scope is None:
+            scope = self.scopes[name] = Scope(self, name)
+        return scope
+
+    def record(self, name, ms):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(ms)
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self, counts=None):
+        """Close the frame; counts are entity counts to report alongside timings"""
+        if self.frame_start is None:
+            return
+        frame_ms = (time.perf_counter() - self.frame_start) * 1000
+        self.frame_start = None
+        self.record('frame', frame_ms)
+        self.frames += 1
+        if frame_ms > self.budget_ms:
+            self.overruns += 1
+        if counts:
+            self.counts = counts
+
+        if self.capture_profile is not None:
+            self.capture_frames -= 1
+            if self.capture_frames <= 0:
+                self.finish_capture()
+
+    def stats(self, name):
+        ordered = sorted(self.samples.get(name, ()))
+        return {
+            'count': len(ordered),
+            'mean_ms': sum(ordered) / len(ordered) if ordered else 0.0,
+            'p50_ms': percentile(ordered, 0.50),
+            'p95_ms': percentile(ordered, 0.95),
+            'p99_ms': percentile(ordered, 0.99),
+            'max_ms': ordered[-1] if ordered else 0.0,
+        }
+
+    def summary(self):
+        return {
+            'frames': self.frames,
+            'overruns': self.overruns,
+            'budget_ms': self.budget_ms,
+            'counts': dict(self.counts),
+            'phases': {name: self.stats(name) for name in self.samples},
+        }
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def export_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['phase', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'])
+            for name in self.samples:
+                stats = self.stats(name)
+                writer.writerow([name] + [round(stats[k], 4) if k != 'count' else stats[k]
+                                          for k in ('count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')])
+
+    def export(self, path):
+        """Write the summary as CSV or JSON depending on the file extension"""
+        if path.endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+    def capture(self, frames=120, path=None):
+        """Run cProfile over the next frames frames"""
+        if self.capture_profile is not None:
+            return
+        self.capture_frames = frames
+        self.capture_path = path or time.strftime('profile_%Y%m%d_%H%M%S.prof')
+        self.capture_profile = cProfile.Profile()
+        self.capture_profile.enable()
+
+    def finish_capture(self):
+        self.capture_profile.disable()
+        self.capture_profile.dump_stats(self.capture_path)
+        report = io.StringIO()
+        pstats.Stats(self.capture_profile, stream=report).sort_stats('cumulative').print_stats(15)
+        print(f"Wrote cProfile capture to {self.capture_path}")
+        print(report.getvalue())
+        self.last_capture = self.capture_path
+        self.capture_profile = None
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.overlay.labels.clear()
+        self.overlay.dirty = True
+
+    def draw(self, surface):
+        """Draw the overlay in the top-right corner; returns the rect it covers"""
+        if not self.show_overlay:
+            return None
+        if not self.overlay.labels or self.frames % self.overlay_refresh == 0:
+            self.refresh_overlay(surface.get_width())
+        return self.overlay.draw(surface)
+
+    def refresh_overlay(self, width):
+        frame = self.stats('frame')
+        lines = [f"frame p50 {frame['p50_ms']:.2f} p95 {frame['p95_ms']:.2f} "
+                 f"p99 {frame['p99_ms']:.2f} ms  overruns {self.overruns}"]
+        for name in self.samples:
+            if name != 'frame':
+                stats = self.stats(name)
+                lines.append(f"{name} p50 {stats['p50_ms']:.2f} p95 {stats['p95_ms']:.2f} ms")
+        if self.counts:
+            lines.append('  '.join(f"{k} {v}" for k, v in self.counts.items()))
+        if self.capture_profile is not None:
+            lines.append(f"cProfile capturing ({self.capture_frames} frames left)")
+
+        x = width - 420
+        for i, line in enumerate(lines):
+            name = f'line{i}'
+            if name not in self.overlay.labels:
+                self.overlay.add_label(name, '{}', (x, 10 + i * 18), size=20, color=(255, 255, 0))
+            self.overlay.set(name, line)
+        for name in list(self.overlay.labels)[len(lines):]:
+            del self.overlay.labels[name]
+            self.overlay.dirty = True
@@ -0,0 +1,277 @@
+"""Binary messages between the multiplayer server and its clients.
+
+Every message is framed as <length u32><type u8><payload>. Clients send a
+HELLO, then an INPUT whenever their input mask changes. The server answers
+with a WELCOME and then streams SNAPSHOTs.
+
+Creature positions are quantized to 1/QUANTUM pixel in uint16. A snapshot
+only carries what changed since the previous one: creatures that spawned,
+small moves as int8 deltas, larger moves (wrapping, turning around) as
+absolute positions, and the ids of creatures that were removed. The
+connection is a TCP stream, so every client sees every snapshot in order
+and each delta is applied to exactly the state it was encoded against.
+A keyframe holds the full state and starts a client's stream.
+"""
+import struct
+import numpy as np
+
+PROTOCOL_VERSION = 1
+
+FRAME = struct.Struct('<IB')  # payload length, message type
+MAX_MESSAGE = 1 << 24
+
+MSG_HELLO = 1     # client -> server
+MSG_INPUT = 2     # client -> server
+MSG_WELCOME = 3   # server -> client
+MSG_SNAPSHOT = 4  # server -> client
+
+HELLO = struct.Struct('<H')  # protocol version
+INPUT = struct.Struct('<B')  # input mask (replay.INPUT_* bits)
+WELCOME = struct.Struct('<BBBHH')  # player id, tick rate, ticks per snapshot, world width, world height
+
+# tick, level, flags, then the length of each section
+SNAPSHOT = struct.Struct('<IBBBBHHHH')  # ... players, specs, spawned, moved, jumped, removed
+SNAPSHOT_KEYFRAME = 1
+
+# Position units per pixel; worlds up to 65535 / QUANTUM pixels fit in uint16
+QUANTUM = 4
+
+# Largest per-axis move sent as an int8 delta, in position units
+MAX_STEP = 127
+
+# Flags of player and creature records
+FACING_RIGHT = 1
+ALIVE = 2
+PREDATOR = 4
+
+PLAYER = np.dtype([('id', 'u1'), ('flags', 'u1'), ('size', '<u2'), ('x', '<u2'), ('y', '<u2'),
+                   ('score', '<u4')])
+SPAWNED = np.dtype([('id', '<u2'), ('spec', 'u1'), ('flags', 'u1'), ('x', '<u2'), ('y', '<u2')])
+MOVED = np.dtype([('id', '<u2'), ('dx', 'i1'), ('dy', 'i1')])
+JUMPED = np.dtype([('id', '<u2'), ('flags', 'u1'), ('x', '<u2'), ('y', '<u2')])
+REMOVED = np.dtype('<u2')
+
+SPEC = struct.Struct('<BBH3BB')  # index, flags, size, color, sprite name length
+
+class ProtocolError(Exception):
+    pass
+
+def frame(msg_type, payload=b''):
+    return FRAME.pack(len(payload), msg_type) + payload
+
+async def read_message(reader):
+    """(type, payload) of the next message; raises IncompleteReadError at EOF"""
+    length, msg_type = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if length > MAX_MESSAGE:
+        raise ProtocolError(f"Message of {length} bytes is too large")
+    return msg_type, await reader.readexactly(length)
+
+def quantize(values):
+    return np.clip(np.rint(np.asarray(values, dtype=np.float64) * QUANTUM), 0, 65535).astype(np.uint16)
+
+def encode_spec(index, spec):
+    is_predator, size, _, color, sprite_name = spec
+    name = (sprite_name or '').encode('utf-8')
+    return SPEC.pack(index, PREDATOR if is_predator else 0, size, *color[:3], len(name)) + name
+
+class Snapshot:
+    """A decoded SNAPSHOT: record arrays per section, new specs as (index, spec)"""
+    __slots__ = ('tick', 'level', 'keyframe', 'players', 'specs', 'spawned', 'moved', 'jumped', 'removed')
+
+    def __init__(self, tick, level, keyframe, players, specs, spawned, moved, jumped, removed):
+        self.tick = tick
+        self.level = level
+        self.keyframe = keyframe
+        self.players = players
+        self.specs = specs
+        self.spawned = spawned
+        self.moved = moved
+        self.jumped = jumped
+        self.removed = removed
+
+def encode_snapshot(tick, level, keyframe, players, specs, spawned, moved, jumped, removed):
+    header = SNAPSHOT.pack(tick, level, SNAPSHOT_KEYFRAME if keyframe else 0, len(players), len(specs),
+                           len(spawned), len(moved), len(jumped), len(removed))
+    return b''.join([header, players.tobytes(), b''.join(specs), spawned.tobytes(), moved.tobytes(),
+                     jumped.tobytes(), removed.tobytes()])
+
+def decode_snapshot(payload):
+    try:
+        tick, level, flags, n_players, n_specs, n_spawned, n_moved, n_jumped, n_removed = \
+            SNAPSHOT.unpack_from(payload, 0)
+        offset = SNAPSHOT.size
+        players = np.frombuffer(payload, PLAYER, n_players, offset)
+        offset += players.nbytes
+        specs = []
+        for _ in range(n_specs):
+            index, spec_flags, size, r, g, b, length = SPEC.unpack_from(payload, offset)
+            offset += SPEC.size
+            name = payload[offset:offset + length].decode('utf-8') or None
+            offset += length
+            specs.append((index, (bool(spec_flags & PREDATOR), size, 0, (r, g, b), name)))
+        sections = []
+        for dtype, count in ((SPAWNED, n_spawned), (MOVED, n_moved), (JUMPED, n_jumped), (REMOVED, n_removed)):
+            section = np.frombuffer(payload, dtype, count, offset)
+            offset += section.nbytes
+            sections.append(section)
+    except (struct.error, ValueError) as e:
+        raise ProtocolError(f"Malformed snapshot: {e}")
+    return Snapshot(tick, level, bool(flags & SNAPSHOT_KEYFRAME), players, specs, *sections)
+
+class DeltaEncoder:
+    """Server side: quantizes creature state and encodes it against the last snapshot.
+
+    State is kept in arrays indexed by network id, so comparing two ticks is
+    a handful of NumPy operations however many creatures there are.
+    """
+    def __init__(self, capacity=1024):
+        self.specs = []
+        self.spec_index = {}
+        self.new_specs = []
+        self.present = np.zeros(capacity, dtype=bool)
+        self.x = np.zeros(capacity, dtype=np.uint16)
+        self.y = np.zeros(capacity, dtype=np.uint16)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.spec = np.zeros(capacity, dtype=np.uint8)
+        self.tick = 0
+        self.level = 0
+        self.players = np.zeros(0, dtype=PLAYER)
+
+    def spec_id(self, spec):
+        index = self.spec_index.get(spec)
+        if index is None:
+            if len(self.specs) > 255:
+                raise ProtocolError("More than 256 creature specs")
+            index = self.spec_index[spec] = len(self.specs)
+            self.specs.append(spec)
+            self.new_specs.append(encode_spec(index, spec))
+        return index
+
+    def grow(self, size):
+        capacity = len(self.present)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        for name in ('present', 'x', 'y', 'flags', 'spec'):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def encode(self, tick, level, players, ids, specs, positions, facing):
+        """Delta snapshot for this tick; ids must not be reused for another creature in between"""
+        ids = np.asarray(ids, dtype=np.int64)
+        self.grow(int(ids.max()) + 1 if len(ids) else 0)
+        x = quantize(positions[:, 0]) if len(ids) else np.zeros(0, dtype=np.uint16)
+        y = quantize(positions[:, 1]) if len(ids) else np.zeros(0, dtype=np.uint16)
+        flags = np.where(facing, FACING_RIGHT, 0).astype(np.uint8)
+
+        now = np.zeros(len(self.present), dtype=bool)
+        now[ids] = True
+        removed = np.flatnonzero(self.present & ~now).astype(REMOVED)
+
+        new = ~self.present[ids]
+        spawned = np.zeros(int(new.sum()), dtype=SPAWNED)
+        spawned['id'] = ids[new]
+        spawned['spec'] = np.asarray(specs, dtype=np.uint8)[new]
+        spawned['flags'] = flags[new]
+        spawned['x'] = x[new]
+        spawned['y'] = y[new]
+
+        old = ~new
+        oid = ids[old]
+        dx = x[old].astype(np.int32) - self.x[oid]
+        dy = y[old].astype(np.int32) - self.y[oid]
+        turned = flags[old] != self.flags[oid]
+        changed = (dx != 0) | (dy != 0) | turned
+        small = changed & ~turned & (np.abs(dx) <= MAX_STEP) & (np.abs(dy) <= MAX_STEP)
+        moved = np.zeros(int(small.sum()), dtype=MOVED)
+        moved['id'] = oid[small]
+        moved['dx'] = dx[small]
+        moved['dy'] = dy[small]
+        big = changed & ~small
+        jumped = np.zeros(int(big.sum()), dtype=JUMPED)
+        jumped['id'] = oid[big]
+        jumped['flags'] = flags[old][big]
+        jumped['x'] = x[old][big]
+        jumped['y'] = y[old][big]
+
+        self.present = now
+        self.x[ids] = x
+        self.y[ids] = y
+        self.flags[ids] = flags
+        self.spec[ids[new]] = spawned['spec']
+        self.tick = tick
+        self.level = level
+        self.players = players
+        specs, self.new_specs = self.new_specs, []
+        return encode_snapshot(tick, level, False, players, specs, spawned, moved, jumped, removed)
+
+    def keyframe(self):
+        """The full state as of the last encode(), for clients joining the stream"""
+        ids = np.flatnonzero(self.present)
+        spawned = np.zeros(len(ids), dtype=SPAWNED)
+        spawned['id'] = ids
+        spawned['spec'] = self.spec[ids]
+        spawned['flags'] = self.flags[ids]
+        spawned['x'] = self.x[ids]
+        spawned['y'] = self.y[ids]
+        specs = [encode_spec(i, spec) for i, spec in enumerate(self.specs)]
+        return encode_snapshot(self.tick, self.level, True, self.players, specs, spawned,
+                               np.zeros(0, dtype=MOVED), np.zeros(0, dtype=JUMPED), np.zeros(0, dtype=REMOVED))
+
+class DeltaDecoder:
+    """Client side: the state a stream of snapshots describes, in the same id-indexed arrays"""
+    def __init__(self, capacity=1024):
+        self.specs = {}
+        self.present = np.zeros(capacity, dtype=bool)
+        self.x = np.zeros(capacity, dtype=np.uint16)
+        self.y = np.zeros(capacity, dtype=np.uint16)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.spec = np.zeros(capacity, dtype=np.uint8)
+        self.tick = None
+        self.level = 1
+        self.players = np.zeros(0, dtype=PLAYER)
+        self.synced = False
+
+    grow = DeltaEncoder.grow
+
+    def apply(self, snapshot):
+        if snapshot.keyframe:
+            self.present[:] = False
+            self.synced = True
+        elif not self.synced:
+            raise ProtocolError("Delta snapshot before the first keyframe")
+        self.specs.update(snapshot.specs)
+        self.present[snapshot.removed] = False
+
+        spawned = snapshot.spawned
+        if len(spawned):
+            self.grow(int(spawned['id'].max()) + 1)
+            ids = spawned['id']
+            self.present[ids] = True
+            self.spec[ids] = spawned['spec']
+            self.flags[ids] = spawned['flags']
+            self.x[ids] = spawned['x']
+            self.y[ids] = spawned['y']
+
+        moved = snapshot.moved
+        ids = moved['id']
+        self.x[ids] = (self.x[ids] + moved['dx'].astype(np.int32)).astype(np.uint16)
+        self.y[ids] = (self.y[ids] + moved['dy'].astype(np.int32)).astype(np.uint16)
+
+        jumped = snapshot.jumped
+        ids = jumped['id']
+        self.flags[ids] = jumped['flags']
+        self.x[ids] = jumped['x']
+        self.y[ids] = jumped['y']
+
+        self.tick = snapshot.tick
+        self.level = snapshot.level
+        self.players = snapshot.players.copy()
+
+    def creatures(self):
+        """(ids, positions in pixels, flags) of every creature present"""
+        ids = np.flatnonzero(self.present)
+        positions = np.stack([self.x[ids], self.y[ids]], axis=1).astype(np.float64) / QUANTUM
+        return ids, positions, self.flags[ids]
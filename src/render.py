@@ -0,0 +1,103 @@
+import numpy as np
+import pygame
+
+def covered_area(rects):
+    """Pixels covered by the union of rects, overlaps counted once"""
+    if len(rects) < 2:
+        return sum(rect.width * rect.height for rect in rects)
+    # Coverage grid over the cells between every distinct rect edge
+    edges = np.array([(r.left, r.right, r.top, r.bottom) for r in rects])
+    xs = np.unique(edges[:, :2])
+    ys = np.unique(edges[:, 2:])
+    x0, x1 = np.searchsorted(xs, edges[:, 0]), np.searchsorted(xs, edges[:, 1])
+    y0, y1 = np.searchsorted(ys, edges[:, 2]), np.searchsorted(ys, edges[:, 3])
+    covered = np.zeros((len(xs) - 1, len(ys) - 1), dtype=bool)
+    for a, b, c, d in zip(x0.tolist(), x1.tolist(), y0.tolist(), y1.tolist()):
+        covered[a:b, c:d] = True
+    return int(np.diff(xs) @ covered @ np.diff(ys))
+
+class DirtyRectRenderer:
+    """Presents frames by updating only the screen regions that changed.
+
+    Every frame the regions drawn on the previous frame are restored from a
+    cached, fully composited background, the scene is drawn on top and
+    display.update() is called with the previous and current rects. When the
+    dirty area passes threshold (a fraction of the screen), or there are more
+    than max_rects rects, the frame is presented with a full flip instead,
+    since many small updates would cost more than one big one.
+    """
+    def __init__(self, screen, threshold=0.5, max_rects=256):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.threshold = threshold
+        self.max_rects = max_rects
+        self.background = None
+        self.previous = []
+        self.scene = None
+        self.full_frames = 0
+        self.dirty_frames = 0
+        self.last_dirty_area = 0
+
+    def set_background(self, background):
+        """Cache the composited background and force a full redraw"""
+        self.background = background
+        self.invalidate()
+
+    def invalidate(self):
+        self.scene = None
+
+    def begin(self, scene):
+        """Erase last frame's drawing; returns True if this frame must be fully redrawn"""
+        if scene != self.scene:
+            self.scene = scene
+            self.screen.blit(self.background, (0, 0))
+            self.previous = []
+            return True
+        for rect in self.previous:
+            self.screen.blit(self.background, rect, rect)
+        return False
+
+    def present(self, drawn, full=False):
+        """Push this frame to the display; drawn are the rects touched while drawing"""
+        clip = self.screen_rect.clip
+        drawn = [r for r in (clip(rect) for rect in drawn) if r.width and r.height]
+        dirty = self.previous + drawn
+        self.previous = drawn
+
+        if full or self.too_dirty(dirty):
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            pygame.display.update(dirty)
+            self.dirty_frames += 1
+
+    def too_dirty(self, dirty):
+        """True when the dirty rects cover more than threshold of the screen.
+
+        The union lies between the largest rect and the summed area, so the
+        exact coverage is only computed when the threshold falls in between.
+        last_dirty_area keeps whichever of the three decided the frame.
+        """
+        if len(dirty) > self.max_rects:
+            self.last_dirty_area = None
+            return True
+        limit = self.threshold * self.screen_rect.width * self.screen_rect.height
+        areas = [rect.width * rect.height for rect in dirty]
+        total = sum(areas)
+        if total <= limit:
+            self.last_dirty_area = total
+            return False
+        largest = max(areas)
+        if largest > limit:
+            self.last_dirty_area = largest
+            return True
+        # Last frame's and this frame's rects mostly overlap; count those pixels once
+        self.last_dirty_area = covered_area(dirty)
+        return self.last_dirty_area > limit
+
+    def stats(self):
+        return {
+            'full_frames': self.full_frames,
+            'dirty_frames': self.dirty_frames,
+            'last_dirty_area': self.last_dirty_area,
+        }
@@ -0,0 +1,164 @@
+import pygame
+import os
+import struct
+import time
+
+# Input bits recorded for every simulated tick
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_DOWN = 8
+
+INPUT_KEYS = (
+    (INPUT_LEFT, (pygame.K_LEFT, pygame.K_a)),
+    (INPUT_RIGHT, (pygame.K_RIGHT, pygame.K_d)),
+    (INPUT_UP, (pygame.K_UP, pygame.K_w)),
+    (INPUT_DOWN, (pygame.K_DOWN, pygame.K_s)),
+)
+
+# File layout: header, one input byte per tick, then (tick, checksum) pairs
+MAGIC = b'OHRP'
+VERSION = 1
+# magic, version, seed, backend, ai, flags, world width, world height, checksum interval, tick count
+HEADER = struct.Struct('<4sHIBBBIIHI')
+CHECKSUM = struct.Struct('<II')
+BACKENDS = ('object', 'numpy')
+AI_MODES = ('classic', 'schooling')
+
+# Header flag bits
+FLAG_PRECISE_COLLISIONS = 1
+
+class ReplayError(Exception):
+    pass
+
+class ReplayDivergence(ReplayError):
+    """Raised when a replayed session's state no longer matches the recording"""
+    def __init__(self, tick, expected, actual):
+        super().__init__(f"Replay diverged at tick {tick}: expected checksum {expected:08x}, got {actual:08x}")
+        self.tick = tick
+        self.expected = expected
+        self.actual = actual
+
+def keys_to_mask(keys):
+    mask = 0
+    for bit, codes in INPUT_KEYS:
+        if any(keys[code] for code in codes):
+            mask |= bit
+    return mask
+
+class MaskKeys:
+    """Key state rebuilt from a recorded input bitmask"""
+    __slots__ = ('pressed',)
+
+    def __init__(self, mask):
+        self.pressed = {code for bit, codes in INPUT_KEYS if mask & bit for code in codes[:1]}
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+# Only 16 distinct masks exist, so they are built once
+MASK_KEYS = [MaskKeys(mask) for mask in range(16)]
+
+class Recording:
+    """Seed, per-tick input masks and periodic state checksums of one session"""
+    def __init__(self, seed, backend='object', checksum_interval=60, ai='classic', precise_collisions=False,
+                 world_size=None):
+        self.seed = seed
+        self.backend = backend
+        self.ai = ai
+        self.precise_collisions = precise_collisions
+        self.world_size = world_size
+        self.checksum_interval = checksum_interval
+        self.inputs = bytearray()
+        self.checksums = []
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, keys, game):
+        """Store one tick's input; called after the tick was simulated"""
+        self.inputs.append(keys_to_mask(keys))
+        tick = len(self.inputs)
+        if self.checksum_interval and tick % self.checksum_interval == 0:
+            self.checksums.append((tick, game.state_checksum()))
+
+    def finish(self, game):
+        """Checksum the final state so short sessions are verified too"""
+        tick = len(self.inputs)
+        if tick and (not self.checksums or self.checksums[-1][0] != tick):
+            self.checksums.append((tick, game.state_checksum()))
+
+    def to_bytes(self):
+        parts = [HEADER.pack(MAGIC, VERSION, self.seed, BACKENDS.index(self.backend),
+                             AI_MODES.index(self.ai), FLAG_PRECISE_COLLISIONS if self.precise_collisions else 0,
+                             *(self.world_size or (0, 0)), self.checksum_interval, len(self.inputs)),
+                 bytes(self.inputs),
+                 struct.pack('<I', len(self.checksums))]
+        parts.extend(CHECKSUM.pack(tick, value) for tick, value in self.checksums)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        try:
+            magic, version, seed, backend, ai, flags, width, height, interval, ticks = HEADER.unpack_from(data, 0)
+        except struct.error as e:
+            raise ReplayError(f"Truncated recording: {e}")
+        if magic != MAGIC:
+            raise ReplayError("Not an Ocean Hunter recording")
+        if version != VERSION:
+            raise ReplayError(f"Unsupported recording version {version}")
+        world_size = (width, height) if width and height else None
+        recording = cls(seed, BACKENDS[backend], interval, AI_MODES[ai], bool(flags & FLAG_PRECISE_COLLISIONS),
+                        world_size)
+        offset = HEADER.size
+        recording.inputs = bytearray(data[offset:offset + ticks])
+        offset += ticks
+        (count,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+        recording.checksums = [CHECKSUM.unpack_from(data, offset + i * CHECKSUM.size) for i in range(count)]
+        return recording
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+def replay(recording, game_factory, render_frames=(), frames_dir='.', verify=True):
+    """Re-simulate a recording headlessly as fast as possible.
+
+    game_factory(recording) builds a fresh Game with the recorded settings.
+    Ticks listed in render_frames are drawn and saved as PNGs in frames_dir.
+    With verify, a checksum mismatch raises ReplayDivergence.
+    """
+    game = game_factory(recording)
+    game.start()
+    expected = dict(recording.checksums)
+    render_frames = set(render_frames)
+    checked = 0
+
+    start = time.perf_counter()
+    for tick, mask in enumerate(recording.inputs, 1):
+        game.update(MASK_KEYS[mask])
+        if tick in expected:
+            actual = game.state_checksum()
+            if verify and actual != expected[tick]:
+                raise ReplayDivergence(tick, expected[tick], actual)
+            checked += 1
+        if tick in render_frames:
+            game.draw()
+            pygame.image.save(game.screen, os.path.join(frames_dir, f'frame_{tick:06d}.png'))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'ticks': len(recording),
+        'checksums_verified': checked,
+        'wall_seconds': elapsed,
+        'ticks_per_second': len(recording) / elapsed if elapsed > 0 else 0.0,
+        'score': game.score,
+        'level': game.current_level,
+        'game': game,
+    }
@@ -0,0 +1,386 @@
+"""Authoritative multiplayer server: several players in one ocean.
+
+    python server.py --port 7777 --backend numpy
+    python client.py --host 127.0.0.1 --port 7777
+
+The server owns the only simulation. It runs one CreatureManager and the
+collision rules of Game for every connected Player at a fixed FPS tick,
+and every SNAPSHOT_INTERVAL ticks broadcasts one delta snapshot (see
+protocol.py) to all clients. Clients only send their input mask.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import struct
+import time
+from collections import deque
+import numpy as np
+
+from main import FPS, WINDOW_WIDTH, WINDOW_HEIGHT, init_pygame
+from player import Player
+from creature import CreatureManager
+from replay import MASK_KEYS
+from protocol import (PROTOCOL_VERSION, MSG_HELLO, MSG_INPUT, MSG_WELCOME, MSG_SNAPSHOT, HELLO, INPUT, WELCOME,
+                      PLAYER, FACING_RIGHT, ALIVE, ProtocolError, DeltaEncoder, frame, read_message, quantize)
+
+DEFAULT_PORT = 7777
+MAX_PLAYERS = 16
+
+# Ticks per broadcast snapshot (30 snapshots per second at 60 ticks)
+SNAPSHOT_INTERVAL = 2
+
+# Ticks an eaten player waits before re-entering
+RESPAWN_TICKS = 2 * FPS
+
+# Bytes queued for a client that can't keep up before its deltas are
+# skipped; it is resynced with a keyframe once its buffer drains
+MAX_BUFFERED = 256 * 1024
+
+# A tick loop further behind than this drops the backlog instead of catching up
+MAX_LAG_TICKS = 5
+
+class NetworkIds:
+    """Stable uint16 ids for pooled creatures.
+
+    An id freed by release() is only handed out again after flush(), which
+    the server calls once per snapshot, so a delta never mistakes a new
+    creature for a moved one.
+    """
+    def __init__(self):
+        self.ids = {}  # creature -> (id, spec index)
+        self.free = []
+        self.released = []
+        self.next_id = 0
+
+    def get(self, creature, spec_id):
+        entry = self.ids.get(creature)
+        if entry is None:
+            if self.free:
+                net_id = self.free.pop()
+            elif self.next_id <= 0xFFFF:
+                net_id = self.next_id
+                self.next_id += 1
+            else:
+                raise ProtocolError("Out of creature ids")
+            entry = self.ids[creature] = (net_id, spec_id(creature.spec))
+        return entry
+
+    def release(self, creature):
+        entry = self.ids.pop(creature, None)
+        if entry is not None:
+            self.released.append(entry[0])
+
+    def release_all(self):
+        for creature in list(self.ids):
+            self.release(creature)
+
+    def flush(self):
+        self.free.extend(self.released)
+        self.released.clear()
+
+class ServerGame:
+    """The shared simulation: one creature population and up to max_players players.
+
+    Players are keyed by a small id. Creatures steer around the nearest
+    player, so the server always uses the schooling behavior. An eaten player
+    loses their score and re-enters after RESPAWN_TICKS; the level advances
+    for everyone once its prey are all eaten.
+    """
+    def __init__(self, seed=None, backend='numpy', world_size=(WINDOW_WIDTH, WINDOW_HEIGHT), density=1,
+                 max_players=MAX_PLAYERS):
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.world_size = tuple(world_size)
+        self.density = density
+        self.max_players = max_players
+        self.creature_manager = CreatureManager(backend, rng=self.rng, ai='schooling', world_size=self.world_size)
+        self.level = 1
+        self.tick = 0
+        self.players = {}
+        self.inputs = {}
+        self.scores = {}
+        self.respawn = {}  # player id -> tick they re-enter at
+        self.ids = NetworkIds()
+        self.encoder = DeltaEncoder()
+        self.creature_manager.spawn_creatures(self.level, self.density)
+
+    def spawn_point(self):
+        return (self.rng.randint(0, self.world_size[0] - 64), self.rng.randint(0, self.world_size[1] - 64))
+
+    def join(self):
+        """Add a player; returns their id, or None when the server is full"""
+        for player_id in range(self.max_players):
+            if player_id not in self.players:
+                self.players[player_id] = Player(*self.spawn_point(), self.level, world_size=self.world_size)
+                self.inputs[player_id] = 0
+                self.scores[player_id] = 0
+                return player_id
+        return None
+
+    def leave(self, player_id):
+        for table in (self.players, self.inputs, self.scores, self.respawn):
+            table.pop(player_id, None)
+
+    def set_input(self, player_id, mask):
+        if player_id in self.inputs:
+            self.inputs[player_id] = mask & 0xF
+
+    def live_players(self):
+        return [(player_id, player) for player_id, player in sorted(self.players.items())
+                if player_id not in self.respawn]
+
+    def update(self):
+        self.tick += 1
+        for player_id, tick in list(self.respawn.items()):
+            if self.tick >= tick:
+                del self.respawn[player_id]
+                self.players[player_id].reset(*self.spawn_point(), self.level)
+
+        live = self.live_players()
+        for player_id, player in live:
+            player.update(MASK_KEYS[self.inputs[player_id]])
+
+        positions = sizes = None
+        if live:
+            positions = np.array([tuple(player.position) for _, player in live], dtype=np.float64)
+            sizes = np.array([player.size for _, player in live])
+        self.creature_manager.update(positions, sizes)
+
+        for player_id, player in live:
+            self.check_collisions(player_id, player)
+        if self.creature_manager.level_complete():
+            self.next_level()
+
+    def check_collisions(self, player_id, player):
+        """Game.check_collisions for one player (rect tests only).
+
+        Unlike Game, the player grows once for everything eaten this tick,
+        so a crowded server doesn't rebuild a sprite per meal.
+        """
+        manager = self.creature_manager
+        nearby_prey, nearby_predators = manager.nearby(player.rect)
+        eaten = []
+        for prey in nearby_prey:
+            if player.rect.colliderect(prey.rect) and player.can_eat(prey.size):
+                self.scores[player_id] += 10
+                eaten.append(prey)
+        for predator in nearby_predators:
+            if player.rect.colliderect(predator.rect):
+                if player.can_be_eaten(predator.size):
+                    self.scores[player_id] = 0
+                    self.respawn[player_id] = self.tick + RESPAWN_TICKS
+                    eaten = []
+                    break
+                elif player.can_eat(predator.size):
+                    self.scores[player_id] += 50
+                    eaten.append(predator)
+        if eaten:
+            player.grow(len(eaten))
+        # Released right away so players checked later this tick can't eat them too
+        for creature in eaten:
+            self.ids.release(creature)
+            manager.release(creature)
+
+    def next_level(self):
+        self.level = min(self.level + 1, 4)
+        self.ids.release_all()
+        self.creature_manager.spawn_creatures(self.level, self.density, trickle=True)
+        for player_id, player in self.players.items():
+            if player_id not in self.respawn:
+                player.reset(*self.spawn_point(), self.level)
+
+    def player_records(self):
+        players = sorted(self.players.items())
+        position = quantize([tuple(player.position) for _, player in players]).reshape(-1, 2)
+        return np.array([(player_id,
+                          (FACING_RIGHT if player.facing_right else 0) | (ALIVE if player_id not in self.respawn else 0),
+                          player.size, x, y, self.scores[player_id])
+                         for (player_id, player), (x, y) in zip(players, position.tolist())], dtype=PLAYER)
+
+    def encode(self):
+        """Delta snapshot of this tick against the previous one"""
+        creatures = self.creature_manager.creatures()
+        spec_id = self.encoder.spec_id
+        entries = [self.ids.get(creature, spec_id) for creature in creatures]
+        ids = np.array([entry[0] for entry in entries], dtype=np.int64)
+        specs = np.array([entry[1] for entry in entries], dtype=np.uint8)
+        positions = np.array([tuple(creature.position) for creature in creatures], dtype=np.float64).reshape(-1, 2)
+        facing = np.array([creature.facing_right for creature in creatures], dtype=bool)
+        data = self.encoder.encode(self.tick, self.level, self.player_records(), ids, specs, positions, facing)
+        self.ids.flush()
+        return data
+
+class Client:
+    """A connected player's stream"""
+    __slots__ = ('writer', 'player_id', 'synced', 'bytes_sent', 'keyframes')
+
+    def __init__(self, writer, player_id):
+        self.writer = writer
+        self.player_id = player_id
+        self.synced = False
+        self.bytes_sent = 0
+        self.keyframes = 0
+
+class GameServer:
+    """asyncio front end of a ServerGame: connections, the tick loop and broadcasting"""
+    def __init__(self, game, host='127.0.0.1', port=DEFAULT_PORT, tick_rate=FPS,
+                 snapshot_interval=SNAPSHOT_INTERVAL, max_buffered=MAX_BUFFERED):
+        self.game = game
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        self.snapshot_interval = snapshot_interval
+        self.max_buffered = max_buffered
+        self.clients = {}
+        self.handlers = set()
+        self.server = None
+        self.task = None
+        self.running = False
+
+        self.tick_times = deque(maxlen=10 * tick_rate)
+        self.creature_counts = deque(maxlen=10 * tick_rate)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.dropped_ticks = 0
+        self.started = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.running = True
+        self.started = time.perf_counter()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self.running = False
+        if self.task:
+            await self.task
+        self.server.close()
+        # Closing a connection ends its handler at the next read
+        for client in list(self.clients.values()):
+            client.writer.close()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        player_id = None
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        try:
+            msg_type, payload = await read_message(reader)
+            self.bytes_received += len(payload)
+            if msg_type != MSG_HELLO or HELLO.unpack(payload)[0] != PROTOCOL_VERSION:
+                raise ProtocolError("Expected a HELLO with a matching protocol version")
+            player_id = self.game.join()
+            if player_id is None:
+                raise ProtocolError("Server is full")
+            writer.write(frame(MSG_WELCOME, WELCOME.pack(player_id, self.tick_rate, self.snapshot_interval,
+                                                         *self.game.world_size)))
+            self.clients[player_id] = Client(writer, player_id)
+            while True:
+                msg_type, payload = await read_message(reader)
+                self.bytes_received += len(payload)
+                if msg_type == MSG_INPUT:
+                    self.game.set_input(player_id, INPUT.unpack(payload)[0])
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError, ValueError, struct.error):
+            pass
+        finally:
+            if player_id is not None:
+                self.clients.pop(player_id, None)
+                self.game.leave(player_id)
+            writer.close()
+            self.handlers.discard(task)
+
+    async def run(self):
+        """Fixed-rate tick loop"""
+        loop = asyncio.get_running_loop()
+        period = 1 / self.tick_rate
+        next_tick = loop.time()
+        while self.running:
+            start = time.perf_counter()
+            self.game.update()
+            if self.game.tick % self.snapshot_interval == 0:
+                self.broadcast(self.game.encode())
+            self.tick_times.append((time.perf_counter() - start) * 1000)
+            self.creature_counts.append(len(self.game.creature_manager.prey_group)
+                                        + len(self.game.creature_manager.predator_group))
+
+            next_tick += period
+            delay = next_tick - loop.time()
+            if delay < -MAX_LAG_TICKS * period:
+                self.dropped_ticks += int(-delay / period)
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(max(0, delay))
+
+    def broadcast(self, delta):
+        """Send this snapshot's delta to synced clients and a keyframe to the rest"""
+        message = frame(MSG_SNAPSHOT, delta)
+        keyframe = None
+        for client in list(self.clients.values()):
+            if client.writer.transport.get_write_buffer_size() > self.max_buffered:
+                client.synced = False
+                continue
+            if client.synced:
+                data = message
+            else:
+                if keyframe is None:
+                    keyframe = frame(MSG_SNAPSHOT, self.game.encoder.keyframe())
+                data = keyframe
+                client.synced = True
+                client.keyframes += 1
+            client.writer.write(data)
+            client.bytes_sent += len(data)
+            self.bytes_sent += len(data)
+
+    def stats(self):
+        times = sorted(self.tick_times)
+        elapsed = time.perf_counter() - self.started if self.started else 0
+        return {
+            'ticks': self.game.tick,
+            'clients': len(self.clients),
+            'level': self.game.level,
+            'creatures': statistics.fmean(self.creature_counts) if self.creature_counts else 0.0,
+            'tick_mean_ms': statistics.fmean(times) if times else 0.0,
+            'tick_p95_ms': times[min(len(times) - 1, int(len(times) * 0.95))] if times else 0.0,
+            'tick_max_ms': times[-1] if times else 0.0,
+            'tick_budget_ms': 1000 / self.tick_rate,
+            'dropped_ticks': self.dropped_ticks,
+            'bytes_sent_per_second': self.bytes_sent / elapsed if elapsed else 0.0,
+            'bytes_received_per_second': self.bytes_received / elapsed if elapsed else 0.0,
+        }
+
+async def serve(host, port, **game_options):
+    server = GameServer(ServerGame(**game_options), host, port)
+    await server.start()
+    print(f"Ocean Hunter server on {host}:{server.port} (seed={server.game.seed})")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            stats = server.stats()
+            print(f"{stats['clients']} clients, {stats['creatures']:.0f} creatures, tick "
+                  f"{stats['tick_mean_ms']:.2f} ms mean / {stats['tick_p95_ms']:.2f} ms p95, "
+                  f"{stats['bytes_sent_per_second'] / 1024:.1f} KiB/s out")
+    finally:
+        await server.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ocean Hunter multiplayer server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--backend', choices=['object', 'numpy'], default='numpy')
+    parser.add_argument('--density', type=float, default=1,
+                        help="scale every level's creature counts")
+    parser.add_argument('--max-players', type=int, default=MAX_PLAYERS)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    init_pygame(headless=True)
+    try:
+        asyncio.run(serve(args.host, args.port, seed=args.seed, backend=args.backend, density=args.density,
+                          max_players=args.max_players))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import numpy as np
+
+# Default world bounds used for wrapping (matches Creature.move)
+WORLD_WIDTH = 1024
+WORLD_HEIGHT = 768
+
+# Behaviour constants shared with Creature.update
+TURN_CHANCE = 0.02
+CHASE_RADIUS = 300
+
+# Moves longer than this in one tick (wrapping, respawns, level resets) are
+# drawn at the new position instead of sliding across the screen
+SNAP_DISTANCE = 64
+
+def round_half_away(values):
+    """Round like pygame does when a float is assigned to a Rect coordinate"""
+    return np.copysign(np.floor(np.abs(values) + 0.5), values).astype(np.int64)
+
+class CreatureSimulation:
+    """Struct-of-arrays creature simulation.
+
+    Positions, directions, speeds, sizes and predator flags live in NumPy
+    arrays and the whole population is advanced in one batched step with the
+    same turn, chase and wrap rules as Creature.update. The Creature sprites
+    stay in the sprite groups, but only their facing is kept current every
+    step: positions and rects are copied back lazily by sync_sprites(), for
+    all sprites or just the ones about to be drawn or collided. rects() and
+    overlapping() answer geometry queries straight from the arrays.
+    """
+    def __init__(self, seed=None, width=WORLD_WIDTH, height=WORLD_HEIGHT):
+        self.rng = np.random.default_rng(seed)
+        self.width = width
+        self.height = height
+        self.load([])
+
+    def __len__(self):
+        return len(self.creatures)
+
+    def arrays_for(self, creatures):
+        position = np.array([tuple(c.position) for c in creatures], dtype=np.float64).reshape(-1, 2)
+        return {
+            'position': position,
+            'previous': position.copy(),
+            'direction': np.array([tuple(c.direction) for c in creatures], dtype=np.float64).reshape(-1, 2),
+            'speed': np.array([c.speed for c in creatures], dtype=np.float64),
+            'size': np.array([c.size for c in creatures], dtype=np.int32),
+            'is_predator': np.array([c.is_predator for c in creatures], dtype=bool),
+            'facing_right': np.array([c.facing_right for c in creatures], dtype=bool),
+            'alive': np.ones(len(creatures), dtype=bool),
+        }
+
+    def reindex(self, start=0):
+        for i in range(start, len(self.creatures)):
+            self.creatures[i].sim_index = i
+
+    def load(self, creatures):
+        """Rebuild the arrays from a list of Creature sprites"""
+        self.creatures = list(creatures)
+        for name, array in self.arrays_for(self.creatures).items():
+            setattr(self, name, array)
+        self.synced_facing = self.facing_right.copy()
+        self.stale = False
+        self.removed = 0
+        self.reindex()
+
+    def append(self, creatures):
+        """Add newly spawned creatures to the end of the arrays"""
+        if not creatures:
+            return
+        start = len(self.creatures)
+        self.creatures.extend(creatures)
+        for name, array in self.arrays_for(creatures).items():
+            setattr(self, name, np.concatenate([getattr(self, name), array]))
+        self.synced_facing = np.concatenate([self.synced_facing, self.facing_right[start:]])
+        self.reindex(start)
+
+    def remove(self, creature):
+        """Mark a creature as gone; its slot is dropped by the next compact()"""
+        index = getattr(creature, 'sim_index', None)
+        if index is not None and index < len(self.creatures) and self.creatures[index] is creature:
+            self.alive[index] = False
+            self.removed += 1
+        creature.sim_index = None
+
+    def remove_dead(self):
+        """Mark creatures killed without remove() (no longer in any sprite group)"""
+        for creature in self.creatures:
+            if creature.sim_index is not None and not creature.alive():
+                self.remove(creature)
+
+    @property
+    def live_count(self):
+        return len(self.creatures) - self.removed
+
+    def compact(self):
+        """Drop the slots of removed creatures"""
+        if not self.removed:
+            return
+        keep = self.alive
+        self.creatures = [c for c, k in zip(self.creatures, keep.tolist()) if k]
+        for name in ('position', 'previous', 'direction', 'speed', 'size', 'is_predator',
+                     'facing_right', 'synced_facing', 'alive'):
+            setattr(self, name, getattr(self, name)[keep])
+        self.removed = 0
+        self.reindex()
+
+    def random_directions(self, count):
+        """Unit vectors from uniform(-1, 1) components, like Creature.update"""
+        directions = self.rng.uniform(-1, 1, size=(count, 2))
+        lengths = np.hypot(directions[:, 0], directions[:, 1])
+        # A zero-length roll keeps the previous direction
+        valid = lengths > 0
+        directions[valid] /= lengths[valid, None]
+        return directions, valid
+
+    def step(self, player_pos=None, behavior=None, player_size=None, ticks=1):
+        """Advance every creature by one frame.
+
+        With a BehaviorEngine the directions come from its steering instead
+        of the classic turn and chase rules. ticks scales the distance moved,
+        for populations stepped less often than every frame.
+        """
+        count = len(self.creatures)
+        if count == 0:
+            return
+        # Kept for drawing between this step and the next
+        self.previous = self.position.copy()
+        old_x = self.previous[:, 0]
+
+        if behavior is not None:
+            behavior.steer(self.position, self.direction, self.size, self.is_predator,
+                           player_pos, player_size)
+        else:
+            self.classic_steer(player_pos)
+
+        # Update position
+        self.position += self.direction * (self.speed[:, None] * ticks)
+
+        # Update facing direction (unchanged when there is no horizontal motion)
+        x = self.position[:, 0]
+        y = self.position[:, 1]
+        self.facing_right[x > old_x] = True
+        self.facing_right[x < old_x] = False
+
+        # Wrap around screen edges
+        x_low = x < 0
+        x_high = x > self.width
+        x[x_low] = self.width
+        x[x_high] = 0
+        y_low = y < 0
+        y_high = y > self.height
+        y[y_low] = self.height
+        y[y_high] = 0
+
+        # Only sprites that turned around need their image swapped
+        for i in np.flatnonzero(self.facing_right != self.synced_facing).tolist():
+            self.creatures[i].set_facing(bool(self.facing_right[i]))
+        self.synced_facing[:] = self.facing_right
+        self.stale = True
+
+    def classic_steer(self, player_pos):
+        count = len(self.creatures)
+        if player_pos is not None:
+            # Predators chase the player within range, everyone else wanders
+            wanderers = ~self.is_predator
+            to_player = np.asarray(player_pos, dtype=np.float64) - self.position
+            distance = np.hypot(to_player[:, 0], to_player[:, 1])
+            chasing = self.is_predator & (distance < CHASE_RADIUS) & (distance > 0)
+            self.direction[chasing] = to_player[chasing] / distance[chasing, None]
+        else:
+            wanderers = np.ones(count, dtype=bool)
+
+        # Random movement with occasional direction changes
+        turning = np.flatnonzero(wanderers & (self.rng.random(count) < TURN_CHANCE))
+        if len(turning):
+            directions, valid = self.random_directions(len(turning))
+            self.direction[turning[valid]] = directions[valid]
+
+    def rects(self):
+        """(n, 4) array of every sprite's rect as x, y, width, height"""
+        rects = np.empty((len(self.creatures), 4), dtype=np.int64)
+        rects[:, :2] = round_half_away(self.position)
+        rects[:, 2] = self.size
+        rects[:, 3] = self.size
+        return rects
+
+    def interpolated_rects(self, alpha):
+        """rects() alpha of the way from the positions before the last step"""
+        rects = self.rects()
+        delta = self.position - self.previous
+        sliding = (np.abs(delta) <= SNAP_DISTANCE).all(axis=1)
+        rects[sliding, :2] = round_half_away(self.previous[sliding] + delta[sliding] * alpha)
+        return rects
+
+    def overlapping(self, rect):
+        """Indices of the creatures whose rects overlap rect, like Rect.colliderect"""
+        rects = self.rects()
+        hit = ((rects[:, 0] < rect.right) & (rect.left < rects[:, 0] + rects[:, 2])
+               & (rects[:, 1] < rect.bottom) & (rect.top < rects[:, 1] + rects[:, 3]))
+        return np.flatnonzero(hit)
+
+    def sync_sprites(self, indices=None):
+        """Copy array positions into the Creature sprites and their rects.
+
+        With indices only those sprites are updated; a full sync is skipped
+        when nothing moved since the last one.
+        """
+        if indices is None:
+            if not self.stale:
+                return
+            creatures = self.creatures
+            positions = self.position.tolist()
+            self.stale = False
+        else:
+            creatures = [self.creatures[i] for i in indices]
+            positions = self.position[indices].tolist()
+        for creature, position in zip(creatures, positions):
+            creature.position.update(position)
+            creature.rect.topleft = position
@@ -0,0 +1,327 @@
+import pygame
+import os
+import struct
+from collections import OrderedDict
+import numpy as np
+
+from replay import BACKENDS, AI_MODES, FLAG_PRECISE_COLLISIONS
+
+# File layout: header, then the game, player, particle and creature sections
+# in the order save_snapshot() writes them. Everything is little-endian.
+MAGIC = b'OHSN'
+VERSION = 1
+HEADER = struct.Struct('<4sHIBBBII')  # magic, version, seed, backend, ai, flags, world width, world height
+
+# Game state enum values are stored as bytes
+GAME_STATES = ('MENU', 'PLAYING', 'GAME_OVER')
+
+class SnapshotError(Exception):
+    pass
+
+class Writer:
+    """Accumulates struct-packed fields and raw NumPy arrays"""
+    def __init__(self):
+        self.parts = []
+
+    def pack(self, fmt, *values):
+        self.parts.append(struct.pack('<' + fmt, *values))
+
+    def string(self, text):
+        data = (text or '').encode('utf-8')
+        self.pack('H', len(data))
+        self.parts.append(data)
+
+    def array(self, values, dtype):
+        array = np.ascontiguousarray(values, dtype=dtype)
+        self.pack('I', array.size)
+        self.parts.append(array.tobytes())
+
+    def random_state(self, rng):
+        """State of a random.Random"""
+        version, state, gauss = rng.getstate()
+        self.pack('B', version)
+        self.array(state, np.uint32)
+        self.pack('?d', gauss is not None, gauss or 0.0)
+
+    def generator_state(self, generator):
+        """State of a NumPy PCG64 Generator"""
+        state = generator.bit_generator.state
+        if state['bit_generator'] != 'PCG64':
+            raise SnapshotError(f"Unsupported bit generator {state['bit_generator']}")
+        self.parts.append(state['state']['state'].to_bytes(16, 'little'))
+        self.parts.append(state['state']['inc'].to_bytes(16, 'little'))
+        self.pack('BI', state['has_uint32'], state['uinteger'])
+
+    def to_bytes(self):
+        return b''.join(self.parts)
+
+class Reader:
+    def __init__(self, data, offset=0):
+        self.data = memoryview(data)
+        self.offset = offset
+
+    def unpack(self, fmt):
+        fmt = '<' + fmt
+        try:
+            values = struct.unpack_from(fmt, self.data, self.offset)
+        except struct.error as e:
+            raise SnapshotError(f"Truncated snapshot: {e}")
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def bytes(self, count):
+        if self.offset + count > len(self.data):
+            raise SnapshotError("Truncated snapshot")
+        data = bytes(self.data[self.offset:self.offset + count])
+        self.offset += count
+        return data
+
+    def string(self):
+        (length,) = self.unpack('H')
+        return self.bytes(length).decode('utf-8') or None
+
+    def array(self, dtype, columns=1):
+        (size,) = self.unpack('I')
+        dtype = np.dtype(dtype)
+        array = np.frombuffer(self.bytes(size * dtype.itemsize), dtype=dtype)
+        return array.reshape(-1, columns) if columns > 1 else array
+
+    def random_state(self):
+        """State tuple for random.Random.setstate"""
+        (version,) = self.unpack('B')
+        state = tuple(self.array(np.uint32).tolist())
+        has_gauss, gauss = self.unpack('?d')
+        return version, state, gauss if has_gauss else None
+
+    def generator_state(self, generator):
+        state = int.from_bytes(self.bytes(16), 'little')
+        inc = int.from_bytes(self.bytes(16), 'little')
+        has_uint32, uinteger = self.unpack('BI')
+        generator.bit_generator.state = {'bit_generator': 'PCG64', 'state': {'state': state, 'inc': inc},
+                                         'has_uint32': has_uint32, 'uinteger': uinteger}
+
+class SpecTable:
+    """Distinct creature specs, so each creature stores a 2-byte index"""
+    def __init__(self):
+        self.specs = []
+        self.index = {}
+
+    def __call__(self, spec):
+        i = self.index.get(spec)
+        if i is None:
+            i = self.index[spec] = len(self.specs)
+            self.specs.append(spec)
+        return i
+
+    def write(self, writer):
+        writer.pack('H', len(self.specs))
+        for is_predator, size, speed, color, sprite_name in self.specs:
+            writer.pack('?id3B', is_predator, size, speed, *color[:3])
+            writer.string(sprite_name)
+
+    @staticmethod
+    def read(reader):
+        (count,) = reader.unpack('H')
+        specs = []
+        for _ in range(count):
+            is_predator, size, speed, r, g, b = reader.unpack('?id3B')
+            specs.append((is_predator, size, speed, (r, g, b), reader.string()))
+        return specs
+
+def write_manager(writer, manager, specs):
+    simulation = manager.simulation
+    if simulation is not None:
+        # Array order drives the batched step, so it is kept as is; directions
+        # live only in the arrays
+        if simulation.live_count != len(manager.prey_group) + len(manager.predator_group):
+            simulation.remove_dead()
+        simulation.compact()
+        creatures = list(simulation.creatures)
+        state = np.column_stack([simulation.position, simulation.direction, simulation.facing_right])
+    else:
+        creatures = manager.creatures()
+        state = [(c.position.x, c.position.y, c.direction.x, c.direction.y, c.facing_right) for c in creatures]
+    order = {creature: i for i, creature in enumerate(creatures)}
+    writer.array([specs(c.spec) for c in creatures], np.uint16)
+    writer.array(state, np.float64)
+    # Group iteration order decides update and collision order
+    writer.array([order[c] for c in manager.prey_group], np.uint32)
+    writer.array([order[c] for c in manager.predator_group], np.uint32)
+    writer.array([specs(spec) for spec in manager.pending], np.uint16)
+
+    writer.pack('??', manager.behavior is not None, manager.simulation is not None)
+    if manager.behavior is not None:
+        writer.generator_state(manager.behavior.rng)
+        writer.pack('I', manager.behavior.cursor)
+    if manager.simulation is not None:
+        writer.generator_state(manager.simulation.rng)
+
+def read_manager(reader, manager, specs):
+    spec_index = reader.array(np.uint16)
+    state = reader.array(np.float64, 5)
+    prey_order = reader.array(np.uint32)
+    predator_order = reader.array(np.uint32)
+    pending = reader.array(np.uint16)
+
+    # Reuse pooled creatures; no sprite is decoded or scaled twice
+    manager.release_all()
+    manager.pending.clear()
+    creatures = []
+    for i, (x, y, dx, dy, facing) in zip(spec_index.tolist(), state.tolist()):
+        creature = manager._spawn(*specs[i], x=x, y=y)
+        creature.direction.update(dx, dy)
+        creature.set_facing(bool(facing))
+        creatures.append(creature)
+    manager.prey_group.empty()
+    manager.predator_group.empty()
+    manager.prey_group.add(*[creatures[i] for i in prey_order.tolist()])
+    manager.predator_group.add(*[creatures[i] for i in predator_order.tolist()])
+    manager.pending.extend(specs[i] for i in pending.tolist())
+
+    has_behavior, has_simulation = reader.unpack('??')
+    if has_behavior != (manager.behavior is not None) or has_simulation != (manager.simulation is not None):
+        raise SnapshotError("Snapshot was taken with a different ai or backend")
+    if has_behavior:
+        reader.generator_state(manager.behavior.rng)
+        (manager.behavior.cursor,) = reader.unpack('I')
+    if has_simulation:
+        manager.simulation.load(creatures)
+        reader.generator_state(manager.simulation.rng)
+    manager.index_stale = True
+
+def write_world(writer, world, specs):
+    center = world.center if world.center is not None else (-1, -1)
+    writer.pack('Iii3I', world.tick, *center, world.level, world.prey_eaten, world.prey_goal)
+    writer.array(world.pending, np.int32)
+    writer.pack('I', len(world.chunks))
+    for key, chunk in world.chunks.items():
+        writer.pack('ii?', *key, chunk.generated)
+        writer.array([specs(entry[0]) for entry in chunk.entries], np.uint16)
+        writer.array([entry[1:] for entry in chunk.entries], np.float64)
+    for manager in world.managers.values():
+        write_manager(writer, manager, specs)
+
+def read_world(reader, world, specs, seed):
+    # Chunks are generated from the session seed
+    world.seed = seed
+    world.tick, cx, cy, world.level, world.prey_eaten, world.prey_goal = reader.unpack('Iii3I')
+    world.center = (cx, cy) if cx >= 0 else None
+    world.pending = [tuple(key) for key in reader.array(np.int32, 2).tolist()]
+    world.chunks = OrderedDict()
+    (count,) = reader.unpack('I')
+    for _ in range(count):
+        cx, cy, generated = reader.unpack('ii?')
+        chunk = world.chunk((cx, cy))
+        chunk.generated = generated
+        entry_specs = reader.array(np.uint16).tolist()
+        entries = reader.array(np.float64, 5).tolist()
+        chunk.entries = [(specs[i], *entry) for i, entry in zip(entry_specs, entries)]
+    world.detail = world.detail_for(world.center) if world.center is not None else {}
+    for manager in world.managers.values():
+        read_manager(reader, manager, specs)
+
+def save_snapshot(game):
+    """Serialize the simulation state of a Game into bytes"""
+    specs = SpecTable()
+    body = Writer()
+
+    body.pack('iBBI', game.score, game.current_level, GAME_STATES.index(game.state.name), game.ticks)
+    body.random_state(game.rng)
+
+    player = game.player
+    body.pack('ddi?B4i', player.position.x, player.position.y, player.size, player.facing_right,
+              player.level, *player.rect)
+
+    particles = game.particles
+    n = particles.count
+    body.pack('I', particles.dropped)
+    for array in (particles.x, particles.y, particles.size, particles.speed, particles.alpha,
+                  particles.fade, particles.color):
+        body.array(array[:n], array.dtype)
+    body.array(particles.colors, np.uint8)
+
+    if game.world is not None:
+        write_world(body, game.world, specs)
+    else:
+        write_manager(body, game.creature_manager, specs)
+
+    header = Writer()
+    header.parts.append(HEADER.pack(MAGIC, VERSION, game.seed, BACKENDS.index(game.backend),
+                                    AI_MODES.index(game.ai),
+                                    FLAG_PRECISE_COLLISIONS if game.precise_collisions else 0,
+                                    *game.world_size))
+    specs.write(header)
+    return header.to_bytes() + body.to_bytes()
+
+def read_header(data):
+    """(seed, backend, ai, precise_collisions, world_size) of a snapshot"""
+    try:
+        magic, version, seed, backend, ai, flags, width, height = HEADER.unpack_from(data, 0)
+    except struct.error as e:
+        raise SnapshotError(f"Truncated snapshot: {e}")
+    if magic != MAGIC:
+        raise SnapshotError("Not an Ocean Hunter snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    return seed, BACKENDS[backend], AI_MODES[ai], bool(flags & FLAG_PRECISE_COLLISIONS), (width, height)
+
+def restore_snapshot(game, data):
+    """Load a snapshot into an existing Game built with the same settings"""
+    seed, backend, ai, precise_collisions, world_size = read_header(data)
+    if (backend, ai, precise_collisions, world_size) != (game.backend, game.ai, game.precise_collisions,
+                                                         game.world_size):
+        raise SnapshotError(f"Snapshot was taken with backend={backend} ai={ai} "
+                            f"precise_collisions={precise_collisions} world_size={world_size}")
+    reader = Reader(data, HEADER.size)
+    specs = SpecTable.read(reader)
+
+    game.seed = seed
+    score, level, state, game.ticks = reader.unpack('iBBI')
+    game.score = score
+    game.current_level = level
+    game.state = type(game.state)[GAME_STATES[state]]
+    rng_state = reader.random_state()
+
+    x, y, size, facing_right, player_level, *rect = reader.unpack('ddi?B4i')
+    player = game.player
+    player.level = player_level
+    player.size = size
+    player.facing_right = facing_right
+    player.load_sprite()
+    player.position.update(x, y)
+    player.rect = pygame.Rect(rect)
+
+    particles = game.particles
+    (particles.dropped,) = reader.unpack('I')
+    arrays = (particles.x, particles.y, particles.size, particles.speed, particles.alpha,
+              particles.fade, particles.color)
+    for array in arrays:
+        values = reader.array(array.dtype)
+        array[:len(values)] = values
+    particles.count = len(values)
+    particles.colors = [tuple(color) for color in reader.array(np.uint8, 3).tolist()]
+    particles.color_index = {color: i for i, color in enumerate(particles.colors)}
+
+    if game.world is not None:
+        read_world(reader, game.world, specs, seed)
+    else:
+        read_manager(reader, game.creature_manager, specs)
+    # Last: respawning creatures above rolls directions from the shared RNG
+    game.rng.setstate(rng_state)
+
+    game.camera.follow(player.rect)
+    if game.renderer:
+        game.renderer.invalidate()
+
+def write_snapshot(game, path):
+    """Save a snapshot atomically so a crash mid-write keeps the previous one"""
+    data = save_snapshot(game)
+    temp = path + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(data)
+    os.replace(temp, path)
+    return len(data)
+
+def read_snapshot(path):
+    with open(path, 'rb') as f:
+        return f.read()
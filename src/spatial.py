@@ -0,0 +1,111 @@
+import itertools
+import numpy as np
+
+# Cell keys pack (cx, cy) into one int64, cx in the high bits, so sorting by
+# key sorts cells column by column
+KEY_SHIFT = 1 << 32
+
+def cell_keys(cx, cy):
+    return cx * KEY_SHIFT + cy
+
+def rect_array(sprites):
+    """(n, 4) array of the sprites' rects as x, y, width, height"""
+    values = itertools.chain.from_iterable(sprite.rect for sprite in sprites)
+    return np.fromiter(values, dtype=np.int64, count=4 * len(sprites)).reshape(-1, 4)
+
+def overlaps(rects, other):
+    """Rows of rects that overlap other rects (or one rect), like Rect.colliderect"""
+    other = np.asarray(other)
+    return ((rects[:, 0] < other[..., 0] + other[..., 2]) & (other[..., 0] < rects[:, 0] + rects[:, 2])
+            & (rects[:, 1] < other[..., 1] + other[..., 3]) & (other[..., 1] < rects[:, 1] + rects[:, 3]))
+
+def runs(starts, counts):
+    """Concatenated ranges starts[i]:starts[i] + counts[i]"""
+    total = int(counts.sum())
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(total)
+
+class SpatialHash:
+    """Uniform-grid broadphase over rect arrays.
+
+    rebuild() buckets every rect by the cell of its top-left corner with one
+    floor-divide and sort, so items in a cell sit next to each other in the
+    sorted order. A query widens its cell range by reach, the most cells a
+    rect extends past its own, so no overlap is missed, and then tests the
+    candidates' rects exactly. The index is rebuilt once per tick by
+    CreatureManager.update; candidate_count counts the candidates looked at
+    by queries since then.
+    """
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.rebuild([], np.empty((0, 4), dtype=np.int64))
+
+    def __len__(self):
+        return len(self.items)
+
+    def rebuild(self, items, rects):
+        """Index items by their (n, 4) x, y, width, height rects"""
+        size = self.cell_size
+        self.items = items
+        self.rects = rects
+        keys = cell_keys(rects[:, 0] // size, rects[:, 1] // size)
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+        extent = int(rects[:, 2:].max()) if len(rects) else 1
+        self.reach = (size + extent - 2) // size
+        self.candidate_count = 0
+        self.query_count = 0
+
+    def cell_range(self, rect):
+        """Inclusive cell coordinates covered by a rect"""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def query(self, rect):
+        """Indices of the items whose rects overlap rect, in item order"""
+        x0, y0, x1, y1 = self.cell_range(rect)
+        columns = np.arange(x0 - self.reach, x1 + 1)
+        # Each column's cells y0 - reach..y1 are one run of the sorted keys
+        starts = np.searchsorted(self.keys, cell_keys(columns, y0 - self.reach), 'left')
+        ends = np.searchsorted(self.keys, cell_keys(columns, y1), 'right')
+        candidates = self.order[runs(starts, ends - starts)]
+        self.query_count += 1
+        self.candidate_count += len(candidates)
+        hits = candidates[overlaps(self.rects[candidates], tuple(rect))]
+        return np.sort(hits)
+
+    def query_rect(self, rect):
+        """Items whose rects overlap rect"""
+        return [self.items[i] for i in self.query(rect).tolist()]
+
+    def query_sprite(self, sprite):
+        """Items overlapping a sprite, excluding the sprite itself"""
+        return [other for other in self.query_rect(sprite.rect) if other is not sprite]
+
+    def pair_indices(self):
+        """(a, b) index arrays of every pair of overlapping rects, a < b"""
+        size = self.cell_size
+        cells = self.rects[self.order, :2] // size
+        found_a, found_b = [], []
+        # Overlapping items are at most reach cells apart in each direction
+        for dx in range(-self.reach, self.reach + 1):
+            for dy in range(-self.reach, self.reach + 1):
+                keys = cell_keys(cells[:, 0] + dx, cells[:, 1] + dy)
+                starts = np.searchsorted(self.keys, keys, 'left')
+                counts = np.searchsorted(self.keys, keys, 'right') - starts
+                a = self.order[np.repeat(np.arange(len(keys)), counts)]
+                b = self.order[runs(starts, counts)]
+                self.candidate_count += len(a)
+                keep = a < b
+                a, b = a[keep], b[keep]
+                keep = overlaps(self.rects[a], self.rects[b])
+                found_a.append(a[keep])
+                found_b.append(b[keep])
+        return np.concatenate(found_a), np.concatenate(found_b)
+
+    def pairs(self):
+        """Unique pairs of items whose rects overlap (creature-vs-creature)"""
+        a, b = self.pair_indices()
+        items = self.items
+        return [(items[i], items[j]) for i, j in zip(a.tolist(), b.tolist())]
@@ -0,0 +1,123 @@
+import pygame
+from collections import OrderedDict
+from assets import asset_manager
+
+def surface_bytes(surface):
+    return surface.get_height() * surface.get_pitch()
+
+class SpriteCache:
+    """Process-wide cache of scaled, pre-flipped sprite surfaces.
+
+    Source images come from the asset manager, which may already have
+    decoded them in the background, and are kept for the lifetime of the cache.
+    Scaled variants are keyed by (sprite_name, size, facing_right) and
+    evicted least-recently-used once more than max_entries are held or
+    their pixels take more than max_bytes. Collision masks are built on
+    first request for a variant and evicted along with its surface.
+    """
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, assets=asset_manager):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.assets = assets
+        self.sources = {}
+        self.entries = OrderedDict()
+        self.masks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load_source(self, sprite_name):
+        """Source image for a sprite; returns None if it is missing or unreadable"""
+        if sprite_name in self.sources:
+            return self.sources[sprite_name]
+
+        # None falls back to a colored rectangle
+        image = self.assets.image(sprite_name)
+        self.sources[sprite_name] = image
+        return image
+
+    def key(self, sprite_name, size, facing_right, fallback_color):
+        source = self.load_source(sprite_name) if sprite_name else None
+        return (sprite_name if source else tuple(fallback_color), size, facing_right), source
+
+    def get(self, sprite_name, size, facing_right=True, fallback_color=(255, 255, 255)):
+        """Return the shared surface for a sprite at a size and facing.
+
+        Missing sprites are replaced by a filled square, cached under the
+        fallback color instead of the sprite name.
+        """
+        key, source = self.key(sprite_name, size, facing_right, fallback_color)
+
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        return self._build(key, source, fallback_color)
+
+    def _build(self, key, source, fallback_color):
+        """Scale or flip the surface for a key and cache it, without counting a hit or miss"""
+        _, size, facing_right = key
+        if not facing_right:
+            # Build the left-facing variant from the right-facing one
+            right_key = key[:2] + (True,)
+            right = self.entries.get(right_key)
+            if right is None:
+                right = self._build(right_key, source, fallback_color)
+            else:
+                self.entries.move_to_end(right_key)
+            surface = pygame.transform.flip(right, True, False)
+        elif source:
+            surface = pygame.transform.scale(source, (size, size))
+        else:
+            surface = pygame.Surface([size, size])
+            surface.fill(fallback_color)
+
+        self.entries[key] = surface
+        self.bytes += surface_bytes(surface)
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            evicted_key, evicted = self.entries.popitem(last=False)
+            self.masks.pop(evicted_key, None)
+            self.bytes -= surface_bytes(evicted)
+            self.evictions += 1
+        return surface
+
+    def get_pair(self, sprite_name, size, fallback_color=(255, 255, 255)):
+        """Return the (right, left) facing surfaces for a sprite"""
+        return (self.get(sprite_name, size, True, fallback_color),
+                self.get(sprite_name, size, False, fallback_color))
+
+    def get_mask(self, sprite_name, size, facing_right=True, fallback_color=(255, 255, 255)):
+        """Return the collision mask of the surface get() returns for the same arguments"""
+        key, _ = self.key(sprite_name, size, facing_right, fallback_color)
+        mask = self.masks.get(key)
+        if mask is None:
+            surface = self.get(sprite_name, size, facing_right, fallback_color)
+            mask = self.masks[key] = pygame.mask.from_surface(surface)
+        return mask
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'sources': len(self.sources),
+            'masks': len(self.masks),
+        }
+
+    def clear(self):
+        self.sources.clear()
+        self.entries.clear()
+        self.masks.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+# Shared by every Creature and Player in the process
+sprite_cache = SpriteCache()
@@ -0,0 +1,308 @@
+import pygame
+import random
+import numpy as np
+from collections import OrderedDict
+
+from creature import CreatureManager, LEVEL_SPAWNS, level_specs
+
+# World chunks are square; a 1024x768 screen spans about 2x1.5 of them
+CHUNK_SIZE = 512
+
+# Chebyshev chunk distance from the player's chunk of each detail level:
+# active chunks update every tick, far ones every FAR_INTERVAL ticks and
+# anything beyond is dormant (saved compactly, not simulated)
+ACTIVE_RADIUS = 2
+FAR_RADIUS = 4
+FAR_INTERVAL = 8
+
+# Chunks generated per tick while the neighborhood fills in
+CHUNKS_PER_TICK = 2
+
+# Dormant chunk states kept before the least recently visited are forgotten
+MAX_SAVED_CHUNKS = 1024
+
+ACTIVE = 'active'
+FAR = 'far'
+
+class Camera:
+    """Screen-sized view of the world that follows the player"""
+    def __init__(self, size, world_size):
+        self.rect = pygame.Rect((0, 0), size)
+        self.world_rect = pygame.Rect((0, 0), world_size)
+
+    @property
+    def offset(self):
+        """What to add to world coordinates to get screen coordinates"""
+        return pygame.math.Vector2(-self.rect.x, -self.rect.y)
+
+    def follow(self, target):
+        self.rect.center = target.center
+        self.rect.clamp_ip(self.world_rect)
+
+    def apply(self, rect):
+        """A world rect in screen coordinates"""
+        return rect.move(-self.rect.x, -self.rect.y)
+
+class Chunk:
+    """Square region of the world and the creatures it owns while dormant"""
+    __slots__ = ('key', 'rect', 'generated', 'entries')
+
+    def __init__(self, key, rect):
+        self.key = key
+        self.rect = rect
+        self.generated = False
+        # Dormant creatures as (spec, x, y, dx, dy, tick saved)
+        self.entries = []
+
+class ChunkedWorld:
+    """A world many screens large whose creatures live in chunks.
+
+    Chunks near the player are simulated at full rate by the active
+    CreatureManager, the ring around them by a far manager that steps every
+    far_interval ticks, moving its creatures that many frames at once. Chunks
+    further out are dormant: their creatures go back to the shared pool and
+    only (spec, position, heading, tick) entries are kept. When a dormant
+    chunk is re-entered its creatures are fast-forwarded analytically in a
+    straight line for the ticks it slept, wrapping at the world edges like
+    live creatures, and handed to whichever chunk they end up in.
+
+    Chunks are generated the first time they come near the player, nearest
+    first and a few per tick, so memory and CPU follow the neighborhood
+    rather than the world size. Game uses a ChunkedWorld in place of a
+    CreatureManager; a level is complete once the player has eaten as many
+    prey as the single-screen level holds.
+    """
+    def __init__(self, world_size, screen_size, seed, backend="object", ai="classic", rng=None,
+                 chunk_size=CHUNK_SIZE, active_radius=ACTIVE_RADIUS, far_radius=FAR_RADIUS,
+                 far_interval=FAR_INTERVAL, chunks_per_tick=CHUNKS_PER_TICK, max_saved=MAX_SAVED_CHUNKS,
+                 pool=None):
+        self.world_size = world_size
+        self.seed = seed
+        self.rng = rng or random.Random(seed)
+        self.chunk_size = chunk_size
+        self.columns = -(-world_size[0] // chunk_size)
+        self.rows = -(-world_size[1] // chunk_size)
+        self.active_radius = active_radius
+        self.far_radius = far_radius
+        self.far_interval = far_interval
+        self.chunks_per_tick = chunks_per_tick
+        self.max_saved = max_saved
+
+        # Chunk population matches the single-screen density
+        self.density = chunk_size * chunk_size / (screen_size[0] * screen_size[1])
+
+        pool = pool if pool is not None else []
+        self.active = CreatureManager(backend, rng=self.rng, ai=ai, world_size=world_size, pool=pool)
+        self.far = CreatureManager(backend, rng=self.rng, ai=ai, world_size=world_size, pool=pool)
+        self.managers = {ACTIVE: self.active, FAR: self.far}
+
+        self.chunks = OrderedDict()
+        self.detail = {}  # chunk key -> ACTIVE or FAR for every loaded chunk
+        self.pending = []
+        self.center = None
+        self.level = 1
+        self.tick = 0
+        self.prey_eaten = 0
+        self.prey_goal = 0
+
+    # CreatureManager interface used by Game
+
+    @property
+    def prey_group(self):
+        return self.active.prey_group
+
+    @property
+    def predator_group(self):
+        return self.active.predator_group
+
+    @property
+    def free(self):
+        return self.active.free
+
+    @property
+    def spatial_index(self):
+        return self.active.spatial_index
+
+    @property
+    def spawning(self):
+        return bool(self.pending)
+
+    def creatures(self):
+        return self.active.creatures() + self.far.creatures()
+
+    def nearby(self, rect):
+        return self.active.nearby(rect)
+
+    def draw(self, surface, collect_rects=False, view=None, alpha=1.0):
+        # Only active chunks are close enough to be in view
+        return self.active.draw(surface, collect_rects, view, alpha)
+
+    def release(self, creature):
+        if not creature.is_predator:
+            self.prey_eaten += 1
+        self.active.release(creature)
+
+    def level_complete(self):
+        return self.prey_eaten >= self.prey_goal
+
+    def release_all(self):
+        for manager in self.managers.values():
+            manager.release_all()
+
+    def spawn_creatures(self, level, density=1, trickle=False, center=None):
+        """Start a level: forget every chunk and regenerate around center"""
+        self.level = level
+        self.prey_eaten = 0
+        self.prey_goal = sum(count for count, *_ in LEVEL_SPAWNS.get(level, {}).get('prey', ()))
+        self.release_all()
+        self.chunks.clear()
+        self.detail = {}
+        self.pending = []
+        if center is None:
+            center = (self.world_size[0] // 2, self.world_size[1] // 2)
+        self.center = None
+        self.recenter(self.chunk_key(center))
+        if not trickle:
+            self.generate_pending(len(self.pending))
+
+    def update(self, player_pos, player_size=None):
+        self.tick += 1
+        key = self.chunk_key(player_pos)
+        if key != self.center:
+            self.recenter(key)
+        elif self.tick % self.far_interval == 0:
+            self.migrate()
+        if self.pending:
+            self.generate_pending(self.chunks_per_tick)
+
+        self.active.update(player_pos, player_size)
+        if self.tick % self.far_interval == 0:
+            self.far.update(player_pos, player_size, ticks=self.far_interval)
+
+    # Chunk bookkeeping
+
+    def chunk_key(self, position):
+        cx = min(max(int(position[0]) // self.chunk_size, 0), self.columns - 1)
+        cy = min(max(int(position[1]) // self.chunk_size, 0), self.rows - 1)
+        return cx, cy
+
+    def chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            size = self.chunk_size
+            rect = pygame.Rect(key[0] * size, key[1] * size, size, size).clip((0, 0), self.world_size)
+            chunk = self.chunks[key] = Chunk(key, rect)
+        self.chunks.move_to_end(key)
+        return chunk
+
+    def detail_for(self, center):
+        """Detail level of every chunk loaded around center"""
+        detail = {}
+        for dx in range(-self.far_radius, self.far_radius + 1):
+            for dy in range(-self.far_radius, self.far_radius + 1):
+                key = (center[0] + dx, center[1] + dy)
+                if 0 <= key[0] < self.columns and 0 <= key[1] < self.rows:
+                    detail[key] = ACTIVE if max(abs(dx), abs(dy)) <= self.active_radius else FAR
+        return detail
+
+    def recenter(self, center):
+        """Reassign detail levels around the player's new chunk"""
+        self.center = center
+        detail = self.detail_for(center)
+        entering = [key for key in detail if key not in self.detail]
+        self.migrate(detail)
+
+        # Wake dormant creatures; queue ungenerated chunks, nearest first
+        for key in sorted(entering, key=lambda k: max(abs(k[0] - center[0]), abs(k[1] - center[1]))):
+            chunk = self.chunk(key)
+            self.wake(chunk)
+            if not chunk.generated and key not in self.pending:
+                self.pending.append(key)
+        self.forget()
+
+    def migrate(self, detail=None):
+        """Hand creatures that swam into another detail level to its manager"""
+        if detail is None:
+            detail = self.detail
+        moving = {ACTIVE: [], FAR: []}
+        for level, manager in self.managers.items():
+            for creature in manager.creatures():
+                target = detail.get(self.chunk_key(creature.position))
+                if target == level:
+                    continue
+                manager.detach(creature)
+                if target is None:
+                    self.sleep(creature)
+                else:
+                    moving[target].append(creature)
+        for level, creatures in moving.items():
+            self.managers[level].adopt(creatures)
+        self.detail = detail
+
+    def sleep(self, creature):
+        """Save a creature into its (dormant) chunk and return it to the pool"""
+        chunk = self.chunk(self.chunk_key(creature.position))
+        chunk.entries.append((creature.spec, creature.position.x, creature.position.y,
+                              creature.direction.x, creature.direction.y, self.tick))
+        self.active.free.append(creature)
+
+    def wake(self, chunk):
+        """Fast-forward a dormant chunk's creatures to now and hand them to their chunks' managers"""
+        if not chunk.entries:
+            return
+        entries = chunk.entries
+        chunk.entries = []
+        state = np.array([entry[1:] for entry in entries], dtype=np.float64)
+        speed = np.array([entry[0][2] for entry in entries], dtype=np.float64)
+        elapsed = self.tick - state[:, 4]
+        travelled = state[:, 0:2] + state[:, 2:4] * (speed * elapsed)[:, None]
+        position = np.mod(travelled, self.world_size)
+
+        waking = {ACTIVE: [], FAR: []}
+        for entry, (x, y) in zip(entries, position.tolist()):
+            spec, _, _, dx, dy, _ = entry
+            key = self.chunk_key((x, y))
+            level = self.detail.get(key)
+            if level is None:
+                # Swam on into a chunk that is still dormant
+                self.chunk(key).entries.append((spec, x, y, dx, dy, self.tick))
+            else:
+                waking[level].append((spec, x, y, dx, dy))
+        for level, restored in waking.items():
+            self.managers[level].restore(restored)
+
+    def generate_pending(self, count):
+        """Spawn the level population of up to count queued chunks"""
+        while self.pending and count > 0:
+            key = self.pending.pop(0)
+            level = self.detail.get(key)
+            if level is None:
+                continue
+            chunk = self.chunk(key)
+            # Every chunk's layout depends only on the seed, level and position
+            rng = random.Random(f"{self.seed}:{self.level}:{key[0]}:{key[1]}")
+            area = chunk.rect.inflate(-1, -1)
+            self.managers[level].spawn(level_specs(self.level, self.density), area, rng)
+            chunk.generated = True
+            count -= 1
+
+    def forget(self):
+        """Drop the oldest dormant chunk states past max_saved; they regenerate when revisited"""
+        excess = len(self.chunks) - self.max_saved
+        for key in list(self.chunks):
+            if excess <= 0:
+                break
+            if key not in self.detail:
+                del self.chunks[key]
+                excess -= 1
+
+    def stats(self):
+        return {
+            'active_creatures': len(self.active.prey_group) + len(self.active.predator_group),
+            'far_creatures': len(self.far.prey_group) + len(self.far.predator_group),
+            'dormant_creatures': sum(len(chunk.entries) for chunk in self.chunks.values()),
+            'loaded_chunks': len(self.detail),
+            'saved_chunks': len(self.chunks),
+            'pending_chunks': len(self.pending),
+            'pooled': len(self.active.free),
+        }
@@ -0,0 +1,18 @@
+import os
+import sys
+
+# The game modules import each other as scripts from src/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import pytest
+import pygame
+
+@pytest.fixture(scope="session", autouse=True)
+def display():
+    """Headless display, so sprites can be converted and drawn"""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.init()
+    screen = pygame.display.set_mode((1024, 768))
+    yield screen
+    pygame.quit()
@@ -0,0 +1,88 @@
+import time
+import wave
+import pygame
+import pytest
+
+from assets import AssetManager, SOUND_FILES
+
+def wait_until_idle(assets, timeout=5):
+    end = time.perf_counter() + timeout
+    while time.perf_counter() < end:
+        with assets.lock:
+            if len(assets.decoded) + assets.prefetched >= len(assets.requested):
+                return
+        time.sleep(0.01)
+    raise AssertionError("the prefetch thread did not finish")
+
+@pytest.fixture
+def sound_dir(tmp_path):
+    if not pygame.mixer.get_init():
+        pytest.skip("no mixer")
+    with wave.open(str(tmp_path / SOUND_FILES['eat']), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(22050)
+        f.writeframes(b'\0\0' * 2205)
+    return tmp_path
+
+def test_sound_loads_synchronously_on_a_miss(sound_dir):
+    assets = AssetManager(sound_dir=str(sound_dir))
+    assert isinstance(assets.sound('eat'), pygame.mixer.Sound)
+    assert assets.sound('hurt') is None
+    # Both results are cached, including the missing file
+    assert assets.sound('eat') is assets.sound('eat')
+    assert assets.sound('hurt') is None
+    assert assets.stats()['sync_loads'] == 2
+
+def test_sound_takes_the_prefetched_copy(sound_dir):
+    assets = AssetManager(sound_dir=str(sound_dir))
+    assets.prefetch(sounds=['eat'])
+    wait_until_idle(assets)
+    assert isinstance(assets.sound('eat'), pygame.mixer.Sound)
+    assert assets.stats()['sync_loads'] == 0
+    assert assets.idle()
+
+def test_images_finalize_while_the_thread_decodes(tmp_path):
+    for i in range(50):
+        pygame.image.save(pygame.Surface((8, 8)), str(tmp_path / f"{i}.png"))
+    names = [f"{i}.png" for i in range(50)]
+    assets = AssetManager(image_dir=str(tmp_path))
+    assets.prefetch(images=names)
+    # Ask for them while the thread is still appending
+    for name in reversed(names):
+        assert assets.image(name).get_size() == (8, 8)
+    wait_until_idle(assets)
+    assets.pump(budget_ms=1000)
+    assert assets.idle()
+    assert all(assets.images[name] is not None for name in names)
+
+def test_a_corrupt_file_does_not_stop_the_thread(tmp_path):
+    (tmp_path / "corrupt.png").write_bytes(b"\x89PNG\r\n\x1a\nnot really a png")
+    pygame.image.save(pygame.Surface((8, 8)), str(tmp_path / "good.png"))
+    assets = AssetManager(image_dir=str(tmp_path))
+    assets.prefetch(images=["corrupt.png", "good.png"])
+    wait_until_idle(assets)
+    assets.pump(budget_ms=1000)
+    assert assets.thread.is_alive()
+    assert [name for _, name, _ in assets.failures] == ["corrupt.png"]
+    assert assets.image("corrupt.png") is None
+    assert assets.image("good.png").get_size() == (8, 8)
+    assert assets.stats()['sync_loads'] == 0
+
+def test_unexpected_decode_errors_are_recorded(tmp_path, monkeypatch):
+    pygame.image.save(pygame.Surface((8, 8)), str(tmp_path / "good.png"))
+    assets = AssetManager(image_dir=str(tmp_path))
+    decode_image = assets.decode_image
+    def flaky(name):
+        if name == "bad.png":
+            raise ValueError("unexpected")
+        return decode_image(name)
+    monkeypatch.setattr(assets, 'decode_image', flaky)
+    assets.prefetch(images=["bad.png"])
+    wait_until_idle(assets)
+    assets.prefetch(images=["good.png"])
+    wait_until_idle(assets)
+    assets.pump(budget_ms=1000)
+    assert assets.failures == [('image', 'bad.png', "ValueError: unexpected")]
+    assert assets.images["good.png"] is not None
+    assert assets.idle()
@@ -0,0 +1,35 @@
+import pygame
+
+from background import Background
+
+SIZE = (64, 32)
+
+def save_layer(path, color):
+    layer = pygame.Surface(SIZE)
+    layer.fill(color)
+    # A marker column shows where the layer has scrolled to
+    pygame.draw.line(layer, (255, 255, 255), (0, 0), (0, SIZE[1] - 1))
+    pygame.image.save(layer, str(path))
+
+def test_gradient_when_no_layers_exist(tmp_path):
+    background = Background(SIZE, str(tmp_path))
+    assert background.is_static
+    assert background.static.get_at((0, 0))[:3] == (0, 105, 148)
+    assert background.static.get_at((0, 31))[:3] == (0, 105 + 31 // 4, 148 + 31 // 4)
+
+def test_layers_scroll_with_the_view(tmp_path):
+    save_layer(tmp_path / 'background_layer_0.png', (0, 0, 255))
+    save_layer(tmp_path / 'background_layer_1.png', (255, 0, 0))
+    background = Background(SIZE, str(tmp_path), layer_count=2, factors=(0.0, 0.5))
+    assert len(background.strips) == 1
+    screen = pygame.Surface(SIZE)
+
+    def marker_x(view_x):
+        background.draw(screen, view_x)
+        return [x for x in range(SIZE[0]) if screen.get_at((x, 5))[:3] == (255, 255, 255)]
+
+    assert marker_x(0) == [0]
+    # Half the view's movement, wrapping around the strip
+    assert marker_x(20) == [SIZE[0] - 10]
+    assert marker_x(-20) == [10]
+    assert marker_x(2 * SIZE[0]) == [0]
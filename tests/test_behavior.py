@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from behavior import NeighborGrid, BehaviorEngine
+
+def neighbor_distances(grid, positions, index):
+    """Sorted squared distances from a creature to everyone closer than a cell"""
+    d2 = ((positions - positions[index]) ** 2).sum(axis=1)
+    return np.sort(d2[d2 < grid.cell_size ** 2])
+
+@pytest.mark.parametrize('count', [30, 300, 3000])
+@pytest.mark.parametrize('clustered', [False, True])
+def test_candidates_are_the_nearest_neighbors(count, clustered):
+    rng = np.random.default_rng(count)
+    positions = rng.uniform(0, [1024, 768], size=(count, 2))
+    if clustered:
+        # Stacked creatures tie at the cap's boundary
+        positions = np.floor(positions / 40) * 40
+    grid = NeighborGrid()
+    grid.build(positions)
+    indices = rng.choice(count, size=min(count, 256), replace=False)
+    a, b = grid.candidates(indices, max_neighbors=24)
+
+    distances = ((positions[b] - positions[a]) ** 2).sum(axis=1)
+    for index in indices.tolist():
+        expected = neighbor_distances(grid, positions, index)[:24]
+        assert np.array_equal(np.sort(distances[a == index]), expected)
+
+def test_uncapped_candidates_are_everyone_in_range():
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, [1024, 768], size=(500, 2))
+    grid = NeighborGrid()
+    grid.build(positions)
+    a, b = grid.candidates(np.arange(500))
+    distances = ((positions[b] - positions[a]) ** 2).sum(axis=1)
+    for index in range(500):
+        assert np.array_equal(np.sort(distances[a == index]), neighbor_distances(grid, positions, index))
+
+def test_predators_chase_the_players_center():
+    engine = BehaviorEngine(0)
+    position = np.array([[0.0, 100.0]])
+    direction = np.array([[1.0, 0.0]])
+    # Tops level, but a 60 pixel player's center is below a 20 pixel predator's
+    engine.steer(position, direction, np.array([20]), np.array([True]), (100, 100), 60)
+    expected = np.array([120.0, 20.0]) / np.hypot(120, 20)
+    assert np.allclose(direction[0], expected)
+
+def test_prey_flee_from_the_predators_center():
+    engine = BehaviorEngine(0)
+    # A 60 pixel predator whose center sits straight above a 10 pixel prey's
+    position = np.array([[100.0, 100.0], [75.0, 30.0]])
+    direction = np.array([[0.0, 1.0], [1.0, 0.0]])
+    engine.steer(position, direction, np.array([10, 60]), np.array([False, True]))
+    assert direction[0, 1] > 0
+    assert abs(direction[0, 0]) < 1e-9
+
+def test_predators_hunt_the_nearest_smaller_prey():
+    engine = BehaviorEngine(0)
+    position = np.array([[0.0, 0.0], [80.0, 20.0], [0.0, 110.0]])
+    direction = np.array([[1.0, 0.0], [1.0, 0.0], [1.0, 0.0]])
+    engine.steer(position, direction, np.array([40, 10, 10]), np.array([True, False, False]))
+    # Center to center the prey to the right is 65 away, the one below 95
+    assert np.allclose(direction[0], np.array([65.0, 5.0]) / np.hypot(65, 5))
+
+def test_classic_steering_is_the_default():
+    from creature import CreatureManager
+    assert CreatureManager().behavior is None
+    assert CreatureManager(ai='schooling').behavior is not None
+
+def test_predators_chase_the_nearest_of_several_players():
+    engine = BehaviorEngine(0)
+    position = np.array([[0.0, 100.0]])
+    direction = np.array([[1.0, 0.0]])
+    # The second player's top-left is nearer, but the first one's center is
+    players = np.array([[100.0, 100.0], [-60.0, 160.0]])
+    engine.steer(position, direction, np.array([20]), np.array([True]), players, np.array([20, 200]))
+    assert np.allclose(direction[0], [1.0, 0.0])
@@ -0,0 +1,58 @@
+import pygame
+import pytest
+
+from assets import AssetManager
+from main import Game
+from sprite_cache import SpriteCache
+
+SIZE = 40
+
+@pytest.fixture
+def cache(tmp_path):
+    circle = pygame.Surface((SIZE, SIZE), pygame.SRCALPHA)
+    pygame.draw.circle(circle, (255, 255, 255, 255), (SIZE // 2, SIZE // 2), SIZE // 2)
+    pygame.image.save(circle, str(tmp_path / "circle.png"))
+    return SpriteCache(assets=AssetManager(image_dir=str(tmp_path)))
+
+class Fish(pygame.sprite.Sprite):
+    """A round sprite whose mask comes from the cache, like Creature and Player"""
+    def __init__(self, cache, x, y, facing_right=True):
+        super().__init__()
+        self.image = cache.get("circle.png", SIZE, facing_right)
+        self.rect = self.image.get_rect(topleft=(x, y))
+        self.mask = cache.get_mask("circle.png", SIZE, facing_right)
+        self.size = SIZE
+
+def test_masks_are_cached_and_evicted_with_their_surface(cache):
+    mask = cache.get_mask("circle.png", SIZE)
+    assert cache.get_mask("circle.png", SIZE) is mask
+    assert mask.get_at((SIZE // 2, SIZE // 2)) and not mask.get_at((0, 0))
+    cache.max_entries = 1
+    cache.get(None, 8, True)
+    assert cache.stats()['masks'] == 0
+
+@pytest.mark.parametrize('facing_right', [True, False])
+def test_transparent_corners_only_collide_by_rect(cache, facing_right):
+    rect_game, precise_game = Game(), Game(precise_collisions=True)
+    for game in (rect_game, precise_game):
+        game.player = Fish(cache, 0, 0)
+    # Rects overlap by 6 pixels at the corners, the circles don't touch
+    corner = Fish(cache, SIZE - 6, SIZE - 6, facing_right)
+    assert rect_game.collides(corner)
+    assert not precise_game.collides(corner)
+
+@pytest.mark.parametrize('facing_right', [True, False])
+def test_overlapping_centers_collide_in_both_modes(cache, facing_right):
+    rect_game, precise_game = Game(), Game(precise_collisions=True)
+    for game in (rect_game, precise_game):
+        game.player = Fish(cache, 0, 0)
+    centered = Fish(cache, SIZE // 2, 0, facing_right)
+    assert rect_game.collides(centered)
+    assert precise_game.collides(centered)
+
+def test_rect_misses_skip_the_mask_test(cache):
+    game = Game(precise_collisions=True)
+    game.player = Fish(cache, 0, 0)
+    far = Fish(cache, 3 * SIZE, 0)
+    far.mask = None  # collide_mask would fail on it
+    assert not game.collides(far)
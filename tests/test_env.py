@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from env import ACTIONS, OceanHunterEnv, VectorEnv
+
+@pytest.mark.parametrize('observation, shape, dtype', [
+    ('entities', (9, 4), np.float32),
+    ('pixels', (24, 32, 3), np.uint8),
+])
+def test_reset_and_step_shapes(observation, shape, dtype):
+    env = OceanHunterEnv(observation, max_creatures=8, frame_size=(32, 24), seed=1)
+    obs, info = env.reset()
+    assert obs.shape == shape and obs.dtype == dtype
+    assert 'seed' in info
+    obs, reward, terminated, truncated, info = env.step(1)
+    assert obs.shape == shape and obs.dtype == dtype
+    assert isinstance(reward, float)
+    assert not terminated and not truncated
+
+def test_step_writes_into_out():
+    env = OceanHunterEnv(seed=1)
+    out = np.zeros(env.observation_shape, dtype=env.observation_dtype)
+    env.reset(out=out)
+    obs = env.step(0, out=out)[0]
+    assert obs is out
+    assert out[0, 3] == 1
+
+def test_episodes_are_truncated_after_max_steps():
+    env = OceanHunterEnv(max_steps=5, seed=1)
+    env.reset()
+    flags = [env.step(0)[3] for _ in range(5)]
+    assert flags == [False] * 4 + [True]
+
+def test_unknown_observation_type():
+    with pytest.raises(ValueError):
+        OceanHunterEnv('audio')
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_same_seed_same_rollout(backend):
+    def rollout():
+        env = OceanHunterEnv(backend=backend, seed=7)
+        observations = [env.reset()[0]]
+        actions = np.random.default_rng(0).integers(len(ACTIONS), size=200)
+        rewards = []
+        for action in actions:
+            obs, reward = env.step(action)[:2]
+            observations.append(obs)
+            rewards.append(reward)
+        return np.stack(observations), rewards
+
+    first, second = rollout(), rollout()
+    assert np.array_equal(first[0], second[0])
+    assert first[1] == second[1]
+
+def test_vector_env_shapes():
+    with VectorEnv(3, processes=2, seed=0, max_creatures=8) as envs:
+        assert envs.shape == (3, 9, 4)
+        assert envs.reset().shape == (3, 9, 4)
+        obs, rewards, terminated, truncated, infos = envs.step([0, 1, 2])
+        assert obs.shape == (3, 9, 4)
+        assert rewards.shape == terminated.shape == truncated.shape == (3,)
+        assert len(infos) == 3
+        assert np.all(obs[:, 0, 3] == 1)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from particles import ParticlePool
+
+def emit_rows(pool, count):
+    """Emit particles one at a time, tagged by their x coordinate"""
+    for x in range(count):
+        pool.emit(x, 0, (255, 255, 0), count=1)
+
+def live_x(pool):
+    return pool.x[:pool.count].tolist()
+
+def test_drop_oldest_keeps_the_newest_particles():
+    pool = ParticlePool(capacity=8, overflow='drop_oldest')
+    emit_rows(pool, 12)
+    assert len(pool) == 8
+    assert live_x(pool) == list(range(4, 12))
+    assert pool.dropped == 4
+
+def test_drop_new_keeps_the_oldest_particles():
+    pool = ParticlePool(capacity=8, overflow='drop_new')
+    emit_rows(pool, 12)
+    assert len(pool) == 8
+    assert live_x(pool) == list(range(8))
+    assert pool.dropped == 4
+
+@pytest.mark.parametrize('overflow', ['drop_oldest', 'drop_new'])
+def test_burst_larger_than_capacity(overflow):
+    pool = ParticlePool(capacity=8, overflow=overflow)
+    pool.emit(0, 0, (255, 255, 255), count=3)
+    pool.emit(1, 0, (255, 255, 255), count=20)
+    assert len(pool) == 8
+    assert pool.dropped == 15
+    expected = [1] * 8 if overflow == 'drop_oldest' else [0] * 3 + [1] * 5
+    assert live_x(pool) == expected
+
+def test_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        ParticlePool(overflow='drop_random')
+
+def test_update_packs_survivors_in_spawn_order():
+    pool = ParticlePool(capacity=16)
+    emit_rows(pool, 10)
+    # Fade every other particle out on the next update
+    pool.alpha[:10:2] = 1
+    pool.update()
+    assert live_x(pool) == [1, 3, 5, 7, 9]
+    assert np.all(pool.alpha[:pool.count] > 0)
+
+def test_color_alpha_sets_the_starting_alpha(display):
+    pool = ParticlePool()
+    pool.emit(10, 10, (255, 255, 255, 128), count=4)
+    assert np.all(pool.alpha[:4] == 128)
+    pool.draw(display)
@@ -0,0 +1,58 @@
+import pytest
+
+from creature import CreatureManager, LEVEL_SPAWNS
+
+PLAYER_POS = (512, 384)
+
+def level_size(level):
+    spawns = LEVEL_SPAWNS[level]
+    return sum(count for count, *_ in spawns['prey'] + spawns['predators'])
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_respawning_reuses_pooled_creatures(backend):
+    manager = CreatureManager(backend=backend, seed=1)
+    manager.spawn_creatures(1)
+    first = set(manager.creatures())
+    created = manager.pool_stats()['created']
+    assert created == level_size(1)
+
+    manager.spawn_creatures(1)
+    stats = manager.pool_stats()
+    assert stats['created'] == created
+    assert stats['reused'] == created
+    assert set(manager.creatures()) == first
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_trickle_spawn_fills_the_level_over_several_ticks(backend):
+    manager = CreatureManager(backend=backend, seed=1, trickle_per_tick=4)
+    manager.spawn_creatures(1, trickle=True)
+    total = level_size(1)
+    assert manager.pool_stats()['active'] == 0
+    assert manager.spawning
+
+    ticks = 0
+    while manager.spawning:
+        manager.update(PLAYER_POS)
+        ticks += 1
+        assert manager.pool_stats()['active'] == min(total, 4 * ticks)
+    assert ticks == -(-total // 4)
+    assert len(manager.creatures()) == total
+
+def test_reused_creature_follows_its_new_slot():
+    manager = CreatureManager(backend='numpy', seed=2, trickle_per_tick=1)
+    manager.spawn_creatures(4)
+    manager.update(PLAYER_POS)
+    eaten = manager.creatures()[0]
+    manager.release(eaten)
+
+    # Queue one more creature; it comes back out of the pool at a new place
+    manager.pending.append((False, 30, 0, (70, 130, 180), None))
+    manager.update(PLAYER_POS)
+    assert eaten.alive()
+    simulation = manager.simulation
+    assert simulation.creatures[eaten.sim_index] is eaten
+    manager.creatures()
+    assert tuple(eaten.position) == tuple(simulation.position[eaten.sim_index])
+
+    prey, predators = manager.nearby(eaten.rect)
+    assert eaten in prey
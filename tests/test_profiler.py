@@ -0,0 +1,31 @@
+import json
+
+from main import Game, GameState
+from profiler import FrameProfiler
+
+def test_percentiles_and_overruns(tmp_path):
+    profiler = FrameProfiler(budget_ms=10, window=100)
+    for ms in range(1, 101):
+        profiler.record('update', float(ms))
+    stats = profiler.stats('update')
+    assert stats['p50_ms'] == 51.0
+    assert stats['p95_ms'] == 96.0
+    assert stats['max_ms'] == 100.0
+
+    profiler.begin_frame()
+    profiler.end_frame({'prey': 3})
+    path = tmp_path / 'frames.json'
+    profiler.export(str(path))
+    summary = json.loads(path.read_text())
+    assert summary['frames'] == 1
+    assert summary['counts'] == {'prey': 3}
+    assert summary['phases']['update']['count'] == 100
+
+def test_entity_counts_report_broadphase_candidates():
+    game = Game(seed=1)
+    game.state = GameState.PLAYING
+    game.creature_manager.spawn_creatures(1, density=20)
+    game.update()
+    counts = game.entity_counts()
+    assert counts['candidates'] == game.creature_manager.spatial_index.candidate_count
+    assert counts['candidates'] >= len(sum(game.creature_manager.nearby(game.player.rect), []))
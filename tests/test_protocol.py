@@ -0,0 +1,174 @@
+import asyncio
+import random
+import numpy as np
+import pytest
+
+from protocol import (FRAME, MSG_HELLO, MSG_SNAPSHOT, ProtocolError, frame, DeltaEncoder, DeltaDecoder,
+                      decode_snapshot, PLAYER)
+from server import NetworkIds, ServerGame, GameServer, Client
+
+WORLD = (1024, 768)
+SPECS = [(False, 20, 2, (255, 255, 0), 'small_fish.png'), (False, 30, 3, (0, 255, 255), None),
+         (True, 60, 4, (255, 0, 0), 'shark.png')]
+
+class FakeCreature:
+    def __init__(self, rng):
+        self.spec = rng.choice(SPECS)
+        self.is_predator, self.size, self.speed, self.fallback_color, self.sprite_name = self.spec
+        self.position = [rng.uniform(0, WORLD[0]), rng.uniform(0, WORLD[1])]
+        self.facing_right = rng.random() < 0.5
+
+def assert_same_state(decoder, encoder):
+    ids = np.flatnonzero(encoder.present)
+    assert np.flatnonzero(decoder.present).tolist() == ids.tolist()
+    for name in ('x', 'y', 'flags', 'spec'):
+        assert getattr(decoder, name)[ids].tolist() == getattr(encoder, name)[ids].tolist()
+    assert (decoder.tick, decoder.level) == (encoder.tick, encoder.level)
+    assert decoder.players.tobytes() == encoder.players.tobytes()
+    # Speeds stay on the server
+    assert {index: spec[:2] + spec[3:] for index, spec in decoder.specs.items()} == \
+        {index: spec[:2] + (spec[3][:3], spec[4]) for index, spec in enumerate(encoder.specs)}
+
+def scripted_stream(ticks=400, seed=0):
+    """Encode a population that moves, wraps, turns, dies and respawns; yields each tick's delta"""
+    rng = random.Random(seed)
+    ids = NetworkIds()
+    encoder = DeltaEncoder(capacity=8)
+    creatures = [FakeCreature(rng) for _ in range(40)]
+    players = np.zeros(1, dtype=PLAYER)
+    for tick in range(1, ticks + 1):
+        for creature in creatures:
+            roll = rng.random()
+            if roll < 0.05:
+                # Wrap around the world edge
+                creature.position[0] = WORLD[0] - creature.position[0]
+            elif roll < 0.1:
+                creature.facing_right = not creature.facing_right
+            else:
+                creature.position[0] = min(max(creature.position[0] + rng.uniform(-5, 5), 0), WORLD[0])
+                creature.position[1] = min(max(creature.position[1] + rng.uniform(-5, 5), 0), WORLD[1])
+        for creature in rng.sample(creatures, min(len(creatures), rng.randint(0, 3))):
+            ids.release(creature)
+            creatures.remove(creature)
+        creatures.extend(FakeCreature(rng) for _ in range(rng.randint(0, 3)))
+
+        entries = [ids.get(creature, encoder.spec_id) for creature in creatures]
+        players['x'] = tick
+        data = encoder.encode(tick, 1 + tick // 100, players.copy(),
+                              np.array([entry[0] for entry in entries], dtype=np.int64),
+                              np.array([entry[1] for entry in entries], dtype=np.uint8),
+                              np.array([creature.position for creature in creatures]).reshape(-1, 2),
+                              np.array([creature.facing_right for creature in creatures], dtype=bool))
+        ids.flush()
+        yield encoder, data
+
+def test_deltas_reproduce_the_encoders_state():
+    decoder = DeltaDecoder(capacity=4)
+    spawned_ids = []
+    moved = jumped = 0
+    for i, (encoder, data) in enumerate(scripted_stream()):
+        snapshot = decode_snapshot(data)
+        if i == 0:
+            decoder.apply(decode_snapshot(encoder.keyframe()))
+        else:
+            decoder.apply(snapshot)
+        assert_same_state(decoder, encoder)
+        spawned_ids.extend(snapshot.spawned['id'].tolist())
+        moved += len(snapshot.moved)
+        jumped += len(snapshot.jumped)
+    # The stream exercised every kind of record, and ids were reused after flush()
+    assert moved and jumped
+    assert len(spawned_ids) > len(set(spawned_ids))
+
+def test_a_keyframe_resyncs_a_decoder_mid_stream():
+    decoder = DeltaDecoder()
+    for i, (encoder, data) in enumerate(scripted_stream(seed=1)):
+        if i == 0:
+            with pytest.raises(ProtocolError):
+                decoder.apply(decode_snapshot(data))
+        elif i == 150:
+            # Everything before this point was missed
+            decoder.apply(decode_snapshot(encoder.keyframe()))
+            assert_same_state(decoder, encoder)
+        elif i > 150:
+            decoder.apply(decode_snapshot(data))
+            assert_same_state(decoder, encoder)
+
+def test_empty_and_unchanged_ticks():
+    encoder = DeltaEncoder()
+    decoder = DeltaDecoder()
+    players = np.zeros(0, dtype=PLAYER)
+    decoder.apply(decode_snapshot(encoder.keyframe()))
+    nothing = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8), np.zeros((0, 2)), np.zeros(0, dtype=bool))
+    decoder.apply(decode_snapshot(encoder.encode(1, 1, players, *nothing)))
+    assert_same_state(decoder, encoder)
+    spec = encoder.spec_id(SPECS[0])
+    one = (np.array([3]), np.array([spec], dtype=np.uint8), np.array([[10.0, 20.0]]), np.array([True]))
+    decoder.apply(decode_snapshot(encoder.encode(2, 1, players, *one)))
+    snapshot = decode_snapshot(encoder.encode(3, 1, players, *one))
+    assert (len(snapshot.spawned), len(snapshot.moved), len(snapshot.jumped)) == (0, 0, 0)
+    decoder.apply(snapshot)
+    assert_same_state(decoder, encoder)
+
+class FakeTransport:
+    def __init__(self):
+        self.buffered = 0
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+class FakeWriter:
+    """Collects what the server writes and decodes it like a client"""
+    def __init__(self):
+        self.transport = FakeTransport()
+        self.decoder = DeltaDecoder()
+
+    def write(self, data):
+        offset = 0
+        while offset < len(data):
+            length, msg_type = FRAME.unpack_from(data, offset)
+            offset += FRAME.size
+            assert msg_type == MSG_SNAPSHOT
+            self.decoder.apply(decode_snapshot(data[offset:offset + length]))
+            offset += length
+
+def test_a_backed_up_client_is_resynced_by_keyframe():
+    game = ServerGame(seed=3, density=3)
+    server = GameServer(game, max_buffered=1024)
+    clients = {}
+    for _ in range(2):
+        player_id = game.join()
+        clients[player_id] = server.clients[player_id] = Client(FakeWriter(), player_id)
+    steady, lagging = clients.values()
+
+    for tick in range(1, 301):
+        # The second client's socket stops draining for a while
+        lagging.writer.transport.buffered = 4096 if 100 <= tick < 150 else 0
+        game.update()
+        server.broadcast(game.encode())
+        if tick == 120:
+            assert not lagging.synced
+            assert lagging.writer.decoder.tick < game.encoder.tick
+        for client in (steady, lagging):
+            if client.synced:
+                assert_same_state(client.writer.decoder, game.encoder)
+    assert steady.keyframes == 1
+    assert lagging.keyframes == 2
+
+@pytest.mark.parametrize('message', [frame(MSG_HELLO, b'\x01'), frame(MSG_HELLO, b'')])
+def test_a_short_message_closes_the_connection_quietly(message):
+    async def connect():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        server = GameServer(ServerGame(seed=1), port=0)
+        await server.start()
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(message)
+        # The server hangs up instead of answering
+        assert await reader.read() == b''
+        writer.close()
+        await server.stop()
+        return errors, server
+    errors, server = asyncio.run(connect())
+    assert errors == []
+    assert not server.clients and not server.game.players
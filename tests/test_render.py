@@ -0,0 +1,65 @@
+import random
+import pygame
+
+from render import covered_area, DirtyRectRenderer
+
+def test_covered_area_counts_overlaps_once():
+    rect = pygame.Rect
+    assert covered_area([]) == 0
+    assert covered_area([rect(0, 0, 10, 10), rect(0, 0, 10, 10)]) == 100
+    assert covered_area([rect(0, 0, 10, 10), rect(5, 5, 10, 10)]) == 175
+
+    rng = random.Random(1)
+    rects = [rect(rng.randint(0, 100), rng.randint(0, 100), rng.randint(1, 30), rng.randint(1, 30))
+             for _ in range(40)]
+    pixels = {(x, y) for r in rects for x in range(r.left, r.right) for y in range(r.top, r.bottom)}
+    assert covered_area(rects) == len(pixels)
+
+def test_overlapping_rects_stay_under_the_full_flip_threshold(display):
+    renderer = DirtyRectRenderer(display)
+    renderer.set_background(display.copy())
+    renderer.begin('scene')
+    # A sprite redrawn in place: its rect is dirty twice over, but covers a third of the screen
+    sprite = pygame.Rect(0, 0, 1024, 256)
+    renderer.present([sprite])
+    renderer.begin('scene')
+    renderer.present([sprite])
+    assert renderer.last_dirty_area == 1024 * 256
+    assert renderer.stats()['dirty_frames'] == 2
+
+def renderer_without_union(display, monkeypatch, **kwargs):
+    """A renderer whose exact coverage computation must not run"""
+    import render
+    def fail(rects):
+        raise AssertionError("covered_area should have been skipped")
+    monkeypatch.setattr(render, 'covered_area', fail)
+    renderer = DirtyRectRenderer(display, **kwargs)
+    renderer.set_background(display.copy())
+    renderer.begin('scene')
+    return renderer
+
+def test_small_summed_area_skips_the_union(display, monkeypatch):
+    renderer = renderer_without_union(display, monkeypatch)
+    renderer.present([pygame.Rect(i * 40, 0, 32, 32) for i in range(20)])
+    assert renderer.stats()['dirty_frames'] == 1
+    assert renderer.last_dirty_area == 20 * 32 * 32
+
+def test_one_huge_rect_flips_without_the_union(display, monkeypatch):
+    renderer = renderer_without_union(display, monkeypatch)
+    renderer.present([pygame.Rect(0, 0, 1024, 600), pygame.Rect(0, 0, 10, 10)])
+    assert renderer.stats()['full_frames'] == 1
+
+def test_too_many_rects_flip_without_the_union(display, monkeypatch):
+    renderer = renderer_without_union(display, monkeypatch, max_rects=64)
+    renderer.present([pygame.Rect(i, i, 4, 4) for i in range(65)])
+    assert renderer.stats()['full_frames'] == 1
+
+def test_overlap_near_the_threshold_is_counted_exactly(display):
+    renderer = DirtyRectRenderer(display)
+    renderer.set_background(display.copy())
+    renderer.begin('scene')
+    # Summed area is over half the screen, the union just under it
+    half = pygame.Rect(0, 0, 1024, 383)
+    renderer.present([half, half.move(0, 1)])
+    assert renderer.last_dirty_area == 1024 * 384
+    assert renderer.stats()['dirty_frames'] == 1
@@ -0,0 +1,60 @@
+import random
+import pytest
+
+from headless import run_headless, run_replay
+from main import Game
+from replay import INPUT_DOWN, INPUT_LEFT, MASK_KEYS, Recording, ReplayDivergence, replay
+
+def record(tmp_path, backend, **options):
+    path = str(tmp_path / 'session.ohr')
+    run_headless(max_ticks=600, policy='random', seed=5, backend=backend, record_path=path, **options)
+    return path
+
+def new_game(backend, seed, ai='classic'):
+    return Game(backend, seed=seed, ai=ai)
+
+def recorded_game(recording):
+    return Game(recording.backend, seed=recording.seed, ai=recording.ai,
+                precise_collisions=recording.precise_collisions, world_size=recording.world_size)
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+@pytest.mark.parametrize('ai', ['classic', 'schooling'])
+def test_recordings_replay(tmp_path, backend, ai):
+    result = run_replay(record(tmp_path, backend, ai=ai))
+    assert result['checksums_verified'] > 0
+
+def test_precise_collision_recordings_replay(tmp_path):
+    path = record(tmp_path, 'numpy', precise_collisions=True)
+    assert Recording.load(path).precise_collisions
+    assert run_replay(path)['checksums_verified'] > 0
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_world_recordings_replay(tmp_path, backend):
+    path = record(tmp_path, backend, world_size=(4096, 3072))
+    assert Recording.load(path).world_size == (4096, 3072)
+    assert run_replay(path)['checksums_verified'] > 0
+
+def test_recordings_survive_a_round_trip(tmp_path):
+    recording = Recording.load(record(tmp_path, 'object', ai='schooling'))
+    assert recording.ai == 'schooling'
+    assert Recording.from_bytes(recording.to_bytes()).to_bytes() == recording.to_bytes()
+
+def test_a_changed_input_is_caught(tmp_path):
+    recording = Recording.load(record(tmp_path, 'numpy'))
+    for tick in range(len(recording.inputs)):
+        recording.inputs[tick] = INPUT_LEFT | INPUT_DOWN
+    with pytest.raises(ReplayDivergence):
+        replay(recording, recorded_game)
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+@pytest.mark.parametrize('ai', ['classic', 'schooling'])
+def test_same_seed_and_inputs_give_the_same_states(backend, ai):
+    games = [new_game(backend, 11, ai), new_game(backend, 11, ai)]
+    for game in games:
+        game.start()
+    inputs = random.Random(3)
+    for tick in range(300):
+        keys = MASK_KEYS[inputs.randrange(16)]
+        for game in games:
+            game.update(keys)
+        assert games[0].state_checksum() == games[1].state_checksum(), tick
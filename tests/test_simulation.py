@@ -0,0 +1,86 @@
+import numpy as np
+import pygame
+import pytest
+
+import creature
+import simulation
+from creature import CreatureManager
+from simulation import round_half_away
+
+PLAYER_POS = (512, 384)
+
+def spawned(backend, seed=7):
+    manager = CreatureManager(backend=backend, seed=seed)
+    manager.spawn_creatures(4, density=5)
+    return manager
+
+def same_start(source, target):
+    """Move target's creatures to source's starting positions and headings"""
+    for a, b in zip(source.creatures(), target.creatures()):
+        b.position.update(a.position)
+        b.direction.update(a.direction)
+        b.rect.topleft = a.rect.topleft
+    if target.simulation is not None:
+        target.simulation.load(target.creatures())
+
+def state(manager):
+    creatures = manager.creatures()
+    return (np.array([tuple(c.position) for c in creatures]),
+            [tuple(c.rect) for c in creatures],
+            [c.facing_right for c in creatures])
+
+def test_backends_follow_the_same_trajectories(monkeypatch):
+    # Without random turns both backends are deterministic given the spawn
+    monkeypatch.setattr(creature, 'TURN_CHANCE', 0)
+    monkeypatch.setattr(simulation, 'TURN_CHANCE', 0)
+    managers = [spawned('object'), spawned('numpy')]
+    same_start(*managers)
+    for _ in range(300):
+        for manager in managers:
+            manager.update(PLAYER_POS)
+    (obj_pos, obj_rects, obj_facing), (np_pos, np_rects, np_facing) = map(state, managers)
+    assert np.allclose(obj_pos, np_pos)
+    assert obj_rects == np_rects
+    assert obj_facing == np_facing
+
+def test_numpy_backend_is_seeded():
+    a, b = spawned('numpy'), spawned('numpy')
+    for _ in range(100):
+        a.update(PLAYER_POS)
+        b.update(PLAYER_POS)
+    assert np.array_equal(state(a)[0], state(b)[0])
+
+def test_rects_round_like_pygame():
+    values = np.array([1.4, 1.5, 2.5, -1.5, -1.4, -0.5, 1023.9999, 0.0])
+    rect = pygame.Rect(0, 0, 1, 1)
+    expected = []
+    for value in values.tolist():
+        rect.x = value
+        expected.append(rect.x)
+    assert round_half_away(values).tolist() == expected
+
+def test_nearby_syncs_only_the_hits():
+    manager = spawned('numpy')
+    manager.update(PLAYER_POS)
+    player_rect = pygame.Rect(400, 300, 200, 200)
+    prey, predators = manager.nearby(player_rect)
+    hits = prey + predators
+    assert all(c.rect.colliderect(player_rect) for c in hits)
+    assert manager.simulation.stale
+
+    others = [c for c in manager.creatures() if c not in hits]
+    assert not any(c.rect.colliderect(player_rect) for c in others)
+
+def test_draw_matches_the_sprite_groups(display):
+    manager = spawned('numpy')
+    for _ in range(10):
+        manager.update(PLAYER_POS)
+    display.fill((0, 0, 0))
+    manager.draw(display)
+    from_arrays = pygame.image.tostring(display, 'RGB')
+
+    display.fill((0, 0, 0))
+    manager.creatures()
+    manager.prey_group.draw(display)
+    manager.predator_group.draw(display)
+    assert pygame.image.tostring(display, 'RGB') == from_arrays
@@ -0,0 +1,55 @@
+import random
+import numpy as np
+import pygame
+import pytest
+
+from spatial import SpatialHash
+
+def random_rects(seed, count, max_size=64):
+    rng = random.Random(seed)
+    rects = []
+    for _ in range(count):
+        size = rng.randint(1, max_size)
+        rects.append(pygame.Rect(rng.randint(-100, 1100), rng.randint(-100, 800), size, size))
+    return rects
+
+def indexed(rects, cell_size=64):
+    index = SpatialHash(cell_size)
+    index.rebuild(list(range(len(rects))), np.array([tuple(r) for r in rects], dtype=np.int64).reshape(-1, 4))
+    return index
+
+@pytest.mark.parametrize('cell_size', [16, 64, 200])
+def test_query_rect_matches_brute_force(cell_size):
+    rects = random_rects(1, 500, max_size=90)
+    index = indexed(rects, cell_size)
+    for query in random_rects(2, 200, max_size=300):
+        expected = [i for i, r in enumerate(rects) if r.colliderect(query)]
+        assert index.query_rect(query) == expected
+    assert index.query_count == 200
+    # The broadphase looks at far fewer candidates than a full scan
+    assert index.candidate_count < 200 * len(rects) // 4
+
+@pytest.mark.parametrize('cell_size', [16, 64])
+def test_pairs_match_brute_force(cell_size):
+    rects = random_rects(3, 400)
+    index = indexed(rects, cell_size)
+    expected = {(i, j) for i in range(len(rects)) for j in range(i + 1, len(rects))
+                if rects[i].colliderect(rects[j])}
+    found = index.pairs()
+    assert len(found) == len(set(found))
+    assert set(found) == expected
+
+def test_query_sprite_excludes_itself():
+    class Item:
+        def __init__(self, rect):
+            self.rect = rect
+    items = [Item(pygame.Rect(10, 10, 20, 20)), Item(pygame.Rect(20, 20, 20, 20)),
+             Item(pygame.Rect(500, 500, 20, 20))]
+    index = SpatialHash()
+    index.rebuild(items, np.array([tuple(i.rect) for i in items], dtype=np.int64))
+    assert index.query_sprite(items[0]) == [items[1]]
+
+def test_empty_index():
+    index = indexed([])
+    assert index.query_rect(pygame.Rect(0, 0, 100, 100)) == []
+    assert index.pairs() == []
@@ -0,0 +1,43 @@
+from sprite_cache import SpriteCache, surface_bytes
+
+RED = (255, 0, 0)
+
+def test_left_facing_miss_counts_once():
+    cache = SpriteCache()
+    left = cache.get(None, 32, False, RED)
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 0
+    # Both facings are cached, so asking again for either is a hit
+    assert cache.get(None, 32, False, RED) is left
+    cache.get(None, 32, True, RED)
+    assert cache.stats()['hits'] == 2
+    assert cache.stats()['entries'] == 2
+
+def test_missing_sprites_share_the_fallback_entry():
+    cache = SpriteCache()
+    a = cache.get('no_such_sprite.png', 16, True, RED)
+    b = cache.get('another_missing.png', 16, True, RED)
+    assert a is b
+    assert a.get_at((0, 0))[:3] == RED
+
+def test_evicts_least_recently_used_by_byte_budget():
+    probe = SpriteCache().get(None, 64, True, RED)
+    cache = SpriteCache(max_bytes=3 * surface_bytes(probe))
+    for color in [(1, 0, 0), (2, 0, 0), (3, 0, 0)]:
+        cache.get(None, 64, True, color)
+    cache.get(None, 64, True, (1, 0, 0))  # Touch the oldest entry
+    cache.get(None, 64, True, (4, 0, 0))
+
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= cache.max_bytes
+    assert ((2, 0, 0), 64, True) not in cache.entries
+    assert ((1, 0, 0), 64, True) in cache.entries
+
+def test_evicts_by_entry_count():
+    cache = SpriteCache(max_entries=2)
+    for size in (8, 16, 24):
+        cache.get(None, size, True, RED)
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == sum(surface_bytes(s) for s in cache.entries.values())
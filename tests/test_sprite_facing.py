@@ -0,0 +1,54 @@
+from collections import defaultdict
+import pygame
+import pytest
+
+from creature import CreatureManager
+from player import Player
+from sprite_cache import sprite_cache
+
+LEVEL = 4
+FRAMES = 120
+
+@pytest.fixture
+def allocations(monkeypatch):
+    """Counts Surfaces built through pygame.Surface, transform.flip and transform.scale"""
+    sprite_cache.clear()
+    counts = defaultdict(int)
+
+    class CountingSurface(pygame.Surface):
+        def __init__(self, *args, **kwargs):
+            counts['Surface'] += 1
+            super().__init__(*args, **kwargs)
+
+    def counting(name, function):
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(pygame, 'Surface', CountingSurface)
+    monkeypatch.setattr(pygame.transform, 'flip', counting('flip', pygame.transform.flip))
+    monkeypatch.setattr(pygame.transform, 'scale', counting('scale', pygame.transform.scale))
+    return counts
+
+def turn_around(manager, player, frame):
+    """One frame where every creature and the player reverse their facing"""
+    keys = defaultdict(bool, {pygame.K_LEFT if frame % 2 else pygame.K_RIGHT: True})
+    player.update(keys)
+    manager.update(player.position)
+    for creature in manager.creatures():
+        creature.set_facing(not creature.facing_right)
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_turning_around_allocates_no_surfaces(allocations, backend):
+    manager = CreatureManager(backend=backend, seed=1)
+    manager.spawn_creatures(LEVEL)
+    player = Player(512, 384, LEVEL)
+    for frame in range(2):
+        turn_around(manager, player, frame)
+    assert allocations, "warming up should have built the sprites"
+
+    allocations.clear()
+    for frame in range(FRAMES):
+        turn_around(manager, player, frame)
+    assert dict(allocations) == {}
@@ -0,0 +1,80 @@
+import numpy as np
+import pygame
+import pytest
+
+from main import Game, MAX_CATCH_UP, TICK_SECONDS
+from creature import CreatureManager, level_specs
+from simulation import CreatureSimulation, SNAP_DISTANCE
+
+def started(backend='object'):
+    game = Game(backend, seed=3)
+    game.start()
+    return game
+
+def advance(game, frames):
+    """(ticks, alpha) of each frame, for frame durations given in ticks"""
+    return [game.advance(duration * TICK_SECONDS) for duration in frames]
+
+def test_ticks_follow_elapsed_time():
+    game = started()
+    ticks, alphas = zip(*advance(game, [1.5] * 8))
+    assert ticks == (1, 2) * 4
+    assert alphas == pytest.approx([0.5, 0.0] * 4, abs=1e-6)
+    assert game.dropped_ticks == 0
+
+def test_fast_frames_draw_between_ticks():
+    ticks, alphas = zip(*advance(started(), [0.25] * 8))
+    assert ticks == (0, 0, 0, 1) * 2
+    assert alphas == pytest.approx([0.25, 0.5, 0.75, 0.0] * 2, abs=1e-6)
+
+def test_slow_frames_drop_the_backlog():
+    game = started()
+    ticks, alphas = zip(*advance(game, [12.5, 1]))
+    assert ticks == (MAX_CATCH_UP, 1)
+    assert game.dropped_ticks == 12 - MAX_CATCH_UP
+    assert alphas == pytest.approx([0.5, 0.5], abs=1e-6)
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_advancing_matches_a_plain_update_loop(backend):
+    game = started(backend)
+    ticks = sum(count for count, _ in advance(game, [0.4, 1.7, 3.2, 0.9, 2.5] * 20))
+    plain = started(backend)
+    for _ in range(ticks):
+        plain.update()
+    assert game.state_checksum() == plain.state_checksum()
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_drawing_leaves_the_simulation_untouched(backend):
+    game = started(backend)
+    for _ in range(30):
+        game.update()
+    game.capture_previous()
+    game.update()
+    rects = [tuple(rect) for rect in game.interpolated_rects()]
+    checksum = game.state_checksum()
+    game.draw(0.5)
+    assert [tuple(rect) for rect in game.interpolated_rects()] == rects
+    assert game.state_checksum() == checksum
+    assert game.alpha == 1.0
+
+def test_simulation_interpolates_and_snaps_long_moves():
+    simulation = CreatureSimulation(seed=0)
+    simulation.position = np.array([[100.0, 100.0], [1020.0, 50.0]])
+    simulation.previous = np.array([[90.0, 110.0], [1020.0 - SNAP_DISTANCE - 900, 50.0]])
+    simulation.size = np.array([10, 10])
+    simulation.creatures = [None, None]
+    rects = simulation.interpolated_rects(0.5)
+    assert rects[0].tolist() == [95, 105, 10, 10]
+    # Wrapped around the screen: drawn where it is now
+    assert rects[1].tolist() == [1020, 50, 10, 10]
+
+def test_numpy_creatures_are_drawn_between_steps():
+    manager = CreatureManager('numpy', seed=1)
+    speed = level_specs(1)[0][2]
+    (creature,) = manager.restore([(level_specs(1)[0], 500.0, 400.0, 1.0, 0.0)])
+    manager.update(None)
+    surface = pygame.Surface((1024, 768))
+    (drawn,) = manager.draw(surface, collect_rects=True, alpha=0.5)
+    assert drawn.topleft == (round(500 + speed / 2), 400)
+    (drawn,) = manager.draw(surface, collect_rects=True)
+    assert drawn.topleft == (round(500 + speed), 400)
@@ -0,0 +1,79 @@
+import pygame
+import pytest
+
+from creature import CreatureManager, level_specs
+from world import ChunkedWorld, ACTIVE, FAR
+
+SPEC = level_specs(1)[0]
+
+def creature_count(world):
+    stats = world.stats()
+    return stats['active_creatures'] + stats['far_creatures'] + stats['dormant_creatures']
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_waking_fast_forwards_and_wraps_at_the_world_edge(backend):
+    world = ChunkedWorld((2048, 1024), (1024, 768), seed=1, backend=backend)
+    world.detail = {(0, 0): ACTIVE, (3, 1): FAR}
+    world.tick = 10
+    speed = SPEC[2]
+    world.chunk((3, 0)).entries = [
+        (SPEC, 2040.0, 100.0, 1.0, 0.0, 0),   # swims off the right edge into (0, 0)
+        (SPEC, 1800.0, 1020.0, 0.0, 1.0, 5),  # wraps from the bottom into (3, 0)
+        (SPEC, 2000.0, 600.0, 0.0, 1.0, 8),   # stays in (3, 1)
+    ]
+    world.wake(world.chunk((3, 0)))
+
+    active, far = world.active.creatures(), world.far.creatures()
+    assert len(active) == 1 and len(far) == 1
+    assert active[0].position == ((2040 + 10 * speed) % 2048, 100)
+    assert active[0].direction == (1, 0)
+    assert far[0].position == (2000, 600 + 2 * speed)
+    # Still dormant: saved again at the current tick
+    (entry,) = world.chunk((3, 0)).entries
+    assert entry == (SPEC, 1800.0, (1020 + 5 * speed) % 1024, 0.0, 1.0, 10)
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_creatures_sleep_and_wake_as_the_player_travels(backend):
+    world = ChunkedWorld((8192, 1024), (1024, 768), seed=3, backend=backend, chunks_per_tick=0)
+    world.spawn_creatures(1, center=(256, 256))
+    total = creature_count(world)
+    assert world.stats()['dormant_creatures'] == 0
+
+    world.update((8000, 256))
+    assert world.stats()['dormant_creatures'] > 0
+    assert creature_count(world) == total
+
+    world.update((256, 256))
+    assert creature_count(world) == total
+    for creature in world.creatures():
+        assert world.detail[world.chunk_key(creature.position)] in (ACTIVE, FAR)
+
+def test_forget_drops_the_oldest_dormant_chunks():
+    world = ChunkedWorld((8192, 1024), (1024, 768), seed=1, max_saved=2)
+    world.detail = {(0, 0): ACTIVE}
+    for key in [(0, 0), (5, 0), (6, 0), (7, 0)]:
+        world.chunk(key)
+    world.forget()
+    assert list(world.chunks) == [(0, 0), (7, 0)]
+
+def test_detach_keeps_the_simulated_heading():
+    manager = CreatureManager('numpy', world_size=(1024, 768))
+    (creature,) = manager.restore([(SPEC, 500.0, 400.0, 0.6, 0.8)])
+    for _ in range(5):
+        manager.update((0, 0))
+    index = creature.sim_index
+    position = manager.simulation.position[index].tolist()
+    direction = manager.simulation.direction[index].tolist()
+
+    manager.detach(creature)
+    assert list(creature.position) == position
+    assert list(creature.direction) == direction
+
+@pytest.mark.parametrize('backend', ['object', 'numpy'])
+def test_draw_culls_to_the_view(backend):
+    manager = CreatureManager(backend, world_size=(4096, 768))
+    inside, outside = manager.restore([(SPEC, 3000.0, 300.0, 1.0, 0.0), (SPEC, 500.0, 300.0, 1.0, 0.0)])
+    view = pygame.Rect(2800, 200, 1024, 768)
+    drawn = manager.draw(pygame.Surface((1024, 768)), collect_rects=True, view=view)
+    assert len(drawn) == 1
+    assert drawn[0].topleft == inside.rect.move(-2800, -200).topleft